@@ -9,6 +9,7 @@ import re
 
 sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'honorarios'))
 from database import get_connection
+from utils.dinheiro import Dinheiro
 
 # Mapeamento de colunas para meses
 COLUNAS_MESES = {
@@ -154,11 +155,11 @@ def atualizar_pagamentos(arquivo, aba, ano):
             valor = None
             if valor_cell:
                 if isinstance(valor_cell, (int, float)):
-                    valor = float(valor_cell)
+                    valor = Dinheiro.de_reais(valor_cell)
                 else:
                     valor_str = str(valor_cell).replace('R$', '').replace(' ', '').replace('.', '').replace(',', '.')
                     try:
-                        valor = float(valor_str)
+                        valor = Dinheiro.de_reais(valor_str)
                     except:
                         valor = None
             
@@ -0,0 +1,148 @@
+"""
+Benchmark do gerenciador de conexões do banco.
+
+Compara o caminho antigo (uma conexão nova por chamada, POOL_ATIVO=False)
+com o pool de conexões por thread (POOL_ATIVO=True) em dois cenários:
+  - gerar_honorarios_mes_atual() (executado a cada login)
+  - acesso ao banco feito por tela_gerar_recibo.gerar_recibos (lote de recibos)
+
+Roda num banco temporário, sem tocar no banco de produção.
+Uso: python benchmark_conexoes.py [qtd_clientes]
+"""
+import os
+import sys
+import sqlite3
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'honorarios'))
+
+import database
+from utils.dinheiro import Dinheiro
+
+
+conexoes_abertas = [0]
+_connect_original = sqlite3.connect
+
+
+def _connect_contando(*args, **kwargs):
+    conexoes_abertas[0] += 1
+    return _connect_original(*args, **kwargs)
+
+
+def preparar_banco(caminho, qtd_clientes):
+    """Cria um banco temporário com clientes e valores do ano atual"""
+    database.DB_PATH = caminho
+    database.migrar()
+
+    ano = datetime.now().year
+    conn = database.get_connection()
+    cursor = conn.cursor()
+    for i in range(1, qtd_clientes + 1):
+        cursor.execute(
+            "INSERT INTO clientes (codigo_interno, nome, email) VALUES (?, ?, ?)",
+            (str(i), f"Cliente {i:04d}", f"cliente{i}@exemplo.com"),
+        )
+        cursor.execute(
+            "INSERT INTO valores_honorarios (cliente_id, ano, valor) VALUES (?, ?, ?)",
+            (cursor.lastrowid, ano, Dinheiro(350 + i)),
+        )
+    conn.commit()
+    conn.close()
+
+
+def limpar_mes_atual():
+    agora = datetime.now()
+    conn = database.get_connection()
+    conn.execute("DELETE FROM honorarios WHERE ano = ? AND mes = ?", (agora.year, agora.month))
+    conn.execute("DELETE FROM recibos")
+    conn.commit()
+    conn.close()
+
+
+def cenario_gerar_honorarios():
+    database.gerar_honorarios_mes_atual()
+
+
+def cenario_gerar_recibos():
+    """Mesma sequência de acessos ao banco do lote de tela_gerar_recibo"""
+    agora = datetime.now()
+    mes, ano = agora.month, agora.year
+
+    dados_empresa = {
+        'nome': database.get_config('empresa_nome', 'Escritório'),
+        'cnpj': database.get_config('empresa_cnpj', ''),
+        'endereco': database.get_config('empresa_endereco', ''),
+        'cidade': database.get_config('empresa_cidade', ''),
+        'telefone': database.get_config('empresa_telefone', ''),
+        'email': database.get_config('empresa_email', ''),
+        'chave_pix': database.get_config('empresa_pix', ''),
+    }
+
+    conn = database.get_connection()
+    ids = [row['id'] for row in conn.execute("SELECT id FROM clientes WHERE ativo = 1")]
+    conn.close()
+
+    for cid in ids:
+        database.buscar_cliente(cid)  # parte do trabalho medido por cliente
+        conn = database.get_connection()
+        conn.execute("""
+            SELECT tipo, valor FROM certificados
+            WHERE cliente_id = ? AND mes_honorario = ? AND ano_honorario = ?
+            AND vinculado_honorario = 1
+        """, (cid, mes, ano)).fetchall()
+        conn.close()
+        database.criar_recibo(
+            cliente_id=cid, valor=350.0, descricao=f"Honorários ref. {mes}/{ano}",
+            referencia_mes=mes, referencia_ano=ano,
+        )
+
+    database.registrar_log("benchmark", "Recibos PDF gerados", detalhes=f"{len(ids)} recibos")
+    return dados_empresa
+
+
+def medir(nome, funcao, pool_ativo, repeticoes=3):
+    database.POOL_ATIVO = pool_ativo
+    database.fechar_conexoes()
+    tempos = []
+    conexoes = []
+    for _ in range(repeticoes):
+        limpar_mes_atual()
+        conexoes_abertas[0] = 0
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+        conexoes.append(conexoes_abertas[0])
+    melhor = min(tempos)
+    print(f"  {nome:<28} {'pool' if pool_ativo else 'antigo':<7} "
+          f"{melhor * 1000:9.1f} ms   {max(conexoes):6d} conexões")
+    return melhor
+
+
+def main():
+    qtd_clientes = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    caminho_original = database.DB_PATH
+
+    with tempfile.TemporaryDirectory() as pasta:
+        preparar_banco(os.path.join(pasta, "benchmark.db"), qtd_clientes)
+        sqlite3.connect = _connect_contando
+        try:
+            print(f"\nBenchmark de conexões - {qtd_clientes} clientes\n")
+            for nome, funcao in [
+                ("gerar_honorarios_mes_atual", cenario_gerar_honorarios),
+                ("gerar_recibos (lote)", cenario_gerar_recibos),
+            ]:
+                antigo = medir(nome, funcao, pool_ativo=False)
+                novo = medir(nome, funcao, pool_ativo=True)
+                print(f"  {'':<28} ganho: {antigo / novo:.1f}x\n")
+        finally:
+            sqlite3.connect = _connect_original
+            database.descarregar_logs()  # grava os logs pendentes ainda no banco temporário
+            database.POOL_ATIVO = True
+            database.fechar_conexoes()
+            database.DB_PATH = caminho_original
+
+
+if __name__ == "__main__":
+    main()
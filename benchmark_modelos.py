@@ -0,0 +1,105 @@
+"""
+Benchmark dos registros com __slots__ (honorarios/modelos.py).
+
+Carrega os honorários de um banco temporário (100 mil por padrão) com a
+consulta de listar_honorarios() de três formas:
+  - sqlite3.Row (row_factory padrão das conexões)
+  - sqlite3.Row copiado para dict (o que get_relatorio_cliente,
+    listar_certificados e get_honorarios_vencendo faziam)
+  - Honorario com __slots__ (fabrica_de_registros)
+e mostra o tempo de montagem e a memória ocupada pela lista carregada.
+
+Roda num banco temporário, sem tocar no banco de produção.
+Uso: python benchmark_modelos.py [qtd_honorarios]
+"""
+import gc
+import os
+import sys
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'honorarios'))
+
+import database
+from modelos import Honorario, FABRICAS
+from utils.dinheiro import Dinheiro
+
+
+CONSULTA = """
+    SELECT h.*, c.nome as cliente_nome
+    FROM honorarios h
+    JOIN clientes c ON h.cliente_id = c.id
+    ORDER BY h.ano DESC, h.mes DESC, c.nome
+"""
+
+
+def preparar_banco(caminho, qtd_honorarios):
+    """Banco temporário com clientes e 12 honorários por cliente/ano"""
+    database.DB_PATH = caminho
+    database.migrar()
+
+    anos = range(2014, 2026)
+    qtd_clientes = -(-qtd_honorarios // (12 * len(anos)))
+    with database.transacao() as conn:
+        conn.executemany(
+            "INSERT INTO clientes (id, codigo_interno, nome, email) VALUES (?, ?, ?, ?)",
+            [(i, str(i), f"Cliente {i:05d}", f"cliente{i}@exemplo.com") for i in range(1, qtd_clientes + 1)],
+        )
+        linhas = ((cid, ano, mes, Dinheiro(350 + cid % 50), f"{ano}-{mes:02d}-10",
+                   'PAGO' if cid % 3 else 'PENDENTE')
+                  for cid in range(1, qtd_clientes + 1) for ano in anos for mes in range(1, 13))
+        conn.executemany("""
+            INSERT INTO honorarios (cliente_id, ano, mes, valor, data_vencimento, status)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (linha for _, linha in zip(range(qtd_honorarios), linhas)))
+
+
+def carregar(row_factory, copiar=False):
+    cursor = database._conexao_da_thread().cursor()
+    cursor.row_factory = row_factory
+    linhas = cursor.execute(CONSULTA).fetchall()
+    return [dict(linha) for linha in linhas] if copiar else linhas
+
+
+def medir(nome, row_factory, copiar=False, repeticoes=3):
+    tempos = []
+    for _ in range(repeticoes):
+        gc.collect()
+        inicio = time.perf_counter()
+        linhas = carregar(row_factory, copiar)
+        tempos.append(time.perf_counter() - inicio)
+        del linhas
+
+    gc.collect()
+    tracemalloc.start()
+    linhas = carregar(row_factory, copiar)
+    memoria = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print(f"  {nome:<24} {min(tempos) * 1000:9.1f} ms   {memoria / 1024 / 1024:7.1f} MB   ({len(linhas)} linhas)")
+    return min(tempos), memoria
+
+
+def main():
+    qtd_honorarios = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    caminho_original = database.DB_PATH
+
+    with tempfile.TemporaryDirectory() as pasta:
+        try:
+            preparar_banco(os.path.join(pasta, "benchmark.db"), qtd_honorarios)
+            print(f"\nBenchmark de registros - {qtd_honorarios} honorários\n")
+            tempo_row, mem_row = medir("sqlite3.Row", sqlite3.Row)
+            tempo_dict, mem_dict = medir("sqlite3.Row -> dict", sqlite3.Row, copiar=True)
+            tempo_slots, mem_slots = medir("Honorario (__slots__)", FABRICAS[Honorario])
+            print(f"\n  vs sqlite3.Row: {tempo_row / tempo_slots:.1f}x tempo, {mem_row / mem_slots:.2f}x memória")
+            print(f"  vs dict(row):   {tempo_dict / tempo_slots:.1f}x tempo, {mem_dict / mem_slots:.2f}x memória\n")
+        finally:
+            database.descarregar_logs()
+            database.fechar_conexoes()
+            database.DB_PATH = caminho_original
+
+
+if __name__ == "__main__":
+    main()
@@ -18,7 +18,10 @@ else:
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from database import create_tables, criar_usuario_inicial, get_config, get_resource_path
+from database import (
+    migrar, get_config, get_resource_path,
+    iniciar_monitor_alteracoes,
+)
 from utils.theme import ThemeManager, CORES
 from utils.toast import toast_success, toast_error, toast_warning
 from utils.updater import GitHubUpdater
@@ -36,14 +39,12 @@ def main(page: ft.Page):
     page.window.height = 750
     page.window.center()
     page.fonts = {"Inter": "https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&display=swap"}
-    page.theme = ft.Theme(font_family="Inter")
     
-    # Inicializa
-    create_tables()
-    criar_usuario_inicial()
+    # Inicializa (aplica migrações pendentes; com o esquema em dia só lê o user_version)
+    migrar()
     
     theme = ThemeManager()
-    page.theme_mode = ft.ThemeMode.DARK if theme.is_dark[0] else ft.ThemeMode.LIGHT
+    theme.aplicar(page, font_family="Inter")
     usuario_logado = [None]
     pagina_atual = [0]
     menu_expandido = [False]
@@ -142,6 +143,26 @@ def main(page: ft.Page):
                 except Exception as ex:
                     print(f"[AVISO] Erro ao gerar honorários automáticos: {ex}")
                 
+                # Retenção do log de auditoria (move logs antigos para o arquivo, 1x por dia),
+                # no pool de tarefas para não atrasar o login; erros ficam no histórico da tarefa
+                from database import arquivar_logs_se_necessario
+                from utils.tarefas import executar
+                
+                def arquivar_logs(tarefa):
+                    movidos = arquivar_logs_se_necessario()
+                    if movidos > 0:
+                        print(f"[AUTO] {movidos} logs antigos arquivados")
+                    return f"{movidos} logs arquivados"
+                
+                executar("Arquivar logs", arquivar_logs, usuario=login_usuario.value.strip())
+                
+                # Registro de alterações: mantém só as mais recentes
+                try:
+                    from database import podar_alteracoes
+                    podar_alteracoes()
+                except Exception as ex:
+                    print(f"[AVISO] Erro ao podar alterações: {ex}")
+                
                 # Verificar update antes de abrir app
                 verificar_atualizacao(mostrar_splash)
             else:
@@ -468,9 +489,20 @@ def main(page: ft.Page):
     def abrir_app():
         page.window.maximized = True
         page.clean()
-        page.bgcolor = DARK_BG
+        page.bgcolor = theme.get_bg()
         
-        conteudo = ft.Container(expand=True, bgcolor=DARK_BG)
+        # Acompanha alterações (desta e de outras estações) para as telas abertas
+        iniciar_monitor_alteracoes()
+        
+        conteudo = ft.Container(expand=True, bgcolor=theme.get_bg())
+        
+        # Progresso das tarefas em segundo plano (recibos, exportações, importação)
+        from utils.painel_tarefas import PainelTarefas
+        painel_tarefas = PainelTarefas(theme)
+        
+        # Telas já montadas ficam guardadas; trocar de aba só as reexibe
+        from utils.cache_telas import CacheTelas
+        cache_telas = CacheTelas()
         
         # ═══ ITENS DO MENU (pré-criados, só atualizam propriedades) ═══
         is_admin_user = usuario_logado[0].get('is_admin', False) if usuario_logado[0] else False
@@ -498,36 +530,53 @@ def main(page: ft.Page):
             atualizar_indicador_menu()
             carregar_pagina(idx)
         
+        def exibir(tela):
+            conteudo.content = tela
+            page.update()
+        
         def carregar_pagina(idx):
             is_admin = usuario_logado[0].get('is_admin', False) if usuario_logado[0] else False
+            # Tabelas de que cada tela depende: se mudarem com ela escondida, é recriada.
+            # Configurações e Certificados se atualizam sozinhas (observador de alterações).
+            tabelas = ()
             
             if idx == 0:
                 from views.tela_inicio import criar_tela_inicio
-                conteudo.content = criar_tela_inicio(page, theme, navegar_para_ano, is_admin)
+                criar = lambda: criar_tela_inicio(page, theme, navegar_para_ano, is_admin)
+                tabelas = ("honorarios", "clientes")
             elif idx == 1:
                 from views.tela_gerar_recibo import criar_tela_gerar_recibo
-                conteudo.content = criar_tela_gerar_recibo(page, file_picker, theme, usuario_logado)
+                criar = lambda: criar_tela_gerar_recibo(page, file_picker, theme, usuario_logado)
+                tabelas = ("clientes", "recibos", "valores_honorarios", "honorarios", "certificados")
             elif idx == 2:
                 from views.tela_relatorios import criar_tela_relatorios
-                conteudo.content = criar_tela_relatorios(page, theme, is_admin)
+                criar = lambda: criar_tela_relatorios(page, theme, is_admin)
+                tabelas = ("honorarios", "clientes", "certificados")
             elif idx == 3:
                 from views.tela_agenda import criar_tela_agenda
-                conteudo.content = criar_tela_agenda(page, theme, usuario_logado)
+                criar = lambda: criar_tela_agenda(page, theme, usuario_logado)
+                tabelas = ("honorarios", "clientes")
             elif idx == 4:
                 from views.tela_certificados import criar_tela_certificados
-                conteudo.content = criar_tela_certificados(page, theme, usuario_logado)
+                criar = lambda: criar_tela_certificados(page, theme, usuario_logado)
             elif idx == 5:
                 from views.tela_configuracoes import criar_tela_configuracoes
-                conteudo.content = criar_tela_configuracoes(page, usuario_logado, theme, VERSION)
-            elif idx == 6:  # Usuários (só admin)
+                criar = lambda: criar_tela_configuracoes(page, usuario_logado, theme, VERSION)
+            elif idx == 6:  # Usuários (só admin): usuários não entram no registro de alterações
                 from views.tela_usuarios import criar_tela_usuarios
-                conteudo.content = criar_tela_usuarios(page, theme)
-            page.update()
+                criar = lambda: criar_tela_usuarios(page, theme)
+                tabelas = None
+            else:
+                return
+            cache_telas.mostrar(idx, criar, exibir, tabelas)
         
         def navegar_para_ano(ano, mes_filtro=None):
             from views.tela_honorarios_ano import criar_tela_honorarios_ano
-            conteudo.content = criar_tela_honorarios_ano(page, ano, mes_filtro, theme, lambda: navegar(0), usuario_logado)
-            page.update()
+            cache_telas.mostrar(
+                ("ano", ano, mes_filtro),
+                lambda: criar_tela_honorarios_ano(page, ano, mes_filtro, theme, lambda: navegar(0), usuario_logado),
+                exibir,
+            )
         
         def atualizar_indicador_menu():
             """Atualiza apenas as cores/ícones dos itens (sem recriar)"""
@@ -568,7 +617,7 @@ def main(page: ft.Page):
         logo = ft.Container(
             content=ft.Column([
                 ft.Icon(ft.Icons.BUSINESS, size=32, color=ACCENT),
-                ft.Text("HC", size=18, weight=ft.FontWeight.BOLD, color=TEXT_PRIMARY,
+                ft.Text("HC", size=18, weight=ft.FontWeight.BOLD, color=theme.get_text_color(),
                        animate_opacity=ft.Animation(150, ft.AnimationCurve.EASE_OUT)),
             ], horizontal_alignment=ft.CrossAxisAlignment.CENTER, spacing=5),
             padding=20,
@@ -576,7 +625,7 @@ def main(page: ft.Page):
         
         btn_tema = ft.IconButton(
             ft.Icons.BRIGHTNESS_6, 
-            icon_color=TEXT_SECONDARY, 
+            icon_color=theme.get_text_secondary(), 
             icon_size=20,
             tooltip="Alternar tema",
             on_click=lambda e: alternar_tema(),
@@ -591,33 +640,11 @@ def main(page: ft.Page):
         )
         
         def alternar_tema():
+            # As cores dos controles são papéis do ColorScheme (utils/theme.py):
+            # trocar o modo recolore tudo, sem recriar telas nem ler o banco
             theme.toggle()
-            is_dark = theme.is_dark[0]
-            page.theme_mode = ft.ThemeMode.DARK if is_dark else ft.ThemeMode.LIGHT
-            
-            # Atualizar cores - usando cores do tema com melhor contraste no modo claro
-            new_bg = theme.get_bg()
-            new_surface = theme.get_surface()
-            new_text = theme.get_text_color()
-            new_text_sec = theme.get_text_secondary()
-            new_border = theme.get_border()
-            
-            page.bgcolor = new_bg
-            conteudo.bgcolor = new_bg
-            menu_container.bgcolor = new_surface
-            menu_container.border = ft.border.only(right=ft.BorderSide(1, new_border))
-            
-            # Atualizar menu
-            for icon_ref, text_ref, container_ref in zip(menu_icons, menu_texts, menu_containers):
-                text_ref.color = new_text_sec
-                icon_ref.color = new_text_sec
-            
-            logo.content.controls[0].color = ACCENT
-            logo.content.controls[1].color = new_text
-            btn_tema.icon_color = new_text_sec
-            
-            atualizar_indicador_menu()
-            carregar_pagina(pagina_atual[0])
+            theme.aplicar(page)
+            page.update()
         
         # Coluna do menu
         menu_col = ft.Column([
@@ -666,7 +693,10 @@ def main(page: ft.Page):
         
         page.add(ft.Row([
             menu_container,
-            ft.Container(content=conteudo, expand=True, bgcolor=DARK_BG),
+            ft.Container(
+                content=ft.Column([conteudo, painel_tarefas.controle], spacing=0, expand=True),
+                expand=True, bgcolor=theme.get_bg(),
+            ),
         ], expand=True, spacing=0))
     
     # Inicia com login
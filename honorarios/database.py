@@ -3,11 +3,23 @@ Módulo de banco de dados para o Sistema de Honorários Contábeis.
 Utiliza SQLite para armazenamento local.
 """
 import sqlite3
+import copy
+import re
 import os
-from datetime import datetime
+import atexit
+import queue
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import wraps
+from datetime import datetime, timezone
 
 import sys
 
+from utils.dinheiro import Dinheiro
+from modelos import Registro, Cliente, Honorario, Recibo, Certificado, FABRICAS
+
 # Caminho do banco de dados
 def get_resource_path(relative_path):
     """Retorna o caminho absoluto do recurso, priorizando arquivos locais externos"""
@@ -58,19 +70,216 @@ else:
     DB_PATH = os.path.join(BASE_DIR, "honorarios", "data", "honorarios.db")
 
 
-def get_connection():
-    """Retorna conexão com o banco de dados"""
+# === GERENCIADOR DE CONEXÕES ===
+# Cada thread mantém uma conexão aberta e reutilizada com o banco.
+# get_connection() continua com a mesma interface (conn.cursor/commit/close),
+# mas close() apenas devolve a conexão para a thread em vez de fechá-la.
+
+# False volta ao comportamento antigo (uma conexão nova por chamada)
+POOL_ATIVO = True
+
+_local = threading.local()
+_conexoes_abertas = []
+_conexoes_lock = threading.Lock()
+_epoca_pool = [0]  # incrementa em fechar_conexoes() para invalidar as threads
+
+# Valores monetários: gravados em centavos, lidos como Dinheiro nas colunas
+# declaradas DINHEIRO e nos totais com alias "nome [DINHEIRO]"
+sqlite3.register_adapter(Dinheiro, lambda d: d.centavos)
+sqlite3.register_converter("DINHEIRO", lambda b: Dinheiro.de_centavos(int(b)))
+
+
+def _abrir_conexao():
+    """Abre uma conexão nova com o banco de dados"""
     os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(DB_PATH, timeout=30, check_same_thread=False,
+                           detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES)
     conn.row_factory = sqlite3.Row
+    _garantir_esquema(conn)
     return conn
 
 
-def create_tables():
-    """Cria as tabelas do sistema"""
-    conn = get_connection()
+def _cursor(conn, modelo):
+    """Cursor cujas linhas vêm como registros do modelo (Cliente, Honorario...)"""
     cursor = conn.cursor()
-    
+    cursor.row_factory = FABRICAS[modelo]
+    return cursor
+
+
+def _conexao_da_thread():
+    """Retorna a conexão persistente da thread atual, abrindo se necessário"""
+    conn = getattr(_local, "conn", None)
+    if conn is not None and _local.caminho == DB_PATH and _local.epoca == _epoca_pool[0]:
+        return conn
+
+    # Primeira vez nesta thread (ou DB_PATH mudou, ou o pool foi fechado)
+    if conn is not None:
+        _descartar_conexao(conn)
+    conn = _abrir_conexao()
+    _local.conn = conn
+    _local.caminho = DB_PATH
+    _local.epoca = _epoca_pool[0]
+    _local.emprestimos = 0
+    with _conexoes_lock:
+        _conexoes_abertas.append(conn)
+    return conn
+
+
+def _descartar_conexao(conn):
+    with _conexoes_lock:
+        if conn in _conexoes_abertas:
+            _conexoes_abertas.remove(conn)
+    try:
+        conn.close()
+    except sqlite3.Error:
+        pass
+
+
+class _ConexaoCompartilhada:
+    """
+    Proxy da conexão da thread: close() devolve em vez de fechar.
+    commit() só grava se não havia transação aberta no empréstimo; se havia
+    (quem chamou já escreveu, ou está num transacao()), o commit fica com ela.
+    """
+
+    def __init__(self, conn):
+        object.__setattr__(self, "_conn", conn)
+        object.__setattr__(self, "_devolvida", False)
+        object.__setattr__(self, "_transacao_alheia", conn.in_transaction)
+
+    def commit(self):
+        if not self._transacao_alheia:
+            self._conn.commit()
+
+    def close(self):
+        if self._devolvida:
+            return
+        object.__setattr__(self, "_devolvida", True)
+        _local.emprestimos = max(getattr(_local, "emprestimos", 1) - 1, 0)
+        # Mesmo comportamento do close() real: o que não foi commitado é descartado
+        if _local.emprestimos == 0 and self._conn.in_transaction:
+            self._conn.rollback()
+
+    def __enter__(self):
+        return self._conn.__enter__()
+
+    def __exit__(self, *args):
+        return self._conn.__exit__(*args)
+
+    def __getattr__(self, nome):
+        return getattr(self._conn, nome)
+
+    def __setattr__(self, nome, valor):
+        setattr(self._conn, nome, valor)
+
+
+def get_connection():
+    """Retorna conexão com o banco de dados (reutilizada por thread)"""
+    if not POOL_ATIVO:
+        return _abrir_conexao()
+    conn = _conexao_da_thread()
+    _local.emprestimos = getattr(_local, "emprestimos", 0) + 1
+    return _ConexaoCompartilhada(conn)
+
+
+@contextmanager
+def transacao(imediata=False):
+    """
+    Transação explícita na conexão da thread.
+
+        with transacao() as conn:
+            conn.execute(...)
+
+    Faz commit ao sair e rollback em caso de erro. Com imediata=True usa
+    BEGIN IMMEDIATE (reserva a escrita logo no início). Transações
+    aninhadas viram SAVEPOINTs da transação externa.
+    """
+    # Dentro de outra transacao() (mesmo com o pool desligado) usa a mesma conexão
+    conn = getattr(_local, "conn_transacao", None)
+    if conn is None:
+        conn = _conexao_da_thread() if POOL_ATIVO else _abrir_conexao()
+
+    if conn.in_transaction:
+        profundidade = getattr(_local, "profundidade", 0) + 1
+        _local.profundidade = profundidade
+        savepoint = f"sp_{profundidade}"
+        conn.execute(f"SAVEPOINT {savepoint}")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute(f"ROLLBACK TO {savepoint}")
+            conn.execute(f"RELEASE {savepoint}")
+            raise
+        else:
+            conn.execute(f"RELEASE {savepoint}")
+        finally:
+            _local.profundidade = profundidade - 1
+        return
+
+    conn.execute("BEGIN IMMEDIATE" if imediata else "BEGIN")
+    _local.conn_transacao = conn
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    else:
+        conn.commit()
+    finally:
+        _local.conn_transacao = None
+        if not POOL_ATIVO:
+            conn.close()
+
+
+def fechar_conexao_thread():
+    """Fecha a conexão persistente da thread atual (fim de uma thread de trabalho)"""
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        _local.conn = None
+        _descartar_conexao(conn)
+
+
+def fechar_conexoes():
+    """
+    Fecha todas as conexões persistentes (encerramento do app).
+    Não chamar com outras threads ainda usando o banco; nelas use fechar_conexao_thread().
+    """
+    with _conexoes_lock:
+        conexoes = list(_conexoes_abertas)
+        _conexoes_abertas.clear()
+        _epoca_pool[0] += 1
+    for conn in conexoes:
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+    invalidar_cache()
+
+
+atexit.register(fechar_conexoes)
+
+
+# === MIGRAÇÕES DO ESQUEMA ===
+# O esquema é versionado com PRAGMA user_version. Cada item de MIGRACOES
+# leva o banco da versão N-1 para N; as pendentes rodam uma única vez,
+# na primeira conexão do processo com o banco. Com o esquema em dia o custo
+# é só a leitura do pragma.
+# Para alterar o esquema, acrescente uma função no fim da lista (nunca
+# edite ou reordene as que já foram publicadas).
+
+def _colunas(cursor, tabela):
+    """Nomes das colunas de uma tabela"""
+    return {row[1] for row in cursor.execute(f"PRAGMA table_info({tabela})")}
+
+
+def _adicionar_coluna(cursor, tabela, coluna, definicao):
+    """ALTER TABLE ADD COLUMN só se a coluna ainda não existir"""
+    if coluna not in _colunas(cursor, tabela):
+        cursor.execute(f"ALTER TABLE {tabela} ADD COLUMN {coluna} {definicao}")
+
+
+def _migracao_001_esquema_inicial(cursor):
+    """Tabelas do sistema e colunas adicionadas ao longo das versões"""
     # Tabela de usuários
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS usuarios (
@@ -187,61 +396,747 @@ def create_tables():
         )
     """)
     
-    # Adicionar campo cargo na tabela usuarios se não existir
-    try:
-        cursor.execute("ALTER TABLE usuarios ADD COLUMN cargo TEXT DEFAULT 'usuario'")
-    except:
-        pass
-    
-    # Adicionar campo nome na tabela usuarios se não existir
-    try:
-        cursor.execute("ALTER TABLE usuarios ADD COLUMN nome TEXT")
-    except:
-        pass
+    # Colunas que bancos antigos podem não ter
+    # status do usuário: 'ativo', 'pendente', 'bloqueado'
+    _adicionar_coluna(cursor, "usuarios", "cargo", "TEXT DEFAULT 'usuario'")
+    _adicionar_coluna(cursor, "usuarios", "nome", "TEXT")
+    _adicionar_coluna(cursor, "usuarios", "status", "TEXT DEFAULT 'ativo'")
+    _adicionar_coluna(cursor, "certificados", "pagamento_status", "TEXT DEFAULT 'PENDENTE'")
+    _adicionar_coluna(cursor, "clientes", "valor_honorario", "REAL")
+    _adicionar_coluna(cursor, "honorarios", "forma_pagamento", "TEXT")
     
-    # Adicionar campo status na tabela usuarios se não existir
-    # status: 'ativo', 'pendente', 'bloqueado'
+    # Usuário admin padrão
+    cursor.execute("SELECT COUNT(*) FROM usuarios WHERE usuario = 'admin'")
+    if cursor.fetchone()[0] == 0:
+        cursor.execute(
+            "INSERT INTO usuarios (usuario, senha, email, cargo) VALUES (?, ?, ?, ?)",
+            ("admin", "admin123", "admin@escritorio.com", "admin")
+        )
+    else:
+        cursor.execute("UPDATE usuarios SET cargo = 'admin' WHERE usuario = 'admin'")
+
+
+def _migracao_002_indices(cursor):
+    """Índices das consultas frequentes (filtros por ano/mês, cliente, status e datas)"""
+    for ddl in (
+        "CREATE INDEX IF NOT EXISTS idx_honorarios_ano_mes ON honorarios (ano, mes)",
+        "CREATE INDEX IF NOT EXISTS idx_honorarios_cliente ON honorarios (cliente_id, ano, mes)",
+        "CREATE INDEX IF NOT EXISTS idx_honorarios_status ON honorarios (status, ano)",
+        "CREATE INDEX IF NOT EXISTS idx_recibos_cliente_ref ON recibos (cliente_id, referencia_ano, referencia_mes)",
+        "CREATE INDEX IF NOT EXISTS idx_recibos_ref ON recibos (referencia_ano, referencia_mes)",
+        "CREATE INDEX IF NOT EXISTS idx_certificados_status_venc ON certificados (status, data_vencimento)",
+        "CREATE INDEX IF NOT EXISTS idx_certificados_vencimento ON certificados (data_vencimento)",
+        "CREATE INDEX IF NOT EXISTS idx_certificados_cliente ON certificados (cliente_id, ano_honorario, mes_honorario)",
+        "CREATE INDEX IF NOT EXISTS idx_logs_data ON logs_auditoria (data_hora)",
+        "CREATE INDEX IF NOT EXISTS idx_logs_usuario ON logs_auditoria (usuario, data_hora)",
+        "CREATE INDEX IF NOT EXISTS idx_logs_tabela ON logs_auditoria (tabela, data_hora)",
+        "CREATE INDEX IF NOT EXISTS idx_clientes_ativo_nome ON clientes (ativo, nome)",
+    ):
+        cursor.execute(ddl)
+
+
+def _migracao_003_honorario_unico(cursor):
+    """Um honorário por cliente/mês: remove duplicados e cria UNIQUE(cliente_id, ano, mes)"""
+    # Entre duplicados fica o PAGO (se houver) e, depois, o mais antigo
+    cursor.execute("""
+        DELETE FROM honorarios WHERE id IN (
+            SELECT id FROM (
+                SELECT id, ROW_NUMBER() OVER (
+                    PARTITION BY cliente_id, ano, mes
+                    ORDER BY status = 'PAGO' DESC, id
+                ) AS ordem
+                FROM honorarios
+            ) WHERE ordem > 1
+        )
+    """)
+    cursor.execute("DROP INDEX IF EXISTS idx_honorarios_cliente")
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS uq_honorarios_cliente_mes ON honorarios (cliente_id, ano, mes)")
+
+
+def _migracao_004_sequencias(cursor):
+    """Tabela de sequências (numeração de recibos) iniciada pelo maior número já emitido"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS sequencias (
+            nome TEXT PRIMARY KEY,
+            valor INTEGER NOT NULL
+        )
+    """)
+    cursor.execute("""
+        INSERT OR IGNORE INTO sequencias (nome, valor)
+        SELECT 'recibo', COALESCE(MAX(numero), 0) FROM recibos
+    """)
+
+
+def _sql_documentos(linha):
+    """Expressão SQL com CNPJ/CPF como digitados e só com dígitos"""
+    partes = []
+    for coluna in ("cnpj", "cpf"):
+        valor = f"COALESCE({linha}.{coluna}, '')"
+        partes += [valor, f"replace(replace(replace({valor}, '.', ''), '/', ''), '-', '')"]
+    return " || ' ' || ".join(partes)
+
+
+def _migracao_005_busca_clientes(cursor):
+    """Índice FTS5 da busca de clientes, mantido por triggers em clientes"""
     try:
-        cursor.execute("ALTER TABLE usuarios ADD COLUMN status TEXT DEFAULT 'ativo'")
-    except:
-        pass
+        cursor.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS clientes_busca USING fts5(
+                nome, codigo_interno, documentos, email,
+                tokenize = "unicode61 remove_diacritics 2"
+            )
+        """)
+    except sqlite3.OperationalError:
+        # SQLite sem FTS5: buscar_clientes() usa LIKE
+        return
+    
+    cursor.execute("DELETE FROM clientes_busca")
+    cursor.execute(f"""
+        INSERT INTO clientes_busca (rowid, nome, codigo_interno, documentos, email)
+        SELECT id, nome, codigo_interno, {_sql_documentos('clientes')}, email FROM clientes
+    """)
+    inserir = f"""
+        INSERT INTO clientes_busca (rowid, nome, codigo_interno, documentos, email)
+        VALUES (new.id, new.nome, new.codigo_interno, {_sql_documentos('new')}, new.email);
+    """
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_clientes_busca_ins AFTER INSERT ON clientes BEGIN
+            {inserir}
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_clientes_busca_upd
+        AFTER UPDATE OF id, nome, codigo_interno, cnpj, cpf, email ON clientes BEGIN
+            DELETE FROM clientes_busca WHERE rowid = old.id;
+            {inserir}
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_clientes_busca_del AFTER DELETE ON clientes BEGIN
+            DELETE FROM clientes_busca WHERE rowid = old.id;
+        END
+    """)
+
+
+def _converter_para_centavos(cursor, tabela, coluna, obrigatoria=True):
+    """
+    Troca a coluna REAL em reais por DINHEIRO INTEGER em centavos. O CHECK só
+    barra float com fração (99.9): a afinidade INTEGER converte 340.0 em 340
+    antes dele, e o valor seria lido como R$ 3,40. Por isso os valores sempre
+    entram como Dinheiro (as funções deste módulo convertem os reais recebidos).
+    """
+    tipo = {row['name']: row['type'] for row in cursor.execute(f"PRAGMA table_info({tabela})")}
+    if tipo.get(coluna, "").upper().startswith("DINHEIRO"):
+        return
     
-    # Adicionar campo pagamento_status na tabela certificados se não existir
-    try:
-        cursor.execute("ALTER TABLE certificados ADD COLUMN pagamento_status TEXT DEFAULT 'PENDENTE'")
-    except:
-        pass
+    if obrigatoria:
+        definicao = f"{coluna} DINHEIRO INTEGER NOT NULL DEFAULT 0 CHECK (typeof({coluna}) = 'integer')"
+    else:
+        definicao = f"{coluna} DINHEIRO INTEGER CHECK (typeof({coluna}) IN ('integer', 'null'))"
+    convertida = f"CAST(ROUND({coluna} * 100) AS INTEGER)"
+    _recriar_tabela(cursor, tabela, coluna, definicao, convertida)
+
+
+def _recriar_tabela(cursor, tabela, coluna, definicao, expressao):
+    """
+    Troca a definição de uma coluna recriando a tabela (criar nova, copiar,
+    apagar, renomear), o caminho do SQLite para mudar o tipo de uma coluna:
+    ALTER TABLE ... DROP COLUMN só existe a partir do SQLite 3.35, mais novo
+    que o de algumas instalações do Python no Windows. Índices, triggers e o
+    contador do AUTOINCREMENT voltam como estavam; os valores da coluna
+    passam por `expressao`. Roda dentro da transação de migrar().
+    """
+    sql = cursor.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (tabela,)
+    ).fetchone()['sql']
+    antiga = re.compile(rf"\b{coluna}\s+REAL\b(?:\s+NOT\s+NULL|\s+DEFAULT\s+[\w.'-]+)*", re.IGNORECASE)
+    if len(antiga.findall(sql)) != 1:
+        raise sqlite3.OperationalError(f"Migração: definição inesperada de {tabela}.{coluna}: {sql}")
+    nova = f"{tabela}_nova"
+    sql_nova = antiga.sub(definicao, sql).replace(
+        re.match(r"\s*CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?\S+", sql, re.IGNORECASE).group(0),
+        f"CREATE TABLE {nova}", 1)
+    
+    dependentes = [row['sql'] for row in cursor.execute(
+        "SELECT sql FROM sqlite_master WHERE tbl_name = ? AND type IN ('index', 'trigger') AND sql IS NOT NULL",
+        (tabela,)
+    )]
+    contador = cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (tabela,)).fetchone()
+    colunas = [row['name'] for row in cursor.execute(f"PRAGMA table_info({tabela})")]
+    
+    cursor.execute(sql_nova)
+    cursor.execute(f"""
+        INSERT INTO {nova} ({", ".join(colunas)})
+        SELECT {", ".join(expressao if c == coluna else c for c in colunas)} FROM {tabela}
+    """)
+    cursor.execute(f"DROP TABLE {tabela}")
+    cursor.execute(f"ALTER TABLE {nova} RENAME TO {tabela}")
+    for comando in dependentes:
+        cursor.execute(comando)
+    if contador is not None:
+        cursor.execute("UPDATE sqlite_sequence SET seq = ? WHERE name = ?", (contador['seq'], tabela))
+
+
+def _migracao_006_valores_em_centavos(cursor):
+    """Valores monetários em centavos inteiros (somas exatas, sem float)"""
+    _converter_para_centavos(cursor, "honorarios", "valor")
+    _converter_para_centavos(cursor, "recibos", "valor")
+    _converter_para_centavos(cursor, "valores_honorarios", "valor")
+    _converter_para_centavos(cursor, "certificados", "valor")
+    _converter_para_centavos(cursor, "clientes", "valor_honorario", obrigatoria=False)
+
+
+def _migracao_007_resumo_honorarios(cursor):
+    """Totais de honorários por ano/mês/status/forma, mantidos por triggers"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS honorarios_resumo (
+            ano INTEGER NOT NULL,
+            mes INTEGER NOT NULL,
+            status TEXT NOT NULL,
+            forma_pagamento TEXT NOT NULL,
+            qtd INTEGER NOT NULL,
+            total DINHEIRO INTEGER NOT NULL,
+            PRIMARY KEY (ano, mes, status, forma_pagamento)
+        ) WITHOUT ROWID
+    """)
+    _recalcular_resumo(cursor)
     
-    # Adicionar campo valor_honorario na tabela clientes se não existir
+    somar = """
+        INSERT INTO honorarios_resumo (ano, mes, status, forma_pagamento, qtd, total)
+        VALUES (new.ano, new.mes, COALESCE(new.status, ''), COALESCE(new.forma_pagamento, ''), 1, new.valor)
+        ON CONFLICT (ano, mes, status, forma_pagamento)
+        DO UPDATE SET qtd = qtd + 1, total = total + excluded.total;
+    """
+    chave_antiga = """
+        ano = old.ano AND mes = old.mes AND status = COALESCE(old.status, '')
+        AND forma_pagamento = COALESCE(old.forma_pagamento, '')
+    """
+    subtrair = f"""
+        UPDATE honorarios_resumo SET qtd = qtd - 1, total = total - old.valor WHERE {chave_antiga};
+        DELETE FROM honorarios_resumo WHERE {chave_antiga} AND qtd = 0;
+    """
+    cursor.execute(f"CREATE TRIGGER IF NOT EXISTS trg_honorarios_resumo_ins AFTER INSERT ON honorarios BEGIN {somar} END")
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_honorarios_resumo_upd
+        AFTER UPDATE OF ano, mes, status, forma_pagamento, valor ON honorarios BEGIN
+            {subtrair}
+            {somar}
+        END
+    """)
+    cursor.execute(f"CREATE TRIGGER IF NOT EXISTS trg_honorarios_resumo_del AFTER DELETE ON honorarios BEGIN {subtrair} END")
+
+
+def _recalcular_resumo(cursor, anos=None):
+    """Refaz honorarios_resumo a partir de honorarios (só dos anos da subconsulta `anos`, se dada)"""
+    onde = f" WHERE ano IN ({anos})" if anos else ""
+    cursor.execute(f"DELETE FROM honorarios_resumo{onde}")
+    cursor.execute(f"""
+        INSERT INTO honorarios_resumo (ano, mes, status, forma_pagamento, qtd, total)
+        SELECT ano, mes, COALESCE(status, ''), COALESCE(forma_pagamento, ''), COUNT(*), SUM(valor)
+        FROM honorarios{onde}
+        GROUP BY ano, mes, COALESCE(status, ''), COALESCE(forma_pagamento, '')
+    """)
+
+
+def _migracao_008_alteracoes(cursor):
+    """Registro de alterações (I/U/D por tabela e id), preenchido por triggers"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS alteracoes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            tabela TEXT NOT NULL,
+            registro_id INTEGER NOT NULL,
+            operacao TEXT NOT NULL
+        )
+    """)
+    for tabela in TABELAS_ALTERACOES:
+        for evento, operacao, linha in (("INSERT", "I", "new"), ("UPDATE", "U", "new"), ("DELETE", "D", "old")):
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{tabela}_alteracoes_{operacao.lower()}
+                AFTER {evento} ON {tabela} BEGIN
+                    INSERT INTO alteracoes (tabela, registro_id, operacao) VALUES ('{tabela}', {linha}.id, '{operacao}');
+                END
+            """)
+
+
+def _migracao_009_tarefas(cursor):
+    """Tarefas em segundo plano (recibos, exportações, importações): situação, resultado e erro"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS tarefas (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nome TEXT NOT NULL,
+            usuario TEXT,
+            status TEXT NOT NULL,
+            inicio TEXT NOT NULL,
+            fim TEXT,
+            feitos INTEGER DEFAULT 0,
+            total INTEGER,
+            resultado TEXT,
+            erro TEXT
+        )
+    """)
+
+
+def _migracao_010_vencimento_honorarios(cursor):
+    """Índice pelo vencimento efetivo dos honorários (agenda de cobranças)"""
+    cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_honorarios_vencimento ON honorarios ({VENCIMENTO_HONORARIO})")
+
+
+def _migracao_011_lote_honorarios(cursor):
+    """
+    Marca de lote (uma linha) que os gatilhos de INSERT em honorarios
+    consultam: com ativo = 1 eles não disparam (ver lote_honorarios)
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS honorarios_lote (
+            ativo INTEGER NOT NULL CHECK (ativo IN (0, 1))
+        )
+    """)
+    cursor.execute("INSERT INTO honorarios_lote (ativo) SELECT 0 WHERE NOT EXISTS (SELECT 1 FROM honorarios_lote)")
+    fora_do_lote = "WHEN NOT (SELECT ativo FROM honorarios_lote)"
+    cursor.execute("DROP TRIGGER IF EXISTS trg_honorarios_resumo_ins")
+    cursor.execute(f"""
+        CREATE TRIGGER trg_honorarios_resumo_ins AFTER INSERT ON honorarios {fora_do_lote} BEGIN
+            INSERT INTO honorarios_resumo (ano, mes, status, forma_pagamento, qtd, total)
+            VALUES (new.ano, new.mes, COALESCE(new.status, ''), COALESCE(new.forma_pagamento, ''), 1, new.valor)
+            ON CONFLICT (ano, mes, status, forma_pagamento)
+            DO UPDATE SET qtd = qtd + 1, total = total + excluded.total;
+        END
+    """)
+    cursor.execute("DROP TRIGGER IF EXISTS trg_honorarios_alteracoes_i")
+    cursor.execute(f"""
+        CREATE TRIGGER trg_honorarios_alteracoes_i AFTER INSERT ON honorarios {fora_do_lote} BEGIN
+            INSERT INTO alteracoes (tabela, registro_id, operacao) VALUES ('honorarios', new.id, 'I');
+        END
+    """)
+
+
+# Vencimento efetivo: o data_vencimento do honorário ou, sem ele, o dia 10 do
+# mês seguinte ao de referência. O 13º (mês 13) só vence com data própria.
+# As consultas usam esta mesma expressão para aproveitar o índice.
+VENCIMENTO_HONORARIO = "COALESCE(data_vencimento, date(printf('%04d-%02d-10', ano, mes), '+1 month'))"
+
+# Tabelas acompanhadas pelo registro de alterações
+TABELAS_ALTERACOES = ("clientes", "honorarios", "recibos", "certificados", "valores_honorarios")
+
+MIGRACOES = [
+    _migracao_001_esquema_inicial,
+    _migracao_002_indices,
+    _migracao_003_honorario_unico,
+    _migracao_004_sequencias,
+    _migracao_005_busca_clientes,
+    _migracao_006_valores_em_centavos,
+    _migracao_007_resumo_honorarios,
+    _migracao_008_alteracoes,
+    _migracao_009_tarefas,
+    _migracao_010_vencimento_honorarios,
+    _migracao_011_lote_honorarios,
+]
+
+_caminhos_migrados = set()
+_migracao_lock = threading.Lock()
+
+
+def versao_esquema(conn):
+    """Versão atual do esquema gravada no banco"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrar(conn=None):
+    """Aplica as migrações pendentes. Retorna a versão final do esquema."""
+    fechar = conn is None
+    if conn is None:
+        conn = _abrir_conexao()
     try:
-        cursor.execute("ALTER TABLE clientes ADD COLUMN valor_honorario REAL")
-    except:
-        pass
+        versao = versao_esquema(conn)
+        if versao >= len(MIGRACOES):
+            return versao
+        
+        # BEGIN IMMEDIATE: outra estação migrando ao mesmo tempo espera aqui
+        if conn.in_transaction:
+            conn.commit()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            versao = versao_esquema(conn)
+            cursor = conn.cursor()
+            for numero in range(versao + 1, len(MIGRACOES) + 1):
+                MIGRACOES[numero - 1](cursor)
+                cursor.execute(f"PRAGMA user_version = {numero}")
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        invalidar_cache()
+        return versao_esquema(conn)
+    finally:
+        if fechar:
+            conn.close()
+
+
+def _garantir_esquema(conn):
+    """Roda migrar() na primeira conexão do processo com cada banco"""
+    if DB_PATH in _caminhos_migrados:
+        return
+    with _migracao_lock:
+        if DB_PATH not in _caminhos_migrados:
+            migrar(conn)
+            _caminhos_migrados.add(DB_PATH)
+
+
+def create_tables():
+    """Mantido por compatibilidade: garante o esquema atualizado"""
+    migrar()
+
+
+def criar_usuario_inicial():
+    """Mantido por compatibilidade: o admin padrão é criado pela migração 1"""
+    migrar()
+
+
+# === CACHE DE CONSULTAS ===
+# Leituras frequentes (listar_clientes, listar_honorarios...) guardam o
+# resultado em memória, indexado por função e argumentos. Cada tabela tem um
+# contador de geração que as funções de escrita incrementam; um resultado só
+# é reaproveitado se as gerações das tabelas de que ele depende não mudaram.
+# Escritas com SQL direto (telas, scripts, outras estações) aparecem no
+# registro de alterações, conferido antes de usar o cache a cada
+# VALIDADE_CACHE segundos; invalidar_cache(tabela) vale na hora.
+# Os resultados são compartilhados: os registros são somente leitura e
+# listas e dicts voltam como cópias.
+
+# False desliga o cache (toda leitura vai ao banco)
+CACHE_ATIVO = True
+CACHE_LIMITE_BYTES = 32 * 1024 * 1024
+VALIDADE_CACHE = 2.0  # segundos entre conferências do registro de alterações (como o monitor)
+
+_geracoes = {}                    # tabela -> geração
+_cache_consultas = OrderedDict()  # chave -> (gerações, resultado, bytes), do menos ao mais recente
+_cache_bytes = [0]
+_cache_conferido = {}             # DB_PATH -> (último seq do registro já refletido, momento da conferência)
+_cache_lock = threading.Lock()
+
+
+def invalidar_cache(*tabelas):
+    """Marca as tabelas como alteradas. Sem argumentos descarta todo o cache."""
+    with _cache_lock:
+        if not tabelas:
+            _cache_consultas.clear()
+            _cache_bytes[0] = 0
+            tabelas = list(_geracoes)
+        for tabela in tabelas:
+            _geracoes[tabela] = _geracoes.get(tabela, 0) + 1
+
+
+def _conferir_registro_do_cache():
+    """
+    Invalida as tabelas que o registro de alterações mostra alteradas desde
+    a conferência anterior (no máximo uma a cada VALIDADE_CACHE segundos).
+    """
+    agora = time.monotonic()
+    with _cache_lock:
+        seq, conferido = _cache_conferido.get(DB_PATH, (None, None))
+        if conferido is not None and agora - conferido < VALIDADE_CACHE:
+            return
+        _cache_conferido[DB_PATH] = (seq, agora)
     
-    # Adicionar campo forma_pagamento na tabela honorarios se não existir
+    conn = get_connection()
     try:
-        cursor.execute("ALTER TABLE honorarios ADD COLUMN forma_pagamento TEXT")
-    except:
-        pass
+        limites = conn.execute("""
+            SELECT (SELECT MIN(seq) FROM alteracoes) AS primeira, (SELECT MAX(seq) FROM alteracoes) AS ultima
+        """).fetchone()
+        ultima = limites['ultima'] or 0
+        if seq is None or (limites['primeira'] is not None and seq < limites['primeira'] - 1):
+            tabelas = None  # sem referência (ou já podada): não dá para saber o que mudou
+        else:
+            tabelas = [row['tabela'] for row in conn.execute(
+                "SELECT DISTINCT tabela FROM alteracoes WHERE seq > ? AND seq <= ?", (seq, ultima)
+            )]
+    finally:
+        conn.close()
     
-    conn.commit()
+    if tabelas is None:
+        invalidar_cache()
+    elif tabelas:
+        invalidar_cache(*tabelas)
+    with _cache_lock:
+        _cache_conferido[DB_PATH] = (max(ultima, seq or 0), agora)
+
+
+def _copia_do_cache(resultado):
+    """O que o cache entrega: registros e Rows são imutáveis, listas e dicts não"""
+    if isinstance(resultado, list):
+        return list(resultado)
+    if isinstance(resultado, dict):
+        return copy.deepcopy(resultado)
+    return resultado
+
+
+def _tamanho_aproximado(resultado):
+    """Bytes ocupados pelo resultado, estimados por uma amostra das linhas"""
+    linhas = resultado if isinstance(resultado, list) else [resultado]
+    amostra = linhas[:20]
+    if not amostra:
+        return sys.getsizeof(linhas)
+    por_linha = sum(
+        sys.getsizeof(linha) + sum(sys.getsizeof(v) for v in linha)
+        if isinstance(linha, (sqlite3.Row, Registro, tuple)) else sys.getsizeof(linha)
+        for linha in amostra
+    ) / len(amostra)
+    return sys.getsizeof(linhas) + int(por_linha * len(linhas))
+
+
+def _em_cache(*tabelas):
+    """Decorador: guarda o resultado da função até uma das tabelas mudar"""
+    def decorador(funcao):
+        @wraps(funcao)
+        def funcao_com_cache(*args, **kwargs):
+            if not CACHE_ATIVO:
+                return funcao(*args, **kwargs)
+            chave = (DB_PATH, funcao.__name__, args, tuple(sorted(kwargs.items())))
+            try:
+                hash(chave)
+            except TypeError:
+                return funcao(*args, **kwargs)
+            
+            _conferir_registro_do_cache()
+            with _cache_lock:
+                geracoes = tuple(_geracoes.get(t, 0) for t in tabelas)
+                item = _cache_consultas.get(chave)
+                if item is not None and item[0] == geracoes:
+                    _cache_consultas.move_to_end(chave)
+                    return _copia_do_cache(item[1])
+            
+            # Gerações lidas antes da consulta: uma escrita no meio invalida o resultado
+            resultado = funcao(*args, **kwargs)
+            tamanho = _tamanho_aproximado(resultado)
+            with _cache_lock:
+                antigo = _cache_consultas.pop(chave, None)
+                if antigo is not None:
+                    _cache_bytes[0] -= antigo[2]
+                if tamanho <= CACHE_LIMITE_BYTES:
+                    _cache_consultas[chave] = (geracoes, resultado, tamanho)
+                    _cache_bytes[0] += tamanho
+                    while _cache_bytes[0] > CACHE_LIMITE_BYTES:
+                        _, (_, _, liberado) = _cache_consultas.popitem(last=False)
+                        _cache_bytes[0] -= liberado
+            return _copia_do_cache(resultado)
+        
+        funcao_com_cache.sem_cache = funcao
+        return funcao_com_cache
+    return decorador
+
+
+# === REGISTRO DE ALTERAÇÕES ===
+# Triggers gravam em `alteracoes` cada INSERT/UPDATE/DELETE das tabelas de
+# TABELAS_ALTERACOES, com um seq crescente. Uma tela guarda o último seq que
+# já mostrou e pede só o que mudou depois dele (alteracoes_desde), inclusive
+# o que outra estação gravou no mesmo arquivo. O monitor consulta o registro
+# a cada poucos segundos, invalida o cache das tabelas alteradas e avisa os
+# observadores.
+
+ALTERACOES_MANTIDAS = 50000   # podar_alteracoes() apaga as mais antigas
+LIMITE_ALTERACOES = 1000      # acima disso é mais barato recarregar tudo
+INTERVALO_MONITOR = 2.0       # segundos entre consultas do monitor
+
+_observadores_alteracoes = {}  # chave -> funcao(alteracoes)
+_ultima_vista = {}             # DB_PATH -> último seq entregue aos observadores
+_monitor_alteracoes = [None, None]  # (thread, evento de parada)
+_monitor_lock = threading.Lock()
+
+
+def ultima_alteracao():
+    """seq da alteração mais recente (0 se não houver)"""
+    conn = get_connection()
+    row = conn.execute("SELECT MAX(seq) AS seq FROM alteracoes").fetchone()
     conn.close()
+    return row['seq'] or 0
 
 
-def criar_usuario_inicial():
-    """Cria usuário admin padrão se não existir"""
+def alteracoes_desde(seq, tabelas=None, limite=LIMITE_ALTERACOES):
+    """
+    Alterações com seq maior que o informado, em ordem: linhas com seq,
+    tabela, registro_id e operacao ('I', 'U' ou 'D'). Retorna None quando
+    há mais de `limite` alterações, o seq já foi podado ou houve uma
+    operação em lote ('*', lote_honorarios): recarregue tudo.
+    """
     conn = get_connection()
-    cursor = conn.cursor()
+    try:
+        primeira = conn.execute("SELECT MIN(seq) AS seq FROM alteracoes").fetchone()['seq']
+        if primeira is not None and seq < primeira - 1:
+            return None
+        
+        query = "SELECT seq, tabela, registro_id, operacao FROM alteracoes WHERE seq > ?"
+        params = [seq]
+        if tabelas:
+            query += f" AND tabela IN ({', '.join('?' * len(tabelas))})"
+            params += list(tabelas)
+        query += " ORDER BY seq"
+        if limite:
+            query += " LIMIT ?"
+            params.append(limite + 1)
+        
+        alteracoes = conn.execute(query, params).fetchall()
+    finally:
+        conn.close()
+    if limite and len(alteracoes) > limite:
+        return None
+    if any(a['operacao'] == '*' for a in alteracoes):
+        return None
+    return alteracoes
+
+
+def podar_alteracoes(manter=ALTERACOES_MANTIDAS):
+    """Apaga as alterações antigas, mantendo as `manter` mais recentes. Retorna quantas apagou."""
+    with transacao() as conn:
+        cursor = conn.execute("""
+            DELETE FROM alteracoes WHERE seq <= (SELECT MAX(seq) FROM alteracoes) - ?
+        """, (manter,))
+        return cursor.rowcount
+
+
+@contextmanager
+def lote_honorarios(conn):
+    """
+    INSERT em massa em honorarios, dentro de uma transacao(), sem os gatilhos
+    por linha de INSERT (a marca em honorarios_lote fica ligada só nesta
+    transação; o esquema não muda). Ao sair, o resumo dos anos que ganharam
+    honorários é refeito numa consulta só e o registro de alterações ganha
+    uma única linha '*' (alteracoes_desde devolve None: os observadores
+    recarregam tudo). Só para inserções: UPDATE/DELETE continuam por linha.
+    """
+    assert conn.in_transaction, "lote_honorarios() precisa de uma transação"
+    ultimo_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM honorarios").fetchone()[0]
+    conn.execute("UPDATE honorarios_lote SET ativo = 1")
+    try:
+        yield
+    finally:
+        # Num erro o rollback da transação também desfaria a marca
+        conn.execute("UPDATE honorarios_lote SET ativo = 0")
+    if conn.execute("SELECT 1 FROM honorarios WHERE id > ? LIMIT 1", (ultimo_id,)).fetchone():
+        _recalcular_resumo(conn, anos=f"SELECT DISTINCT ano FROM honorarios WHERE id > {int(ultimo_id)}")
+        conn.execute("INSERT INTO alteracoes (tabela, registro_id, operacao) VALUES ('honorarios', 0, '*')")
+
+
+def adicionar_observador_alteracoes(funcao, chave=None):
+    """
+    Registra funcao(alteracoes), chamada pelo monitor quando o registro muda
+    (alteracoes=None: mudou demais, recarregue tudo). Registrar de novo com
+    a mesma chave substitui o observador anterior.
+    """
+    _observadores_alteracoes[chave if chave is not None else funcao] = funcao
+
+
+def remover_observador_alteracoes(chave):
+    """Remove um observador pela chave (ou pela própria função)"""
+    _observadores_alteracoes.pop(chave, None)
+
+
+def observador_alteracoes(chave):
+    """Observador registrado com a chave (None se não houver)"""
+    return _observadores_alteracoes.get(chave)
+
+
+def verificar_alteracoes():
+    """
+    Lê o que mudou desde a última verificação, invalida o cache das tabelas
+    alteradas e avisa os observadores. Retorna as alterações (ou None).
+    """
+    ultima = _ultima_vista.get(DB_PATH)
+    if ultima is None:
+        _ultima_vista[DB_PATH] = ultima_alteracao()
+        return []
+    
+    alteracoes = alteracoes_desde(ultima)
+    if alteracoes is None:
+        _ultima_vista[DB_PATH] = ultima_alteracao()
+        invalidar_cache(*TABELAS_ALTERACOES)
+    elif alteracoes:
+        _ultima_vista[DB_PATH] = alteracoes[-1]['seq']
+        invalidar_cache(*{a['tabela'] for a in alteracoes})
+    else:
+        return alteracoes
     
-    cursor.execute("SELECT COUNT(*) FROM usuarios WHERE usuario = 'admin'")
-    if cursor.fetchone()[0] == 0:
-        cursor.execute(
-            "INSERT INTO usuarios (usuario, senha, email, cargo) VALUES (?, ?, ?, ?)",
-            ("admin", "admin123", "admin@escritorio.com", "admin")
+    for funcao in list(_observadores_alteracoes.values()):
+        try:
+            funcao(alteracoes)
+        except Exception as ex:
+            print(f"[ALTERACOES] Erro no observador {funcao}: {ex}", file=sys.stderr)
+    return alteracoes
+
+
+def _loop_monitor_alteracoes(parar, intervalo):
+    try:
+        while not parar.wait(intervalo):
+            try:
+                verificar_alteracoes()
+            except sqlite3.Error as ex:
+                print(f"[ALTERACOES] Falha ao consultar alterações: {ex}", file=sys.stderr)
+    finally:
+        fechar_conexao_thread()
+
+
+def iniciar_monitor_alteracoes(intervalo=INTERVALO_MONITOR):
+    """Inicia (uma vez) a thread que chama verificar_alteracoes() periodicamente"""
+    with _monitor_lock:
+        thread = _monitor_alteracoes[0]
+        if thread is not None and thread.is_alive():
+            return
+        verificar_alteracoes()  # marca o ponto de partida
+        parar = threading.Event()
+        thread = threading.Thread(target=_loop_monitor_alteracoes, args=(parar, intervalo),
+                                  name="monitor-alteracoes", daemon=True)
+        thread.start()
+        _monitor_alteracoes[:] = [thread, parar]
+
+
+def parar_monitor_alteracoes(timeout=5):
+    """Para a thread do monitor"""
+    with _monitor_lock:
+        thread, parar = _monitor_alteracoes
+        if thread is None:
+            return
+        parar.set()
+        thread.join(timeout)
+        _monitor_alteracoes[:] = [None, None]
+
+
+# === TAREFAS EM SEGUNDO PLANO ===
+# Histórico das tarefas longas rodadas fora da thread da tela (utils/tarefas.py):
+# uma linha por tarefa, gravada ao começar e atualizada ao terminar.
+
+def registrar_tarefa(nome, usuario=None, total=None):
+    """Grava o início de uma tarefa (status RODANDO). Retorna o id."""
+    agora = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    with transacao() as conn:
+        cursor = conn.execute(
+            "INSERT INTO tarefas (nome, usuario, status, inicio, total) VALUES (?, ?, 'RODANDO', ?, ?)",
+            (nome, usuario, agora, total)
         )
-        conn.commit()
-    
+        return cursor.lastrowid
+
+
+def finalizar_tarefa(tarefa_id, status, feitos=None, total=None, resultado=None, erro=None):
+    """Grava como a tarefa terminou: CONCLUIDA, CANCELADA ou ERRO"""
+    agora = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    with transacao() as conn:
+        conn.execute("""
+            UPDATE tarefas SET status = ?, fim = ?, feitos = COALESCE(?, feitos),
+                   total = COALESCE(?, total), resultado = ?, erro = ?
+            WHERE id = ?
+        """, (status, agora, feitos, total, resultado, erro, tarefa_id))
+
+
+def listar_tarefas(limite=50, status=None):
+    """Tarefas mais recentes primeiro"""
+    conn = get_connection()
+    query = "SELECT * FROM tarefas"
+    params = []
+    if status:
+        query += " WHERE status = ?"
+        params.append(status)
+    query += " ORDER BY id DESC LIMIT ?"
+    params.append(limite)
+    tarefas = conn.execute(query, params).fetchall()
     conn.close()
+    return tarefas
 
 
 # === FUNÇÕES DE USUÁRIOS ===
@@ -349,24 +1244,15 @@ def atualizar_status_usuario(usuario_id, novo_status):
     conn.commit()
     conn.close()
 
-def registrar_log(usuario, acao, tabela=None, registro_id=None, detalhes=None):
-    """Registra uma ação no log de auditoria"""
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
-        INSERT INTO logs_auditoria (usuario, acao, tabela, registro_id, detalhes)
-        VALUES (?, ?, ?, ?, ?)
-    """, (usuario, acao, tabela, registro_id, detalhes))
-    conn.commit()
-    conn.close()
 
 
 # === FUNÇÕES DE CLIENTES ===
 
+@_em_cache("clientes")
 def listar_clientes(ativo=True):
     """Lista todos os clientes"""
     conn = get_connection()
-    cursor = conn.cursor()
+    cursor = _cursor(conn, Cliente)
     cursor.execute("SELECT * FROM clientes WHERE ativo = ? ORDER BY nome", (1 if ativo else 0,))
     clientes = cursor.fetchall()
     conn.close()
@@ -380,10 +1266,11 @@ def adicionar_cliente(nome, cnpj=None, cpf=None, endereco=None, telefone=None, e
     cursor.execute("""
         INSERT INTO clientes (codigo_interno, nome, cnpj, cpf, endereco, telefone, email, valor_honorario)
         VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-    """, (codigo_interno, nome, cnpj, cpf, endereco, telefone, email, valor_honorario))
+    """, (codigo_interno, nome, cnpj, cpf, endereco, telefone, email, Dinheiro.de_reais(valor_honorario)))
     conn.commit()
     cliente_id = cursor.lastrowid
     conn.close()
+    invalidar_cache("clientes")
     return cliente_id
 
 
@@ -395,15 +1282,87 @@ def atualizar_cliente(cliente_id, nome, cnpj=None, cpf=None, endereco=None, tele
         UPDATE clientes 
         SET codigo_interno=?, nome=?, cnpj=?, cpf=?, endereco=?, telefone=?, email=?, valor_honorario=?
         WHERE id=?
-    """, (codigo_interno, nome, cnpj, cpf, endereco, telefone, email, valor_honorario, cliente_id))
+    """, (codigo_interno, nome, cnpj, cpf, endereco, telefone, email, Dinheiro.de_reais(valor_honorario), cliente_id))
     conn.commit()
     conn.close()
+    invalidar_cache("clientes")
+
+
+def _termos_busca(texto):
+    """Palavras do texto de busca (letras e dígitos)"""
+    return re.findall(r"\w+", texto or "")
+
+
+def _expressao_busca(termos):
+    """Expressão MATCH do FTS5: todas as palavras, cada uma pelo início"""
+    return " ".join(f'"{t}"*' for t in termos)
+
+
+@_em_cache("clientes")
+def buscar_clientes(texto, limite=50, ativo=True):
+    """
+    Busca clientes por nome, código interno, CNPJ/CPF (com ou sem pontuação)
+    e email. Sem diferenciar acentos/maiúsculas; cada palavra casa pelo início.
+    Texto vazio lista os clientes por nome. ativo=None inclui os inativos.
+    """
+    termos = _termos_busca(texto)
+    conn = get_connection()
+    try:
+        if not termos:
+            query = "SELECT * FROM clientes WHERE 1=1"
+            params = []
+            if ativo is not None:
+                query += " AND ativo = ?"
+                params.append(1 if ativo else 0)
+            query += " ORDER BY nome"
+        else:
+            query = """
+                SELECT c.* FROM clientes_busca b
+                JOIN clientes c ON c.id = b.rowid
+                WHERE b.clientes_busca MATCH ?
+            """
+            params = [_expressao_busca(termos)]
+            if ativo is not None:
+                query += " AND c.ativo = ?"
+                params.append(1 if ativo else 0)
+            query += " ORDER BY b.rank, c.nome"
+        
+        if limite:
+            query += " LIMIT ?"
+            params.append(limite)
+        
+        try:
+            return _cursor(conn, Cliente).execute(query, params).fetchall()
+        except sqlite3.OperationalError:
+            if not termos:
+                raise
+            return _buscar_clientes_like(conn, termos, limite, ativo)
+    finally:
+        conn.close()
 
 
+def _buscar_clientes_like(conn, termos, limite, ativo):
+    """Busca sem FTS5 (SQLite compilado sem o módulo): LIKE por palavra"""
+    query = "SELECT * FROM clientes WHERE 1=1"
+    params = []
+    for termo in termos:
+        query += " AND (nome LIKE ? OR codigo_interno LIKE ? OR cnpj LIKE ? OR cpf LIKE ? OR email LIKE ?)"
+        params += [f"%{termo}%"] * 5
+    if ativo is not None:
+        query += " AND ativo = ?"
+        params.append(1 if ativo else 0)
+    query += " ORDER BY nome"
+    if limite:
+        query += " LIMIT ?"
+        params.append(limite)
+    return _cursor(conn, Cliente).execute(query, params).fetchall()
+
+
+@_em_cache("clientes")
 def buscar_cliente(cliente_id):
     """Busca um cliente pelo ID"""
     conn = get_connection()
-    cursor = conn.cursor()
+    cursor = _cursor(conn, Cliente)
     cursor.execute("SELECT * FROM clientes WHERE id = ?", (cliente_id,))
     cliente = cursor.fetchone()
     conn.close()
@@ -412,10 +1371,11 @@ def buscar_cliente(cliente_id):
 
 # === FUNÇÕES DE HONORÁRIOS ===
 
+@_em_cache("honorarios", "clientes")
 def listar_honorarios(ano=None, cliente_id=None, status=None):
     """Lista honorários com filtros opcionais"""
     conn = get_connection()
-    cursor = conn.cursor()
+    cursor = _cursor(conn, Honorario)
     
     query = """
         SELECT h.*, c.nome as cliente_nome 
@@ -445,19 +1405,135 @@ def listar_honorarios(ano=None, cliente_id=None, status=None):
     return honorarios
 
 
-def adicionar_honorario(cliente_id, ano, mes, valor, data_vencimento=None, observacao=None):
-    """Adiciona um novo honorário"""
+def _filtros_honorarios_ano(ano, mes=None, status=None, busca=None, usar_fts=True):
+    """WHERE das listagens de um ano (h = honorarios, c = clientes)"""
+    query = " WHERE h.ano = ?"
+    params = [ano]
+    
+    if mes:
+        query += " AND h.mes = ?"
+        params.append(mes)
+    
+    if status:
+        query += " AND h.status = ?"
+        params.append(status)
+    
+    termos = _termos_busca(busca)
+    if termos and usar_fts:
+        query += " AND h.cliente_id IN (SELECT rowid FROM clientes_busca WHERE clientes_busca MATCH ?)"
+        params.append(_expressao_busca(termos))
+    elif termos:
+        for termo in termos:
+            query += " AND (c.nome LIKE ? OR c.codigo_interno LIKE ? OR c.cnpj LIKE ? OR c.cpf LIKE ? OR c.email LIKE ?)"
+            params += [f"%{termo}%"] * 5
+    
+    return query, params
+
+
+def _consultar_honorarios_ano(colunas, ano, mes, status, busca, fim="", params_fim=(), modelo=None):
+    """SELECT com os filtros do ano; sem FTS5 no SQLite a busca cai para LIKE"""
     conn = get_connection()
-    cursor = conn.cursor()
+    try:
+        for usar_fts in (True, False):
+            where, params = _filtros_honorarios_ano(ano, mes, status, busca, usar_fts)
+            query = f"SELECT {colunas} FROM honorarios h JOIN clientes c ON h.cliente_id = c.id{where}{fim}"
+            cursor = _cursor(conn, modelo) if modelo else conn.cursor()
+            try:
+                return cursor.execute(query, params + list(params_fim)).fetchall()
+            except sqlite3.OperationalError:
+                if not usar_fts or not _termos_busca(busca):
+                    raise
+    finally:
+        conn.close()
+
+
+@_em_cache("honorarios", "clientes")
+def contar_honorarios_ano(ano, mes=None, status=None, busca=None):
+    """Quantos honorários do ano passam pelos filtros (mês, status, busca por cliente)"""
+    return _consultar_honorarios_ano("COUNT(*) AS total", ano, mes, status, busca)[0]['total']
+
+
+@_em_cache("honorarios", "clientes")
+def listar_honorarios_pagina(ano, mes=None, status=None, busca=None, apos=None, limite=100):
+    """
+    Uma página dos honorários do ano, filtrada no banco, em ordem de mês
+    (mais recente primeiro), nome do cliente e id. apos=(mes, cliente_nome, id)
+    do último honorário já exibido continua dali (paginação por chave).
+    limite=None traz todos a partir de apos.
+    """
+    fim = ""
+    params = []
+    if apos:
+        fim += " AND (h.mes < ? OR (h.mes = ? AND (c.nome > ? OR (c.nome = ? AND h.id > ?))))"
+        mes_apos, nome_apos, id_apos = apos
+        params += [mes_apos, mes_apos, nome_apos, nome_apos, id_apos]
+    fim += " ORDER BY h.mes DESC, c.nome, h.id"
+    if limite:
+        fim += " LIMIT ?"
+        params.append(limite)
+    return _consultar_honorarios_ano("h.*, c.nome as cliente_nome", ano, mes, status, busca,
+                                     fim, params, modelo=Honorario)
+
+
+def buscar_honorario(honorario_id):
+    """Busca um honorário (com o nome do cliente) pelo ID"""
+    conn = get_connection()
+    cursor = _cursor(conn, Honorario)
     cursor.execute("""
-        INSERT INTO honorarios (cliente_id, ano, mes, valor, data_vencimento, observacao)
-        VALUES (?, ?, ?, ?, ?, ?)
-    """, (cliente_id, ano, mes, valor, data_vencimento, observacao))
-    conn.commit()
+        SELECT h.*, c.nome as cliente_nome
+        FROM honorarios h
+        JOIN clientes c ON h.cliente_id = c.id
+        WHERE h.id = ?
+    """, (honorario_id,))
+    honorario = cursor.fetchone()
+    conn.close()
+    return honorario
+
+
+def _blocos(lista, tamanho=500):
+    """Fatias da lista abaixo do limite de parâmetros das versões antigas do SQLite"""
+    return (lista[i:i + tamanho] for i in range(0, len(lista), tamanho))
+
+
+def buscar_honorarios(honorario_ids):
+    """Vários honorários (com o nome do cliente) numa consulta por bloco de ids; os que não existem faltam"""
+    ids = list(dict.fromkeys(honorario_ids))
+    conn = get_connection()
+    cursor = _cursor(conn, Honorario)
+    honorarios = []
+    for bloco in _blocos(ids):
+        marcas = ",".join("?" * len(bloco))
+        cursor.execute(f"""
+            SELECT h.*, c.nome as cliente_nome
+            FROM honorarios h
+            JOIN clientes c ON h.cliente_id = c.id
+            WHERE h.id IN ({marcas})
+        """, bloco)
+        honorarios.extend(cursor.fetchall())
     conn.close()
+    return honorarios
+
+
+def adicionar_honorario(cliente_id, ano, mes, valor, data_vencimento=None, observacao=None):
+    """Adiciona um novo honorário (retorna None se o cliente já tem honorário no mês)"""
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            INSERT INTO honorarios (cliente_id, ano, mes, valor, data_vencimento, observacao)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (cliente_id, ano, mes, Dinheiro(valor), data_vencimento, observacao))
+        conn.commit()
+        honorario_id = cursor.lastrowid
+        conn.close()
+        invalidar_cache("honorarios")
+        return honorario_id
+    except sqlite3.IntegrityError:
+        conn.close()
+        return None  # Já existe honorário para cliente/mês/ano
 
 
-def atualizar_honorario(honorario_id, status=None, data_pagamento=None, observacao=None):
+def atualizar_honorario(honorario_id, status=None, data_pagamento=None, observacao=None, data_vencimento=None):
     """Atualiza um honorário"""
     conn = get_connection()
     cursor = conn.cursor()
@@ -466,11 +1542,14 @@ def atualizar_honorario(honorario_id, status=None, data_pagamento=None, observac
         cursor.execute("UPDATE honorarios SET status = ? WHERE id = ?", (status, honorario_id))
     if data_pagamento:
         cursor.execute("UPDATE honorarios SET data_pagamento = ? WHERE id = ?", (data_pagamento, honorario_id))
+    if data_vencimento:
+        cursor.execute("UPDATE honorarios SET data_vencimento = ? WHERE id = ?", (data_vencimento, honorario_id))
     if observacao is not None:
         cursor.execute("UPDATE honorarios SET observacao = ? WHERE id = ?", (observacao, honorario_id))
     
     conn.commit()
     conn.close()
+    invalidar_cache("honorarios")
 
 
 def marcar_como_pago(honorario_id, forma_pagamento=None, data_pagamento=None):
@@ -485,23 +1564,109 @@ def marcar_como_pago(honorario_id, forma_pagamento=None, data_pagamento=None):
     )
     conn.commit()
     conn.close()
+    invalidar_cache("honorarios")
+
+
+def marcar_como_pago_lote(honorario_ids, forma_pagamento=None, data_pagamento=None):
+    """
+    Dá baixa em vários honorários numa transação, com a mesma forma e data.
+    Os que já estavam pagos ficam como estão.
+    Retorna os honorários baixados (já pagos, com cliente_nome), para o log e a tela.
+    """
+    if data_pagamento is None:
+        data_pagamento = datetime.now().strftime("%Y-%m-%d")
+    ids = list(dict.fromkeys(honorario_ids))
+    pendentes = []
+    baixados = []
+
+    with transacao(imediata=True) as conn:
+        for bloco in _blocos(ids):
+            marcas = ",".join("?" * len(bloco))
+            pendentes.extend(row[0] for row in conn.execute(
+                f"SELECT id FROM honorarios WHERE id IN ({marcas}) AND status != 'PAGO'", bloco
+            ))
+        conn.executemany(
+            "UPDATE honorarios SET status = 'PAGO', data_pagamento = ?, forma_pagamento = ? WHERE id = ?",
+            [(data_pagamento, forma_pagamento, honorario_id) for honorario_id in pendentes]
+        )
+        cursor = _cursor(conn, Honorario)
+        for bloco in _blocos(pendentes):
+            marcas = ",".join("?" * len(bloco))
+            cursor.execute(f"""
+                SELECT h.*, c.nome as cliente_nome
+                FROM honorarios h
+                JOIN clientes c ON h.cliente_id = c.id
+                WHERE h.id IN ({marcas})
+            """, bloco)
+            baixados.extend(cursor.fetchall())
+
+    if baixados:
+        invalidar_cache("honorarios")
+    return baixados
+
+
+@_em_cache("honorarios")
+def get_vencimentos_mes(ano, mes):
+    """
+    Honorários que vencem em cada dia do mês, numa consulta agrupada:
+    {dia: {'pendentes': n, 'pagos': n, 'valor_pendente': Dinheiro}}
+    """
+    inicio = f"{ano:04d}-{mes:02d}-01"
+    fim = f"{ano + mes // 12:04d}-{mes % 12 + 1:02d}-01"
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        SELECT 
+            date({VENCIMENTO_HONORARIO}) as dia,
+            SUM(CASE WHEN status != 'PAGO' THEN 1 ELSE 0 END) as pendentes,
+            SUM(CASE WHEN status = 'PAGO' THEN 1 ELSE 0 END) as pagos,
+            SUM(CASE WHEN status != 'PAGO' THEN valor ELSE 0 END) as "valor_pendente [DINHEIRO]"
+        FROM honorarios
+        WHERE {VENCIMENTO_HONORARIO} >= ? AND {VENCIMENTO_HONORARIO} < ?
+        GROUP BY date({VENCIMENTO_HONORARIO})
+    """, (inicio, fim))
+    vencimentos = {
+        int(row['dia'][8:10]): {'pendentes': row['pendentes'], 'pagos': row['pagos'],
+                                'valor_pendente': row['valor_pendente']}
+        for row in cursor.fetchall() if row['dia']
+    }
+    conn.close()
+    return vencimentos
 
 
+@_em_cache("honorarios", "clientes")
+def listar_honorarios_vencimento(data):
+    """Honorários (com o nome do cliente) que vencem na data 'AAAA-MM-DD'"""
+    conn = get_connection()
+    cursor = _cursor(conn, Honorario)
+    cursor.execute(f"""
+        SELECT h.*, c.nome as cliente_nome
+        FROM honorarios h
+        JOIN clientes c ON h.cliente_id = c.id
+        WHERE {VENCIMENTO_HONORARIO} >= ? AND {VENCIMENTO_HONORARIO} < date(?, '+1 day')
+        ORDER BY c.nome
+    """, (data, data))
+    honorarios = cursor.fetchall()
+    conn.close()
+    return honorarios
+
+
+@_em_cache("honorarios")
 def get_resumo_ano(ano):
-    """Retorna resumo de honorários do ano"""
+    """Retorna resumo de honorários do ano (da tabela honorarios_resumo)"""
     conn = get_connection()
     cursor = conn.cursor()
     
     cursor.execute("""
         SELECT 
-            COUNT(*) as total,
-            SUM(CASE WHEN status = 'PAGO' THEN 1 ELSE 0 END) as pagos,
-            SUM(CASE WHEN status = 'PENDENTE' THEN 1 ELSE 0 END) as pendentes,
-            SUM(CASE WHEN status = 'ATRASADO' THEN 1 ELSE 0 END) as atrasados,
-            SUM(valor) as valor_total,
-            SUM(CASE WHEN status = 'PAGO' THEN valor ELSE 0 END) as valor_recebido,
-            SUM(CASE WHEN status != 'PAGO' THEN valor ELSE 0 END) as valor_pendente
-        FROM honorarios
+            COALESCE(SUM(qtd), 0) as total,
+            SUM(CASE WHEN status = 'PAGO' THEN qtd ELSE 0 END) as pagos,
+            SUM(CASE WHEN status = 'PENDENTE' THEN qtd ELSE 0 END) as pendentes,
+            SUM(CASE WHEN status = 'ATRASADO' THEN qtd ELSE 0 END) as atrasados,
+            SUM(total) as "valor_total [DINHEIRO]",
+            SUM(CASE WHEN status = 'PAGO' THEN total ELSE 0 END) as "valor_recebido [DINHEIRO]",
+            SUM(CASE WHEN status != 'PAGO' THEN total ELSE 0 END) as "valor_pendente [DINHEIRO]"
+        FROM honorarios_resumo
         WHERE ano = ?
     """, (ano,))
     
@@ -510,37 +1675,123 @@ def get_resumo_ano(ano):
     return resumo
 
 
-# === FUNÇÕES DE RECIBOS ===
+@_em_cache("honorarios")
+def get_resumo_anos():
+    """Resumo de cada ano com honorários, do mais recente para o mais antigo"""
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT 
+            ano,
+            SUM(qtd) as total,
+            SUM(CASE WHEN status = 'PAGO' THEN qtd ELSE 0 END) as pagos,
+            SUM(total) as "valor_total [DINHEIRO]",
+            SUM(CASE WHEN status = 'PAGO' THEN total ELSE 0 END) as "valor_recebido [DINHEIRO]",
+            SUM(CASE WHEN status != 'PAGO' THEN total ELSE 0 END) as "valor_pendente [DINHEIRO]"
+        FROM honorarios_resumo
+        GROUP BY ano
+        ORDER BY ano DESC
+    """)
+    resumo = cursor.fetchall()
+    conn.close()
+    return resumo
 
-def gerar_proximo_numero_recibo():
-    """Gera o próximo número de recibo"""
+
+@_em_cache("honorarios")
+def get_resumo_meses(ano):
+    """Resumo de cada mês do ano (13 = 13º), em ordem de mês"""
     conn = get_connection()
     cursor = conn.cursor()
-    cursor.execute("SELECT MAX(numero) FROM recibos")
-    result = cursor.fetchone()[0]
+    cursor.execute("""
+        SELECT 
+            mes,
+            SUM(qtd) as total,
+            SUM(CASE WHEN status = 'PAGO' THEN qtd ELSE 0 END) as pagos,
+            SUM(total) as "valor_total [DINHEIRO]",
+            SUM(CASE WHEN status = 'PAGO' THEN total ELSE 0 END) as "valor_recebido [DINHEIRO]",
+            SUM(CASE WHEN status != 'PAGO' THEN total ELSE 0 END) as "valor_pendente [DINHEIRO]"
+        FROM honorarios_resumo
+        WHERE ano = ?
+        GROUP BY mes
+        ORDER BY mes
+    """, (ano,))
+    resumo = cursor.fetchall()
     conn.close()
-    return (result or 0) + 1
+    return resumo
 
 
-def criar_recibo(cliente_id, valor, descricao, referencia_mes=None, referencia_ano=None):
-    """Cria um novo recibo"""
-    numero = gerar_proximo_numero_recibo()
+# === FUNÇÕES DE RECIBOS ===
+
+def reservar_numeros_recibo(quantidade=1):
+    """
+    Reserva um bloco contíguo de números de recibo e retorna um range.
+    Roda numa transação IMMEDIATE: duas estações nunca recebem o mesmo número.
+    """
+    with transacao(imediata=True) as conn:
+        # MAX(numero) protege contra recibos gravados por versões sem a sequência
+        conn.execute("""
+            UPDATE sequencias
+            SET valor = MAX(valor, COALESCE((SELECT MAX(numero) FROM recibos), 0)) + ?
+            WHERE nome = 'recibo'
+        """, (quantidade,))
+        ultimo = conn.execute("SELECT valor FROM sequencias WHERE nome = 'recibo'").fetchone()[0]
+    return range(ultimo - quantidade + 1, ultimo + 1)
+
+
+def gerar_proximo_numero_recibo():
+    """Próximo número de recibo (só consulta; para emitir use reservar_numeros_recibo)"""
     conn = get_connection()
     cursor = conn.cursor()
     cursor.execute("""
-        INSERT INTO recibos (numero, cliente_id, valor, descricao, referencia_mes, referencia_ano)
-        VALUES (?, ?, ?, ?, ?, ?)
-    """, (numero, cliente_id, valor, descricao, referencia_mes, referencia_ano))
-    conn.commit()
-    recibo_id = cursor.lastrowid
+        SELECT MAX(valor, COALESCE((SELECT MAX(numero) FROM recibos), 0))
+        FROM sequencias WHERE nome = 'recibo'
+    """)
+    result = cursor.fetchone()
     conn.close()
-    return recibo_id, numero
+    return (result[0] if result else 0) + 1
 
 
+def criar_recibo(cliente_id, valor, descricao, referencia_mes=None, referencia_ano=None):
+    """Cria um novo recibo"""
+    return criar_recibos_lote([{
+        'cliente_id': cliente_id, 'valor': valor, 'descricao': descricao,
+        'referencia_mes': referencia_mes, 'referencia_ano': referencia_ano,
+    }])[0]
+
+
+def criar_recibos_lote(recibos):
+    """
+    Cria vários recibos numa transação: reserva os números de uma vez e
+    insere tudo com um executemany.
+    recibos: lista de dicts com cliente_id, valor, descricao, referencia_mes, referencia_ano.
+    Retorna lista de (recibo_id, numero) na mesma ordem.
+    """
+    if not recibos:
+        return []
+    
+    with transacao(imediata=True) as conn:
+        numeros = reservar_numeros_recibo(len(recibos))
+        conn.executemany("""
+            INSERT INTO recibos (numero, cliente_id, valor, descricao, referencia_mes, referencia_ano)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, [
+            (numero, r['cliente_id'], Dinheiro(r['valor']), r['descricao'], r.get('referencia_mes'), r.get('referencia_ano'))
+            for numero, r in zip(numeros, recibos)
+        ])
+        ids = dict(conn.execute(
+            "SELECT numero, id FROM recibos WHERE numero BETWEEN ? AND ?",
+            (numeros[0], numeros[-1])
+        ).fetchall())
+    
+    invalidar_cache("recibos")
+    return [(ids[numero], numero) for numero in numeros]
+
+
+@_em_cache("recibos", "clientes")
 def listar_recibos(cliente_id=None, ano=None):
     """Lista recibos com filtros"""
     conn = get_connection()
-    cursor = conn.cursor()
+    cursor = _cursor(conn, Recibo)
     
     query = """
         SELECT r.*, c.nome as cliente_nome 
@@ -569,7 +1820,7 @@ def listar_recibos(cliente_id=None, ano=None):
 def buscar_recibo(recibo_id):
     """Busca um recibo pelo ID"""
     conn = get_connection()
-    cursor = conn.cursor()
+    cursor = _cursor(conn, Recibo)
     cursor.execute("""
         SELECT r.*, c.nome as cliente_nome, c.cnpj, c.cpf, c.endereco
         FROM recibos r 
@@ -583,29 +1834,87 @@ def buscar_recibo(recibo_id):
 
 # === FUNÇÕES DE CONFIGURAÇÕES ===
 
+# As configurações ficam em memória: a tabela é lida uma vez por processo
+# e set_config/set_configs gravam no banco e no cache (write-through).
+# Alterações feitas por outra estação só aparecem após recarregar_configs().
+
+_config_cache = {}
+_config_caminho = [None]  # banco de onde o cache foi carregado
+_config_lock = threading.Lock()
+_config_observadores = []
+
+
+def _configs():
+    """Dicionário em memória com todas as configurações (carrega na 1ª vez)"""
+    if _config_caminho[0] != DB_PATH:
+        with _config_lock:
+            if _config_caminho[0] != DB_PATH:
+                conn = get_connection()
+                cursor = conn.cursor()
+                cursor.execute("SELECT chave, valor FROM configuracoes")
+                _config_cache.clear()
+                _config_cache.update((row['chave'], row['valor']) for row in cursor.fetchall())
+                conn.close()
+                _config_caminho[0] = DB_PATH
+    return _config_cache
+
+
+def _notificar_config(chave, valor):
+    for funcao in list(_config_observadores):
+        try:
+            funcao(chave, valor)
+        except Exception:
+            pass  # Um observador com erro não impede a gravação
+
+
 def get_config(chave, padrao=None):
     """Obtém uma configuração"""
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT valor FROM configuracoes WHERE chave = ?", (chave,))
-    result = cursor.fetchone()
-    conn.close()
-    return result[0] if result else padrao
+    configs = _configs()
+    return configs[chave] if chave in configs else padrao
+
+
+def get_configs(prefixo=""):
+    """Retorna {chave: valor} de todas as configurações que começam com o prefixo"""
+    return {chave: valor for chave, valor in _configs().items() if chave.startswith(prefixo)}
 
 
 def set_config(chave, valor):
     """Define uma configuração"""
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
-        INSERT OR REPLACE INTO configuracoes (chave, valor) VALUES (?, ?)
-    """, (chave, valor))
-    conn.commit()
-    conn.close()
+    set_configs({chave: valor})
+
+
+def set_configs(valores):
+    """Define várias configurações numa única transação"""
+    _configs()
+    with transacao() as conn:
+        conn.executemany("""
+            INSERT OR REPLACE INTO configuracoes (chave, valor) VALUES (?, ?)
+        """, list(valores.items()))
+    _config_cache.update(valores)
+    for chave, valor in valores.items():
+        _notificar_config(chave, valor)
+
+
+def recarregar_configs():
+    """Descarta o cache; a próxima leitura vem do banco"""
+    _config_caminho[0] = None
+
+
+def adicionar_observador_config(funcao):
+    """Registra funcao(chave, valor), chamada a cada configuração alterada"""
+    if funcao not in _config_observadores:
+        _config_observadores.append(funcao)
+
+
+def remover_observador_config(funcao):
+    """Remove um observador registrado com adicionar_observador_config"""
+    if funcao in _config_observadores:
+        _config_observadores.remove(funcao)
 
 
 # === FUNÇÕES DE VALORES DE HONORÁRIOS POR ANO ===
 
+@_em_cache("valores_honorarios")
 def get_valor_honorario_ano(cliente_id, ano):
     """Obtém valor de honorário do cliente para um ano específico"""
     conn = get_connection()
@@ -626,11 +1935,13 @@ def set_valor_honorario_ano(cliente_id, ano, valor):
     cursor.execute("""
         INSERT OR REPLACE INTO valores_honorarios (cliente_id, ano, valor)
         VALUES (?, ?, ?)
-    """, (cliente_id, ano, valor))
+    """, (cliente_id, ano, Dinheiro(valor)))
     conn.commit()
     conn.close()
+    invalidar_cache("valores_honorarios")
 
 
+@_em_cache("valores_honorarios")
 def listar_valores_honorarios_cliente(cliente_id):
     """Lista todos os valores de honorários por ano de um cliente"""
     conn = get_connection()
@@ -658,6 +1969,7 @@ def adicionar_cliente_com_valor(nome, cnpj=None, cpf=None, endereco=None, telefo
     cliente_id = cursor.lastrowid
     
     # Se tem valor, salvar valor do ano e criar honorários de 2025
+    valor_2025 = Dinheiro.de_reais(valor_2025)
     if valor_2025 and valor_2025 > 0:
         # Salvar valor padrão para 2025
         cursor.execute("""
@@ -674,11 +1986,13 @@ def adicionar_cliente_com_valor(nome, cnpj=None, cpf=None, endereco=None, telefo
     
     conn.commit()
     conn.close()
+    invalidar_cache("clientes", "valores_honorarios", "honorarios")
     return cliente_id
 
 
 def criar_honorarios_ano_cliente(cliente_id, ano, valor):
     """Cria honorários para todos os meses de um ano para um cliente"""
+    valor = Dinheiro(valor)
     conn = get_connection()
     cursor = conn.cursor()
     
@@ -688,21 +2002,47 @@ def criar_honorarios_ano_cliente(cliente_id, ano, valor):
         VALUES (?, ?, ?)
     """, (cliente_id, ano, valor))
     
-    # Criar honorários para cada mês
-    for mes in range(1, 13):
-        # Verificar se já existe
-        cursor.execute("""
-            SELECT id FROM honorarios WHERE cliente_id = ? AND ano = ? AND mes = ?
-        """, (cliente_id, ano, mes))
-        
-        if not cursor.fetchone():
-            cursor.execute("""
-                INSERT INTO honorarios (cliente_id, ano, mes, valor, status)
-                VALUES (?, ?, ?, ?, 'PENDENTE')
-            """, (cliente_id, ano, mes, valor))
+    # Criar honorários para cada mês (os que já existem são mantidos)
+    cursor.executemany("""
+        INSERT OR IGNORE INTO honorarios (cliente_id, ano, mes, valor, status)
+        VALUES (?, ?, ?, ?, 'PENDENTE')
+    """, [(cliente_id, ano, mes, valor) for mes in range(1, 13)])
     
     conn.commit()
     conn.close()
+    invalidar_cache("valores_honorarios", "honorarios")
+
+
+def gerar_honorarios_periodo(ano_inicio, mes_inicio, ano_fim, mes_fim):
+    """
+    Gera honorários PENDENTES de todos os clientes ativos para cada mês
+    do período (inclusive), numa única instrução INSERT ... SELECT.
+    O valor vem de valores_honorarios do ano ou, sem ele, do campo legado
+    clientes.valor_honorario; clientes sem valor são ignorados, assim como
+    meses que já têm honorário (UNIQUE cliente_id/ano/mes).
+    O 13º (mês 13) não entra no período.
+    Retorna quantidade de honorários criados.
+    """
+    with transacao(imediata=True) as conn, lote_honorarios(conn):
+        cursor = conn.execute("""
+            INSERT OR IGNORE INTO honorarios (cliente_id, ano, mes, valor, status)
+            WITH RECURSIVE meses(ano, mes) AS (
+                SELECT ?, ?
+                UNION ALL
+                SELECT CASE WHEN mes = 12 THEN ano + 1 ELSE ano END,
+                       CASE WHEN mes = 12 THEN 1 ELSE mes + 1 END
+                FROM meses
+                WHERE ano * 12 + mes < ? * 12 + ?
+            )
+            SELECT c.id, m.ano, m.mes, COALESCE(v.valor, c.valor_honorario), 'PENDENTE'
+            FROM meses m
+            JOIN clientes c ON c.ativo = 1
+            LEFT JOIN valores_honorarios v ON v.cliente_id = c.id AND v.ano = m.ano
+            WHERE COALESCE(v.valor, c.valor_honorario) > 0
+        """, (ano_inicio, mes_inicio, ano_fim, mes_fim))
+        criados = cursor.rowcount
+    invalidar_cache("honorarios")
+    return criados
 
 
 def gerar_honorarios_mes_atual():
@@ -711,58 +2051,8 @@ def gerar_honorarios_mes_atual():
     para todos os clientes ativos que têm valor cadastrado para o ano.
     Retorna quantidade de honorários criados.
     """
-    from datetime import datetime
-    
-    mes_atual = datetime.now().month
-    ano_atual = datetime.now().year
-    
-    conn = get_connection()
-    cursor = conn.cursor()
-    
-    # Buscar todos os clientes ativos
-    cursor.execute("SELECT id, nome FROM clientes WHERE ativo = 1")
-    clientes = cursor.fetchall()
-    
-    criados = 0
-    
-    for cliente in clientes:
-        cliente_id = cliente['id']
-        
-        # Verificar se já existe honorário para este mês/ano
-        cursor.execute("""
-            SELECT id FROM honorarios 
-            WHERE cliente_id = ? AND ano = ? AND mes = ?
-        """, (cliente_id, ano_atual, mes_atual))
-        
-        if cursor.fetchone():
-            continue  # Já existe
-        
-        # Buscar valor do ano para o cliente
-        cursor.execute("""
-            SELECT valor FROM valores_honorarios 
-            WHERE cliente_id = ? AND ano = ?
-        """, (cliente_id, ano_atual))
-        resultado = cursor.fetchone()
-        
-        if not resultado:
-            # Tentar pegar valor do cliente (campo legado)
-            cursor.execute("SELECT valor_honorario FROM clientes WHERE id = ?", (cliente_id,))
-            valor_result = cursor.fetchone()
-            valor = valor_result['valor_honorario'] if valor_result and valor_result['valor_honorario'] else None
-        else:
-            valor = resultado['valor']
-        
-        if valor and valor > 0:
-            cursor.execute("""
-                INSERT INTO honorarios (cliente_id, ano, mes, valor, status)
-                VALUES (?, ?, ?, ?, 'PENDENTE')
-            """, (cliente_id, ano_atual, mes_atual, valor))
-            criados += 1
-    
-    conn.commit()
-    conn.close()
-    
-    return criados
+    agora = datetime.now()
+    return gerar_honorarios_periodo(agora.year, agora.month, agora.year, agora.month)
 
 
 def recibo_existe(cliente_id, mes, ano):
@@ -775,7 +2065,6 @@ def recibo_existe(cliente_id, mes, ano):
     """, (cliente_id, mes, ano))
     result = cursor.fetchone()
     conn.close()
-    conn.close()
     return result is not None
 
 
@@ -786,20 +2075,13 @@ def get_relatorio_formas_pagamento(ano):
     
     cursor.execute("""
         SELECT 
-            CASE 
-                WHEN forma_pagamento IS NULL OR forma_pagamento = '' THEN 'Não informado' 
-                ELSE forma_pagamento 
-            END as metodo,
-            COUNT(*) as qtd,
-            SUM(valor) as total
-        FROM honorarios 
+            CASE WHEN forma_pagamento = '' THEN 'Não informado' ELSE forma_pagamento END as metodo,
+            SUM(qtd) as qtd,
+            SUM(total) as "total [DINHEIRO]"
+        FROM honorarios_resumo 
         WHERE ano = ? AND status = 'PAGO'
-        GROUP BY 
-            CASE 
-                WHEN forma_pagamento IS NULL OR forma_pagamento = '' THEN 'Não informado' 
-                ELSE forma_pagamento 
-            END
-        ORDER BY total DESC
+        GROUP BY CASE WHEN forma_pagamento = '' THEN 'Não informado' ELSE forma_pagamento END
+        ORDER BY SUM(total) DESC
     """, (ano,))
     
     dados = [dict(row) for row in cursor.fetchall()]
@@ -810,21 +2092,111 @@ def get_relatorio_formas_pagamento(ano):
 
 # === FUNÇÕES DE LOG DE AUDITORIA ===
 
+# Os logs vão para uma fila e uma thread em segundo plano grava em lotes
+# (executemany numa transação), para a ação do usuário não esperar o disco.
+# Com a fila cheia, ou LOG_ASSINCRONO = False, a gravação é síncrona.
+# descarregar_logs() espera a fila esvaziar; roda também no encerramento.
+
+LOG_ASSINCRONO = True
+TAMANHO_FILA_LOGS = 1000
+LOTE_LOGS = 200
+
+_fila_logs = queue.Queue(maxsize=TAMANHO_FILA_LOGS)
+_gravador_logs = [None]
+_gravador_lock = threading.Lock()
+
+
+def _gravar_logs(entradas):
+    with transacao() as conn:
+        conn.executemany("""
+            INSERT INTO logs_auditoria (usuario, acao, tabela, registro_id, detalhes, data_hora)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, entradas)
+
+
+def _loop_gravador_logs():
+    """Thread gravadora: junta o que estiver na fila e grava de uma vez"""
+    while True:
+        lote = [_fila_logs.get()]
+        while len(lote) < LOTE_LOGS:
+            try:
+                lote.append(_fila_logs.get_nowait())
+            except queue.Empty:
+                break
+        
+        entradas = [item for item in lote if isinstance(item, tuple)]
+        if entradas:
+            try:
+                _gravar_logs(entradas)
+            except Exception:
+                # Banco ocupado por outra estação além do timeout: tenta mais uma vez
+                time.sleep(1)
+                try:
+                    _gravar_logs(entradas)
+                except Exception as ex:
+                    print(f"[LOG] {len(entradas)} registro(s) de auditoria não gravado(s): {ex}", file=sys.stderr)
+        
+        # Marcadores de descarregar_logs(): tudo antes deles já foi gravado
+        for item in lote:
+            if isinstance(item, threading.Event):
+                item.set()
+
+
+def _iniciar_gravador_logs():
+    if _gravador_logs[0] is None or not _gravador_logs[0].is_alive():
+        with _gravador_lock:
+            if _gravador_logs[0] is None or not _gravador_logs[0].is_alive():
+                thread = threading.Thread(target=_loop_gravador_logs, name="gravador-logs", daemon=True)
+                thread.start()
+                _gravador_logs[0] = thread
+
+
 def registrar_log(usuario, acao, tabela=None, registro_id=None, detalhes=None):
     """Registra uma ação no log de auditoria"""
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
-        INSERT INTO logs_auditoria (usuario, acao, tabela, registro_id, detalhes)
-        VALUES (?, ?, ?, ?, ?)
-    """, (usuario, acao, tabela, registro_id, detalhes))
-    conn.commit()
-    conn.close()
+    # Mesmo formato (UTC) do DEFAULT CURRENT_TIMESTAMP, com a hora da ação e não a da gravação
+    data_hora = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    entrada = (usuario, acao, tabela, registro_id, detalhes, data_hora)
+    
+    if not LOG_ASSINCRONO:
+        _gravar_logs([entrada])
+        return
+    
+    _iniciar_gravador_logs()
+    try:
+        _fila_logs.put_nowait(entrada)
+    except queue.Full:
+        _gravar_logs([entrada])  # Fila cheia: grava na hora em vez de perder o registro
 
 
-def listar_logs(limite=100, usuario=None, tabela=None):
-    """Lista logs de auditoria com filtros"""
-    conn = get_connection()
+def descarregar_logs(timeout=10):
+    """Espera os logs pendentes serem gravados. Retorna False se estourar o timeout."""
+    if _gravador_logs[0] is None or not _gravador_logs[0].is_alive():
+        return _fila_logs.empty()
+    marcador = threading.Event()
+    _fila_logs.put(marcador)
+    return marcador.wait(timeout)
+
+
+atexit.register(descarregar_logs)
+
+
+def listar_logs(limite=100, usuario=None, tabela=None, data_inicio=None, data_fim=None,
+                antes_de=None, arquivados=False):
+    """
+    Lista logs de auditoria com filtros, do mais recente para o mais antigo.
+    data_inicio/data_fim: 'AAAA-MM-DD' (inclusive).
+    antes_de: (data_hora, id) do último log já exibido, para carregar a próxima página.
+    arquivados=True consulta o banco de arquivo em vez da tabela atual.
+    """
+    if arquivados:
+        caminho = _caminho_arquivo_logs()
+        if not os.path.exists(caminho):
+            return []
+        conn = sqlite3.connect(caminho, timeout=30)
+        conn.row_factory = sqlite3.Row
+    else:
+        descarregar_logs()
+        conn = get_connection()
     cursor = conn.cursor()
     
     query = "SELECT * FROM logs_auditoria WHERE 1=1"
@@ -838,7 +2210,19 @@ def listar_logs(limite=100, usuario=None, tabela=None):
         query += " AND tabela = ?"
         params.append(tabela)
     
-    query += " ORDER BY data_hora DESC LIMIT ?"
+    if data_inicio:
+        query += " AND data_hora >= ?"
+        params.append(data_inicio)
+    
+    if data_fim:
+        query += " AND data_hora <= ?"
+        params.append(f"{data_fim} 23:59:59")
+    
+    if antes_de:
+        query += " AND (data_hora, id) < (?, ?)"
+        params.extend(antes_de)
+    
+    query += " ORDER BY data_hora DESC, id DESC LIMIT ?"
     params.append(limite)
     
     cursor.execute(query, params)
@@ -847,6 +2231,71 @@ def listar_logs(limite=100, usuario=None, tabela=None):
     return logs
 
 
+# Retenção: logs mais antigos que 'logs_retencao_meses' (padrão 12) saem da
+# tabela atual e vão para honorarios_arquivo.db, ao lado do banco principal.
+
+RETENCAO_LOGS_MESES = 12
+
+
+def _caminho_arquivo_logs():
+    return os.path.join(os.path.dirname(DB_PATH), "honorarios_arquivo.db")
+
+
+def arquivar_logs(meses=None):
+    """Move os logs mais antigos que N meses para o banco de arquivo. Retorna quantos moveu."""
+    if meses is None:
+        meses = int(get_config('logs_retencao_meses', RETENCAO_LOGS_MESES))
+    corte = f"-{int(meses)} months"
+    descarregar_logs()
+    
+    # Conexão própria: ATTACH não pode acontecer com transação aberta na conexão da thread
+    conn = _abrir_conexao()
+    try:
+        conn.execute("ATTACH DATABASE ? AS arquivo", (_caminho_arquivo_logs(),))
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS arquivo.logs_auditoria (
+                    id INTEGER PRIMARY KEY,
+                    usuario TEXT NOT NULL,
+                    acao TEXT NOT NULL,
+                    tabela TEXT,
+                    registro_id INTEGER,
+                    detalhes TEXT,
+                    data_hora TEXT
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS arquivo.idx_logs_data ON logs_auditoria (data_hora)")
+            conn.execute("CREATE INDEX IF NOT EXISTS arquivo.idx_logs_usuario ON logs_auditoria (usuario, data_hora)")
+            conn.execute("CREATE INDEX IF NOT EXISTS arquivo.idx_logs_tabela ON logs_auditoria (tabela, data_hora)")
+            conn.execute("""
+                INSERT OR IGNORE INTO arquivo.logs_auditoria (id, usuario, acao, tabela, registro_id, detalhes, data_hora)
+                SELECT id, usuario, acao, tabela, registro_id, detalhes, data_hora
+                FROM main.logs_auditoria WHERE data_hora < datetime('now', ?)
+            """, (corte,))
+            movidos = conn.execute(
+                "DELETE FROM main.logs_auditoria WHERE data_hora < datetime('now', ?)", (corte,)
+            ).rowcount
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.execute("DETACH DATABASE arquivo")
+    finally:
+        conn.close()
+    return movidos
+
+
+def arquivar_logs_se_necessario():
+    """Aplica a retenção no máximo uma vez por dia (chamado após o login)"""
+    hoje = datetime.now().strftime("%Y-%m-%d")
+    if get_config('logs_ultimo_arquivamento') == hoje:
+        return 0
+    movidos = arquivar_logs()
+    set_config('logs_ultimo_arquivamento', hoje)
+    return movidos
+
+
 # === FUNÇÕES DE RELATÓRIO INDIVIDUAL ===
 
 def get_relatorio_cliente(cliente_id):
@@ -855,20 +2304,18 @@ def get_relatorio_cliente(cliente_id):
     cursor = conn.cursor()
     
     # Dados do cliente
-    cursor.execute("SELECT * FROM clientes WHERE id = ?", (cliente_id,))
-    cliente = cursor.fetchone()
+    cliente = _cursor(conn, Cliente).execute("SELECT * FROM clientes WHERE id = ?", (cliente_id,)).fetchone()
     
     if not cliente:
         conn.close()
         return None
     
     # Honorários do cliente
-    cursor.execute("""
+    honorarios = _cursor(conn, Honorario).execute("""
         SELECT * FROM honorarios 
         WHERE cliente_id = ? 
         ORDER BY ano DESC, mes DESC
-    """, (cliente_id,))
-    honorarios = cursor.fetchall()
+    """, (cliente_id,)).fetchall()
     
     # Resumo por ano
     cursor.execute("""
@@ -877,9 +2324,9 @@ def get_relatorio_cliente(cliente_id):
             COUNT(*) as total,
             SUM(CASE WHEN status = 'PAGO' THEN 1 ELSE 0 END) as pagos,
             SUM(CASE WHEN status != 'PAGO' THEN 1 ELSE 0 END) as pendentes,
-            SUM(valor) as valor_total,
-            SUM(CASE WHEN status = 'PAGO' THEN valor ELSE 0 END) as valor_pago,
-            SUM(CASE WHEN status != 'PAGO' THEN valor ELSE 0 END) as valor_pendente
+            SUM(valor) as "valor_total [DINHEIRO]",
+            SUM(CASE WHEN status = 'PAGO' THEN valor ELSE 0 END) as "valor_pago [DINHEIRO]",
+            SUM(CASE WHEN status != 'PAGO' THEN valor ELSE 0 END) as "valor_pendente [DINHEIRO]"
         FROM honorarios
         WHERE cliente_id = ?
         GROUP BY ano
@@ -888,19 +2335,18 @@ def get_relatorio_cliente(cliente_id):
     resumo_anos = cursor.fetchall()
     
     # Recibos do cliente
-    cursor.execute("""
+    recibos = _cursor(conn, Recibo).execute("""
         SELECT * FROM recibos 
         WHERE cliente_id = ? 
         ORDER BY data_emissao DESC
-    """, (cliente_id,))
-    recibos = cursor.fetchall()
+    """, (cliente_id,)).fetchall()
     
     # Totais gerais
     cursor.execute("""
         SELECT 
-            SUM(valor) as total_geral,
-            SUM(CASE WHEN status = 'PAGO' THEN valor ELSE 0 END) as total_pago,
-            SUM(CASE WHEN status != 'PAGO' THEN valor ELSE 0 END) as saldo_devedor
+            SUM(valor) as "total_geral [DINHEIRO]",
+            SUM(CASE WHEN status = 'PAGO' THEN valor ELSE 0 END) as "total_pago [DINHEIRO]",
+            SUM(CASE WHEN status != 'PAGO' THEN valor ELSE 0 END) as "saldo_devedor [DINHEIRO]"
         FROM honorarios
         WHERE cliente_id = ?
     """, (cliente_id,))
@@ -909,13 +2355,13 @@ def get_relatorio_cliente(cliente_id):
     conn.close()
     
     return {
-        'cliente': dict(cliente) if cliente else None,
-        'honorarios': [dict(h) for h in honorarios],
+        'cliente': cliente,
+        'honorarios': honorarios,
         'resumo_anos': [dict(r) for r in resumo_anos],
-        'recibos': [dict(r) for r in recibos],
-        'total_geral': totais['total_geral'] or 0,
-        'total_pago': totais['total_pago'] or 0,
-        'saldo_devedor': totais['saldo_devedor'] or 0,
+        'recibos': recibos,
+        'total_geral': totais['total_geral'] or Dinheiro(),
+        'total_pago': totais['total_pago'] or Dinheiro(),
+        'saldo_devedor': totais['saldo_devedor'] or Dinheiro(),
     }
 
 
@@ -924,7 +2370,7 @@ def get_honorarios_vencendo(dias=7):
     from datetime import datetime, timedelta
     
     conn = get_connection()
-    cursor = conn.cursor()
+    cursor = _cursor(conn, Honorario)
     
     hoje = datetime.now()
     limite = hoje + timedelta(days=dias)
@@ -945,7 +2391,7 @@ def get_honorarios_vencendo(dias=7):
     honorarios = cursor.fetchall()
     conn.close()
     
-    return [dict(h) for h in honorarios]
+    return honorarios
 
 
 def verificar_permissao(usuario, acao):
@@ -982,21 +2428,6 @@ def atualizar_cargo_usuario(usuario_id, novo_cargo):
     conn.close()
 
 
-# Inicializa banco ao importar
-create_tables()
-criar_usuario_inicial()
-
-# Atualiza admin existente para cargo admin
-try:
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("UPDATE usuarios SET cargo = 'admin' WHERE usuario = 'admin'")
-    conn.commit()
-    conn.close()
-except:
-    pass
-
-
 # === FUNÇÕES DE CERTIFICADOS DIGITAIS ===
 
 def adicionar_certificado(cliente_id, nome_avulso, cpf_cnpj, tipo, categoria, midia, 
@@ -1011,7 +2442,7 @@ def adicionar_certificado(cliente_id, nome_avulso, cpf_cnpj, tipo, categoria, mi
                                   observacao, vinculado_honorario, mes_honorario, ano_honorario)
         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
     """, (cliente_id, nome_avulso, cpf_cnpj, tipo, categoria, midia, 
-          validade_anos, data_emissao, data_vencimento, valor, 
+          validade_anos, data_emissao, data_vencimento, Dinheiro(valor), 
           observacao, 1 if vinculado_honorario else 0, mes_honorario, ano_honorario))
     conn.commit()
     cert_id = cursor.lastrowid
@@ -1022,7 +2453,7 @@ def adicionar_certificado(cliente_id, nome_avulso, cpf_cnpj, tipo, categoria, mi
 def listar_certificados(status=None, cliente_id=None):
     """Lista certificados com filtros opcionais"""
     conn = get_connection()
-    cursor = conn.cursor()
+    cursor = _cursor(conn, Certificado)
     
     query = """
         SELECT c.*, cl.nome as cliente_nome 
@@ -1043,7 +2474,7 @@ def listar_certificados(status=None, cliente_id=None):
     query += " ORDER BY c.data_vencimento DESC"
     
     cursor.execute(query, params)
-    certificados = [dict(row) for row in cursor.fetchall()]
+    certificados = cursor.fetchall()
     conn.close()
     return certificados
 
@@ -1051,7 +2482,7 @@ def listar_certificados(status=None, cliente_id=None):
 def buscar_certificado(cert_id):
     """Busca um certificado pelo ID"""
     conn = get_connection()
-    cursor = conn.cursor()
+    cursor = _cursor(conn, Certificado)
     cursor.execute("""
         SELECT c.*, cl.nome as cliente_nome 
         FROM certificados c
@@ -1060,7 +2491,7 @@ def buscar_certificado(cert_id):
     """, (cert_id,))
     cert = cursor.fetchone()
     conn.close()
-    return dict(cert) if cert else None
+    return cert
 
 
 def atualizar_certificado(cert_id, **kwargs):
@@ -1072,7 +2503,7 @@ def atualizar_certificado(cert_id, **kwargs):
     valores = []
     for campo, valor in kwargs.items():
         campos.append(f"{campo} = ?")
-        valores.append(valor)
+        valores.append(Dinheiro.de_reais(valor) if campo == 'valor' else valor)
     
     valores.append(cert_id)
     query = f"UPDATE certificados SET {', '.join(campos)} WHERE id = ?"
@@ -1097,7 +2528,7 @@ def get_certificados_vencendo(dias=30):
     data_limite = (datetime.now() + timedelta(days=dias)).strftime("%Y-%m-%d")
     
     conn = get_connection()
-    cursor = conn.cursor()
+    cursor = _cursor(conn, Certificado)
     cursor.execute("""
         SELECT c.*, cl.nome as cliente_nome 
         FROM certificados c
@@ -1105,6 +2536,6 @@ def get_certificados_vencendo(dias=30):
         WHERE c.status = 'ATIVO' AND c.data_vencimento >= ? AND c.data_vencimento <= ?
         ORDER BY c.data_vencimento
     """, (hoje, data_limite))
-    certs = [dict(row) for row in cursor.fetchall()]
+    certs = cursor.fetchall()
     conn.close()
     return certs
@@ -0,0 +1,94 @@
+"""
+Acesso assíncrono ao banco para os handlers async das telas.
+
+As funções de database.py continuam síncronas; aqui cada uma ganha uma
+versão awaitable que roda fora do loop do Flet:
+
+    from database_async import db
+
+    async def on_filtro_change(e):
+        honorarios = await db.listar_honorarios(ano=2025)
+
+Leituras (listar_*, buscar_*, get_*, contar_*...) vão para um pool de
+LEITORES threads; as escritas vão todas para uma única thread de escrita,
+na ordem em que foram pedidas, sem disputar o lock do SQLite entre si.
+Cada thread reaproveita a própria conexão do pool de database.py, então um
+disco lento ou o banco travado na rede só atrasa a resposta: a tela
+continua redesenhando.
+"""
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import database
+
+
+LEITORES = 4  # threads de leitura
+
+PREFIXOS_LEITURA = ("listar_", "buscar_", "get_", "contar_", "ultima_")
+LEITURAS = {"alteracoes_desde", "versao_esquema", "is_admin", "recibo_existe", "verificar_permissao"}
+# Não fazem sentido fora da thread que chama (conexões e contexto de transação)
+SOMENTE_SINCRONAS = {"get_connection", "get_resource_path", "transacao",
+                     "fechar_conexao_thread", "fechar_conexoes"}
+
+
+def eh_leitura(nome):
+    """True se a função só lê do banco (vai para o pool de leitura)"""
+    return nome in LEITURAS or nome.startswith(PREFIXOS_LEITURA)
+
+
+class BancoAssincrono:
+    """db.<função>(...) devolve um awaitable com o resultado de database.<função>(...)"""
+
+    def __init__(self, leitores=LEITORES):
+        self._leitores = leitores
+        self._executores = {}
+        self._funcoes = {}
+        self._lock = threading.Lock()
+
+    def _executor(self, tipo):
+        with self._lock:
+            if tipo not in self._executores:
+                if tipo == "escrita":
+                    self._executores[tipo] = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-escrita")
+                else:
+                    self._executores[tipo] = ThreadPoolExecutor(max_workers=self._leitores, thread_name_prefix="db-leitura")
+            return self._executores[tipo]
+
+    def __getattr__(self, nome):
+        if nome.startswith("_") or nome in SOMENTE_SINCRONAS:
+            raise AttributeError(nome)
+        funcao = self._funcoes.get(nome)
+        if funcao is None:
+            original = getattr(database, nome)
+            if not callable(original):
+                raise AttributeError(nome)
+            tipo = "leitura" if eh_leitura(nome) else "escrita"
+
+            @functools.wraps(original)
+            async def funcao(*args, **kwargs):
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(
+                    self._executor(tipo), functools.partial(original, *args, **kwargs)
+                )
+
+            self._funcoes[nome] = funcao
+        return funcao
+
+    async def executar(self, funcao, *args, escrita=True, **kwargs):
+        """Roda outra função síncrona de banco (ex.: várias chamadas juntas) na thread certa"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor("escrita" if escrita else "leitura"), functools.partial(funcao, *args, **kwargs)
+        )
+
+    def encerrar(self):
+        """Espera o que está na fila e para as threads (as conexões fecham em fechar_conexoes)"""
+        with self._lock:
+            executores, self._executores = self._executores, {}
+        for executor in executores.values():
+            executor.shutdown(wait=True)
+
+
+db = BancoAssincrono()
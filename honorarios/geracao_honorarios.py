@@ -0,0 +1,121 @@
+"""
+Geração de honorários em lote.
+
+Monta a matriz cliente × ano × mês a partir dos valores cadastrados em
+valores_honorarios e cria, numa única instrução, os honorários PENDENTES
+que ainda não existem. Usado pela tela de Configurações e pela linha de
+comando:
+
+    python honorarios/geracao_honorarios.py [--ano-inicio 2019] [--ano-fim 2025]
+                                            [--cliente 12] [--dry-run]
+"""
+import argparse
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from database import get_connection, invalidar_cache, transacao, lote_honorarios
+
+
+def _montar_matriz(ano_inicio=None, ano_fim=None, cliente_id=None, limitar_ao_mes_atual=True):
+    """CTE com os (cliente_id, ano, mes, valor) a gerar e seus parâmetros"""
+    query = """
+        WITH RECURSIVE meses(mes) AS (
+            SELECT 1 UNION ALL SELECT mes + 1 FROM meses WHERE mes < 12
+        ),
+        matriz AS (
+            SELECT vh.cliente_id, vh.ano, m.mes, vh.valor
+            FROM valores_honorarios vh
+            JOIN meses m
+            WHERE vh.valor > 0
+    """
+    params = []
+
+    if cliente_id:
+        query += " AND vh.cliente_id = ?"
+        params.append(cliente_id)
+
+    if ano_inicio:
+        query += " AND vh.ano >= ?"
+        params.append(ano_inicio)
+
+    if ano_fim:
+        query += " AND vh.ano <= ?"
+        params.append(ano_fim)
+
+    # Anos passados completos, ano atual até o mês atual, anos futuros não
+    if limitar_ao_mes_atual:
+        agora = datetime.now()
+        query += " AND vh.ano * 100 + m.mes <= ?"
+        params.append(agora.year * 100 + agora.month)
+
+    query += ")"
+    return query, params
+
+
+def gerar_honorarios_lote(ano_inicio=None, ano_fim=None, cliente_id=None,
+                          limitar_ao_mes_atual=True, dry_run=False):
+    """
+    Gera honorários PENDENTES para cada cliente/ano com valor cadastrado.
+    Meses que já têm honorário são pulados. Com dry_run=True só conta.
+    Retorna {'criados': n, 'pulados': n, 'total': n}.
+    """
+    matriz, params = _montar_matriz(ano_inicio, ano_fim, cliente_id, limitar_ao_mes_atual)
+    contar = matriz + """
+        SELECT COUNT(*) AS total, COUNT(h.id) AS existentes
+        FROM matriz x
+        LEFT JOIN honorarios h ON h.cliente_id = x.cliente_id AND h.ano = x.ano AND h.mes = x.mes
+    """
+
+    if dry_run:
+        conn = get_connection()
+        row = conn.execute(contar, params).fetchone()
+        conn.close()
+        total, existentes = row['total'], row['existentes']
+        return {'criados': total - existentes, 'pulados': existentes, 'total': total}
+
+    with transacao(imediata=True) as conn, lote_honorarios(conn):
+        total = conn.execute(contar, params).fetchone()['total']
+        cursor = conn.execute("""
+            INSERT OR IGNORE INTO honorarios (cliente_id, ano, mes, valor, status)
+        """ + matriz + """
+            SELECT cliente_id, ano, mes, valor, 'PENDENTE' FROM matriz
+        """, params)
+        criados = cursor.rowcount
+
+    invalidar_cache("honorarios")
+    return {'criados': criados, 'pulados': total - criados, 'total': total}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera honorários pendentes a partir dos valores cadastrados por ano.")
+    parser.add_argument("--ano-inicio", type=int, help="primeiro ano a gerar")
+    parser.add_argument("--ano-fim", type=int, help="último ano a gerar")
+    parser.add_argument("--cliente", type=int, help="id de um único cliente")
+    parser.add_argument("--ano-completo", action="store_true",
+                        help="gera os 12 meses mesmo para o ano atual e futuros")
+    parser.add_argument("--dry-run", action="store_true", help="só mostra o que seria criado")
+    args = parser.parse_args(argv)
+
+    print("\n" + "="*60)
+    print("   GERAÇÃO DE HONORÁRIOS PENDENTES" + (" (SIMULAÇÃO)" if args.dry_run else ""))
+    print("="*60)
+
+    inicio = datetime.now()
+    resultado = gerar_honorarios_lote(
+        ano_inicio=args.ano_inicio, ano_fim=args.ano_fim, cliente_id=args.cliente,
+        limitar_ao_mes_atual=not args.ano_completo, dry_run=args.dry_run,
+    )
+    segundos = (datetime.now() - inicio).total_seconds()
+
+    print(f"\n   {'Seriam criados' if args.dry_run else 'Criados'}: {resultado['criados']}")
+    print(f"   Já existiam (pulados): {resultado['pulados']}")
+    print(f"   Tempo: {segundos:.2f}s")
+    print("="*60)
+    return resultado
+
+
+if __name__ == "__main__":
+    main()
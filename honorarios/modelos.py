@@ -0,0 +1,160 @@
+"""
+Registros compactos para as linhas do banco.
+
+As funções de leitura do database devolvem Cliente, Honorario, Recibo e
+Certificado em vez de sqlite3.Row ou cópias dict(row). Cada registro usa
+__slots__ (sem __dict__ por objeto) e é montado direto da tupla da linha por
+um construtor gerado uma vez para cada conjunto de colunas da consulta.
+
+Os registros continuam acessíveis como antes nas telas e relatórios:
+registro['campo'], registro[0], registro.get('campo', padrao), dict(registro)
+e registro.keys(), além de registro.campo. São somente leitura, como o
+sqlite3.Row: o cache de consultas entrega os mesmos registros a todas as
+telas. Para alterar, copie com dict(registro).
+"""
+import sqlite3
+
+
+class Registro:
+    """Base dos registros: acesso por atributo, por chave ou por posição"""
+
+    __slots__ = ("_colunas",)
+
+    def __getitem__(self, chave):
+        if isinstance(chave, (int, slice)):
+            colunas = self._colunas[chave]
+            if isinstance(chave, slice):
+                return tuple(getattr(self, c) for c in colunas)
+            return getattr(self, colunas)
+        if chave not in self._colunas:
+            raise KeyError(chave)
+        return getattr(self, chave)
+
+    def get(self, chave, padrao=None):
+        """Como dict.get: padrao se a consulta não trouxe a coluna"""
+        if chave not in self._colunas:
+            return padrao
+        return getattr(self, chave)
+
+    def keys(self):
+        return list(self._colunas)
+
+    def __contains__(self, chave):
+        return chave in self._colunas
+
+    def __iter__(self):
+        return (getattr(self, c) for c in self._colunas)
+
+    def __len__(self):
+        return len(self._colunas)
+
+    def __eq__(self, outro):
+        if not isinstance(outro, Registro):
+            return NotImplemented
+        return self._colunas == outro._colunas and tuple(self) == tuple(outro)
+
+    __hash__ = None
+
+    def __setattr__(self, nome, valor):
+        raise AttributeError(f"{type(self).__name__} é somente leitura; use dict(registro) para alterar")
+
+    def __delattr__(self, nome):
+        raise AttributeError(f"{type(self).__name__} é somente leitura")
+
+    def __repr__(self):
+        campos = ", ".join(f"{c}={getattr(self, c)!r}" for c in self._colunas)
+        return f"{type(self).__name__}({campos})"
+
+
+class Cliente(Registro):
+    __slots__ = ("id", "codigo_interno", "nome", "cnpj", "cpf", "endereco", "telefone",
+                 "email", "data_cadastro", "ativo", "valor_honorario")
+
+
+class Honorario(Registro):
+    __slots__ = ("id", "cliente_id", "ano", "mes", "data_vencimento", "data_pagamento",
+                 "status", "observacao", "forma_pagamento", "valor",
+                 "cliente_nome", "cliente_email")
+
+
+class Recibo(Registro):
+    __slots__ = ("id", "numero", "cliente_id", "descricao", "data_emissao",
+                 "referencia_mes", "referencia_ano", "valor",
+                 "cliente_nome", "cnpj", "cpf", "endereco")
+
+
+class Certificado(Registro):
+    __slots__ = ("id", "cliente_id", "nome_avulso", "cpf_cnpj", "tipo", "categoria", "midia",
+                 "validade_anos", "data_emissao", "data_vencimento", "status",
+                 "pagamento_status", "observacao", "vinculado_honorario", "mes_honorario",
+                 "ano_honorario", "data_cadastro", "valor", "cliente_nome")
+
+
+def _campos(modelo):
+    campos = set()
+    for classe in modelo.__mro__:
+        campos.update(getattr(classe, "__slots__", ()))
+    campos.discard("_colunas")
+    return campos
+
+
+_montagens = {}
+
+
+def _montagem(modelo):
+    """
+    Subclasse do modelo com a atribuição comum, só para montar o registro:
+    depois ele vira o modelo (mesmos slots), que é somente leitura.
+    """
+    if modelo not in _montagens:
+        _montagens[modelo] = type(modelo.__name__, (modelo,), {"__slots__": (), "__setattr__": object.__setattr__})
+    return _montagens[modelo]
+
+
+def _construtor(modelo, colunas):
+    """
+    Função (cursor, linha) -> registro para uma ordem de colunas. Gerada uma
+    vez: desempacota a tupla direto nos slots, sem laço por coluna.
+    """
+    destinos = "".join(f"r.{c}, " for c in colunas)
+    codigo = (
+        "def construir(cursor, linha):\n"
+        "    r = novo(montagem)\n"
+        "    r._colunas = colunas\n"
+        f"    ({destinos}) = linha\n"
+        "    r.__class__ = modelo\n"
+        "    return r\n"
+    )
+    escopo = {"novo": object.__new__, "montagem": _montagem(modelo), "modelo": modelo, "colunas": colunas}
+    exec(codigo, escopo)
+    return escopo["construir"]
+
+
+def fabrica_de_registros(modelo):
+    """
+    row_factory que devolve registros do modelo. Consultas com colunas fora
+    do modelo (ou repetidas) voltam como sqlite3.Row.
+    """
+    campos = _campos(modelo)
+    construtores = {}
+    ultimo = [(None, None)]  # (cursor.description, construtor) da última consulta
+
+    def fabrica(cursor, linha):
+        descricao, construir = ultimo[0]
+        if descricao is not cursor.description:
+            descricao = cursor.description
+            colunas = tuple(d[0] for d in descricao)
+            construir = construtores.get(colunas)
+            if construir is None:
+                if set(colunas) <= campos and len(set(colunas)) == len(colunas):
+                    construir = _construtor(modelo, colunas)
+                else:
+                    construir = sqlite3.Row
+                construtores[colunas] = construir
+            ultimo[0] = (descricao, construir)
+        return construir(cursor, linha)
+
+    return fabrica
+
+
+FABRICAS = {modelo: fabrica_de_registros(modelo) for modelo in (Cliente, Honorario, Recibo, Certificado)}
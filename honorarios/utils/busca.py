@@ -0,0 +1,113 @@
+"""
+Busca enquanto o usuário digita.
+
+BuscaAdiada espera uma pausa na digitação (200 ms por padrão) e roda a
+busca numa thread própria, fora da thread da tela. Se o usuário voltar a
+digitar, a busca em andamento é marcada como cancelada e o resultado dela
+é descartado: só a busca do texto mais recente chega a ser exibida.
+
+As funções de termos reproduzem, em memória, a regra do índice de busca de
+clientes (sem acentos/maiúsculas, cada palavra pelo início), para a tela
+refinar o resultado que já tem quando o usuário só acrescenta letras.
+"""
+import re
+import sys
+import threading
+import time
+import unicodedata
+
+
+def normalizar(texto):
+    """Minúsculas e sem acentos"""
+    texto = unicodedata.normalize("NFKD", texto or "")
+    return "".join(c for c in texto if not unicodedata.combining(c)).lower()
+
+
+def termos_busca(texto):
+    """Palavras da busca, normalizadas"""
+    return re.findall(r"\w+", normalizar(texto))
+
+
+def casa_termos(palavras, termos):
+    """True se cada termo for o início de alguma das palavras (já normalizadas)"""
+    return all(any(p.startswith(t) for p in palavras) for t in termos)
+
+
+def refina(anterior, novo):
+    """
+    True se a busca `novo` só pode restringir o resultado de `anterior`:
+    mesmas palavras, a última possivelmente mais longa, e talvez palavras a mais.
+    """
+    termos_ant, termos_novo = termos_busca(anterior), termos_busca(novo)
+    if len(termos_novo) < len(termos_ant):
+        return False
+    return all(n.startswith(a) for a, n in zip(termos_ant, termos_novo))
+
+
+class BuscaAdiada:
+    """
+    buscar(texto, cancelada) roda numa thread depois de `atraso` segundos sem
+    nova digitação; cancelada() fica True quando o texto muda de novo.
+    mostrar(texto, resultado) só é chamado para a busca mais recente.
+    A thread termina quando não há busca pendente (ao_encerrar roda nela).
+    """
+
+    def __init__(self, buscar, mostrar, atraso=0.2, ao_encerrar=None):
+        self._buscar = buscar
+        self._mostrar = mostrar
+        self.atraso = atraso
+        self._ao_encerrar = ao_encerrar
+        self._cond = threading.Condition()
+        self._pendente = None  # (texto, instante em que a busca pode rodar)
+        self._geracao = 0
+        self._thread = None
+
+    def digitar(self, texto):
+        """Registra o texto atual; a busca roda após a pausa"""
+        with self._cond:
+            self._geracao += 1
+            self._pendente = (texto, time.monotonic() + self.atraso)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="busca-adiada", daemon=True)
+                self._thread.start()
+            else:
+                self._cond.notify()
+
+    def cancelar(self):
+        """Descarta a busca pendente e a que estiver rodando"""
+        with self._cond:
+            self._geracao += 1
+            self._pendente = None
+            self._cond.notify()
+
+    def _proxima(self):
+        """Espera a pausa na digitação. Retorna (texto, geração) ou None se acabou."""
+        with self._cond:
+            while True:
+                if self._pendente is None:
+                    self._thread = None
+                    return None
+                texto, prazo = self._pendente
+                espera = prazo - time.monotonic()
+                if espera <= 0:
+                    self._pendente = None
+                    return texto, self._geracao
+                self._cond.wait(espera)
+
+    def _loop(self):
+        try:
+            while True:
+                proxima = self._proxima()
+                if proxima is None:
+                    return
+                texto, geracao = proxima
+                cancelada = lambda: geracao != self._geracao
+                try:
+                    resultado = self._buscar(texto, cancelada)
+                    if not cancelada():
+                        self._mostrar(texto, resultado)
+                except Exception as ex:
+                    print(f"[BUSCA] Erro ao buscar '{texto}': {ex}", file=sys.stderr)
+        finally:
+            if self._ao_encerrar:
+                self._ao_encerrar()
@@ -0,0 +1,149 @@
+"""
+Cache das telas do menu: trocar de aba não reconstrói a tela.
+
+A primeira visita cria a tela com criar(); as seguintes reaproveitam os
+mesmos controles. Enquanto uma tela está escondida, o cache recebe as
+alterações do banco (monitor de alterações) no lugar dela:
+
+- telas com observador de alterações próprio (registrado com a chave
+  "tela") acumulam as alterações e, ao voltar, refresh() entrega tudo de
+  uma vez ao observador, que troca só o que mudou;
+- as demais são reconstruídas na próxima visita se alguma das tabelas de
+  que dependem mudou, mesmo que o aviso chegue com a tela exibida; sem
+  mudança, voltar é instantâneo.
+
+As telas guardadas ficam dentro de um orçamento de memória contado em
+controles (LIMITE_CONTROLES): passando dele, as usadas há mais tempo saem.
+
+    cache = CacheTelas()
+    cache.mostrar(1, criar_tela_recibos, exibir, tabelas=("clientes", "recibos"))
+"""
+import sys
+import threading
+from collections import OrderedDict
+
+from database import (
+    adicionar_observador_alteracoes, remover_observador_alteracoes, observador_alteracoes,
+    TABELAS_ALTERACOES, LIMITE_ALTERACOES,
+)
+
+
+LIMITE_CONTROLES = 20000  # orçamento das telas guardadas (em controles, não em bytes)
+CHAVE_TELA = "tela"       # chave do observador de alterações da tela exibida
+
+
+def contar_controles(controle):
+    """Quantidade de controles na árvore (aproxima a memória ocupada pela tela)"""
+    total = 0
+    pilha = [controle]
+    while pilha:
+        atual = pilha.pop()
+        total += 1
+        pilha.extend(c for c in atual._get_children() if c is not None)
+    return total
+
+
+class _Tela:
+    __slots__ = ("chave", "controle", "tabelas", "observador", "pendentes", "reconstruir", "tamanho")
+
+    def __init__(self, chave, controle, tabelas, observador):
+        self.chave = chave
+        self.controle = controle
+        self.tabelas = tabelas
+        self.observador = observador  # funcao(alteracoes) da própria tela, ou None
+        self.pendentes = []           # alterações enquanto escondida (None = mudou demais)
+        self.reconstruir = False
+        self.tamanho = contar_controles(controle)
+
+
+class CacheTelas:
+    """mostrar(chave, criar, exibir) troca a tela exibida, reaproveitando a guardada"""
+
+    def __init__(self, limite_controles=LIMITE_CONTROLES):
+        self.limite_controles = limite_controles
+        self._telas = OrderedDict()  # chave -> _Tela, da usada há mais tempo para a mais recente
+        self._atual = [None]
+        self._lock = threading.RLock()
+        adicionar_observador_alteracoes(self._on_alteracoes, chave="telas")
+
+    def __contains__(self, chave):
+        return chave in self._telas
+
+    def mostrar(self, chave, criar, exibir, tabelas=TABELAS_ALTERACOES):
+        """
+        Exibe a tela `chave` com exibir(controle). criar() só roda na
+        primeira vez, depois de um invalidar() ou se `tabelas` mudaram com
+        a tela escondida. tabelas=None: a tela não é guardada.
+        """
+        with self._lock:
+            self._esconder_atual()
+            tela = self._telas.pop(chave, None)
+            if tela is not None and tela.reconstruir:
+                tela = None
+            if tela is None:
+                controle = criar()  # a tela registra o observador dela, se tiver
+                tela = _Tela(chave, controle, tabelas, observador_alteracoes(CHAVE_TELA))
+            elif tela.observador is not None:
+                adicionar_observador_alteracoes(tela.observador, chave=CHAVE_TELA)
+            if tabelas is not None:
+                self._telas[chave] = tela
+                self._liberar(manter=chave)
+            self._atual[0] = chave
+
+        exibir(tela.controle)
+        self.refresh(chave)
+        return tela.controle
+
+    def refresh(self, chave):
+        """Entrega à tela as alterações acumuladas enquanto ela estava escondida"""
+        with self._lock:
+            tela = self._telas.get(chave)
+            if tela is None or tela.observador is None:
+                return
+            pendentes, tela.pendentes = tela.pendentes, []
+        if pendentes is None or pendentes:
+            try:
+                tela.observador(pendentes)
+            except Exception as ex:
+                print(f"[TELAS] Erro ao atualizar a tela {chave!r}: {ex}", file=sys.stderr)
+
+    def invalidar(self, *chaves):
+        """Descarta as telas (todas, sem argumentos): serão criadas de novo"""
+        with self._lock:
+            for chave in (chaves or list(self._telas)):
+                if chave != self._atual[0]:
+                    self._telas.pop(chave, None)
+                elif chave in self._telas:
+                    self._telas[chave].reconstruir = True
+
+    def _esconder_atual(self):
+        tela = self._telas.get(self._atual[0])
+        if tela is not None:
+            tela.observador = observador_alteracoes(CHAVE_TELA)
+            tela.tamanho = contar_controles(tela.controle)
+        remover_observador_alteracoes(CHAVE_TELA)
+        self._atual[0] = None
+
+    def _liberar(self, manter):
+        """Tira as telas usadas há mais tempo até caber no orçamento"""
+        total = sum(t.tamanho for t in self._telas.values())
+        for chave in list(self._telas):
+            if total <= self.limite_controles:
+                break
+            if chave != manter:
+                total -= self._telas.pop(chave).tamanho
+
+    def _on_alteracoes(self, alteracoes):
+        with self._lock:
+            for chave, tela in self._telas.items():
+                if tela.observador is not None:
+                    if chave == self._atual[0]:
+                        continue  # a tela exibida recebe pelo próprio observador
+                    if alteracoes is None or tela.pendentes is None:
+                        tela.pendentes = None
+                    else:
+                        tela.pendentes.extend(alteracoes)
+                        if len(tela.pendentes) > LIMITE_ALTERACOES:
+                            tela.pendentes = None
+                elif alteracoes is None or any(a['tabela'] in tela.tabelas for a in alteracoes):
+                    tela.reconstruir = True  # exibida ou não: a próxima visita recria
@@ -0,0 +1,177 @@
+"""
+Valores monetários em centavos inteiros.
+
+O banco grava os valores (honorários, recibos, certificados...) como INTEGER
+em centavos; as conexões do database convertem as colunas DINHEIRO em
+Dinheiro na leitura. Dinheiro é um float (formatação, comparação e gráficos
+continuam funcionando), mas guarda os centavos exatos: somas e subtrações
+entre Dinheiro são feitas em inteiros.
+
+Valor ausente: Dinheiro(valor) exige um valor (None é erro, não vira zero);
+onde o valor pode faltar (planilhas, campos opcionais, colunas que aceitam
+NULL) use Dinheiro.de_reais(valor), que devolve None.
+"""
+from decimal import Decimal, ROUND_HALF_UP
+
+
+class Dinheiro(float):
+    """Valor em reais guardado como centavos inteiros"""
+
+    __slots__ = ("centavos",)
+
+    def __new__(cls, valor=0):
+        if isinstance(valor, Dinheiro):
+            return valor
+        if valor is None:
+            raise TypeError("Dinheiro(None): para valor ausente use Dinheiro.de_reais()")
+        centavos = int(Decimal(str(valor)).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP) * 100)
+        return cls.de_centavos(centavos)
+
+    @classmethod
+    def de_centavos(cls, centavos):
+        """Dinheiro a partir de centavos inteiros (como gravado no banco)"""
+        obj = float.__new__(cls, centavos / 100)
+        obj.centavos = int(centavos)
+        return obj
+
+    @classmethod
+    def de_reais(cls, valor):
+        """Converte float/int/str em reais, arredondando para o centavo. None fica None."""
+        if valor is None:
+            return None
+        return cls(valor)
+
+    # Aritmética exata entre valores monetários
+    def __add__(self, outro):
+        if isinstance(outro, (int, float)):
+            return Dinheiro.de_centavos(self.centavos + Dinheiro(outro).centavos)
+        return NotImplemented
+
+    __radd__ = __add__
+
+    def __sub__(self, outro):
+        if isinstance(outro, (int, float)):
+            return Dinheiro.de_centavos(self.centavos - Dinheiro(outro).centavos)
+        return NotImplemented
+
+    def __rsub__(self, outro):
+        if isinstance(outro, (int, float)):
+            return Dinheiro.de_centavos(Dinheiro(outro).centavos - self.centavos)
+        return NotImplemented
+
+    def __neg__(self):
+        return Dinheiro.de_centavos(-self.centavos)
+
+    def __abs__(self):
+        return Dinheiro.de_centavos(abs(self.centavos))
+
+    def __mul__(self, fator):
+        if isinstance(fator, (int, float)) and not isinstance(fator, Dinheiro):
+            return Dinheiro(Decimal(self.centavos) * Decimal(str(fator)) / 100)
+        return NotImplemented
+
+    __rmul__ = __mul__
+
+    def __repr__(self):
+        return f"Dinheiro('{self}')"
+
+    def __str__(self):
+        sinal = "-" if self.centavos < 0 else ""
+        reais, centavos = divmod(abs(self.centavos), 100)
+        return f"{sinal}{reais}.{centavos:02d}"
+
+    def __reduce__(self):
+        return (Dinheiro.de_centavos, (self.centavos,))
+
+    def formatar(self):
+        """R$ 1.234,56"""
+        return formatar_moeda(self)
+
+    def por_extenso(self):
+        """Valor por extenso: 'mil e duzentos reais e cinquenta centavos'"""
+        return numero_por_extenso(self)
+
+
+def centavos(valor):
+    """Centavos inteiros de um valor em reais (None fica None)"""
+    return None if valor is None else Dinheiro(valor).centavos
+
+
+def formatar_moeda(valor):
+    """Formata valor como moeda brasileira"""
+    return f"R$ {valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+
+# === VALOR POR EXTENSO ===
+
+UNIDADES = ["", "um", "dois", "três", "quatro", "cinco", "seis", "sete", "oito", "nove"]
+DEZ_A_DEZENOVE = ["dez", "onze", "doze", "treze", "quatorze", "quinze", "dezesseis", "dezessete", "dezoito", "dezenove"]
+DEZENAS = ["", "", "vinte", "trinta", "quarenta", "cinquenta", "sessenta", "setenta", "oitenta", "noventa"]
+CENTENAS = ["", "cento", "duzentos", "trezentos", "quatrocentos", "quinhentos", "seiscentos", "setecentos", "oitocentos", "novecentos"]
+
+
+def _extenso_centena(n):
+    if n == 0: return ""
+    if n == 100: return "cem"
+
+    c = n // 100
+    d = (n % 100)
+
+    texto = []
+    if c > 0: texto.append(CENTENAS[c])
+
+    if d > 0:
+        if texto: texto.append("e")
+        if d < 10: texto.append(UNIDADES[d])
+        elif d < 20: texto.append(DEZ_A_DEZENOVE[d-10])
+        else:
+            texto.append(DEZENAS[d//10])
+            if d % 10 > 0:
+                texto.append("e")
+                texto.append(UNIDADES[d%10])
+    return " ".join(texto)
+
+
+def _extenso_milhar(n):
+    if n == 0: return ""
+    partes = []
+
+    milhoes = n // 1000000
+    mil = (n % 1000000) // 1000
+    cent = n % 1000
+
+    if milhoes > 0:
+        partes.append(_extenso_centena(milhoes))
+        partes.append("milhão" if milhoes == 1 else "milhões")
+        if (mil > 0 or cent > 0): partes.append("e")
+
+    if mil > 0:
+        if mil == 1: partes.append("um mil")
+        else:
+            partes.append(_extenso_centena(mil))
+            partes.append("mil")
+        if cent > 0: partes.append("e")
+
+    if cent > 0:
+        partes.append(_extenso_centena(cent))
+
+    return " ".join(partes)
+
+
+def numero_por_extenso(valor):
+    """Converte um valor em reais para texto por extenso"""
+    inteiro, decimal = divmod(abs(Dinheiro(valor).centavos), 100)
+    if inteiro == 0 and decimal == 0:
+        return "zero reais"
+
+    texto = []
+    if inteiro > 0:
+        texto.append(_extenso_milhar(inteiro))
+        texto.append("real" if inteiro == 1 else "reais")
+
+    if decimal > 0:
+        if inteiro > 0: texto.append("e")
+        texto.append(_extenso_centena(decimal))
+        texto.append("centavo" if decimal == 1 else "centavos")
+
+    return " ".join(texto)
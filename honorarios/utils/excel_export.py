@@ -6,8 +6,11 @@ import os
 from datetime import datetime
 
 
-def exportar_excel_completo(ano, pasta_destino=None):
-    """Exporta relatório completo do ano para Excel"""
+def exportar_excel_completo(ano, pasta_destino=None, tarefa=None):
+    """
+    Exporta relatório completo do ano para Excel.
+    Com tarefa (utils/tarefas.py) informa o andamento e pode ser cancelado.
+    """
     try:
         # Tentar usar openpyxl para Excel formatado
         from openpyxl import Workbook
@@ -68,8 +71,14 @@ def exportar_excel_completo(ano, pasta_destino=None):
         
         MESES = ["Jan", "Fev", "Mar", "Abr", "Mai", "Jun", "Jul", "Ago", "Set", "Out", "Nov", "Dez", "13º"]
         honorarios = listar_honorarios(ano=ano)
+        clientes = listar_clientes()
+        if tarefa is not None:
+            tarefa.progresso(0, len(honorarios) + len(clientes))
         
         for i, h in enumerate(honorarios, start=2):
+            if tarefa is not None and i % 100 == 0:
+                tarefa.verificar()
+                tarefa.progresso(i - 1)
             ws_honorarios.cell(row=i, column=1, value=h['cliente_nome'])
             ws_honorarios.cell(row=i, column=2, value=MESES[h['mes']-1] if h['mes'] <= 13 else str(h['mes']))
             ws_honorarios.cell(row=i, column=3, value=h['valor'])
@@ -102,10 +111,12 @@ def exportar_excel_completo(ano, pasta_destino=None):
             cell.font = header_font
             cell.fill = header_fill
         
-        clientes = listar_clientes()
         row = 2
         
-        for cliente in clientes:
+        for n, cliente in enumerate(clientes, start=1):
+            if tarefa is not None:
+                tarefa.verificar()
+                tarefa.progresso(len(honorarios) + n)
             h_cliente = [h for h in honorarios if h['cliente_id'] == cliente['id']]
             if not h_cliente:
                 continue
@@ -150,6 +161,8 @@ def exportar_excel_completo(ano, pasta_destino=None):
         # Fallback para CSV se openpyxl não estiver instalado
         return False, "openpyxl não instalado. Use: pip install openpyxl"
     except Exception as e:
+        if tarefa is not None and tarefa.cancelada:
+            raise
         return False, str(e)
 
 
@@ -0,0 +1,146 @@
+"""
+Lista virtualizada para listas longas (clientes, honorários, certificados).
+
+Só as linhas visíveis (mais uma margem) existem como controles: acima e
+abaixo delas ficam dois espaçadores com a altura das linhas que não foram
+criadas. Todas as linhas têm a mesma altura (altura_item), então a posição
+de cada item é calculada direto da rolagem. Ao rolar, as linhas que saem da
+janela são reaproveitadas para os itens que entram: preencher(linha, item)
+só troca os valores dos controles que já existem.
+
+    lista = ListaVirtual(construir=criar_linha, preencher=preencher_linha, altura_item=48)
+    lista.definir_itens(honorarios)
+    ... content=lista.controle ...
+"""
+import flet as ft
+
+
+def janela(deslocamento, altura_visivel, altura_item, total, margem):
+    """(início, fim) dos itens que precisam existir para a rolagem atual"""
+    if total <= 0:
+        return 0, 0
+    inicio = max(0, int(deslocamento // altura_item) - margem)
+    fim = min(total, int((deslocamento + altura_visivel) // altura_item) + 1 + margem)
+    return min(inicio, fim), fim
+
+
+class ListaVirtual:
+    """
+    construir(item) cria a linha de um item; preencher(linha, item) reaproveita
+    uma linha para outro item (sem preencher, a linha é criada de novo).
+    """
+
+    def __init__(self, construir, preencher=None, altura_item=48, espacamento=4, margem=10,
+                 altura_visivel=800, **kwargs):
+        self._construir = construir
+        self._preencher = preencher
+        self.altura_item = altura_item
+        self.espacamento = espacamento
+        self.margem = margem
+        self.itens = []
+        self._altura_visivel = altura_visivel
+        self._deslocamento = 0
+        self._inicio = 0
+        self._linhas = {}  # índice do item -> moldura (Container de altura fixa com a linha)
+        self._topo = ft.Container(height=0)
+        self._base = ft.Container(height=0)
+        kwargs.setdefault("expand", True)
+        self.controle = ft.ListView(
+            controls=[self._topo, self._base],
+            spacing=0,
+            on_scroll=self._on_scroll,
+            on_scroll_interval=30,
+            **kwargs,
+        )
+
+    def __len__(self):
+        return len(self.itens)
+
+    def _moldura(self, linha):
+        return ft.Container(content=linha, height=self.altura_item,
+                            padding=ft.padding.only(bottom=self.espacamento))
+
+    def _vincular(self, moldura, item):
+        """Põe o item na moldura, reaproveitando a linha quando possível"""
+        if self._preencher is not None and moldura.content is not None:
+            self._preencher(moldura.content, item)
+        else:
+            moldura.content = self._construir(item)
+
+    def _renderizar(self, recriar=False):
+        inicio, fim = janela(self._deslocamento, self._altura_visivel, self.altura_item,
+                             len(self.itens), self.margem)
+        antigas = {} if recriar else self._linhas
+        livres = [m for i, m in antigas.items() if not inicio <= i < fim]
+        if recriar:
+            livres += list(self._linhas.values())
+
+        linhas = {}
+        for i in range(inicio, fim):
+            moldura = antigas.get(i)
+            if moldura is None:
+                moldura = livres.pop() if livres else self._moldura(None)
+                self._vincular(moldura, self.itens[i])
+            linhas[i] = moldura
+
+        self._linhas = linhas
+        self._inicio = inicio
+        self._topo.height = inicio * self.altura_item
+        self._base.height = (len(self.itens) - fim) * self.altura_item
+        self.controle.controls = [self._topo, *(linhas[i] for i in range(inicio, fim)), self._base]
+
+    def _atualizar_tela(self):
+        if self.controle.page is not None:
+            self.controle.update()
+
+    def _on_scroll(self, e):
+        self._deslocamento = e.pixels or 0
+        if e.viewport_dimension:
+            self._altura_visivel = e.viewport_dimension
+        inicio, fim = janela(self._deslocamento, self._altura_visivel, self.altura_item,
+                             len(self.itens), self.margem)
+        atual_fim = self._inicio + len(self._linhas)
+        # Só refaz a janela quando a margem está para acabar
+        if inicio < self._inicio or fim > atual_fim or (inicio - self._inicio) > self.margem:
+            self._renderizar()
+            self._atualizar_tela()
+
+    def definir_itens(self, itens, atualizar=True):
+        """
+        Troca todos os itens (novo filtro/consulta) e volta ao topo. A rolagem
+        volta sempre, mesmo com atualizar=False: a janela recriada começa no
+        item 0. scroll_to() só move a rolagem; com atualizar=False os itens
+        novos vão no próximo update() de quem chamou.
+        """
+        self.itens = list(itens)
+        self._deslocamento = 0
+        self._renderizar(recriar=True)
+        if atualizar:
+            self._atualizar_tela()
+        if self.controle.page is not None:
+            self.controle.scroll_to(offset=0, duration=0)
+
+    def adicionar_itens(self, itens, atualizar=True):
+        """Acrescenta itens no fim (próxima página), mantendo a rolagem"""
+        self.itens.extend(itens)
+        self._renderizar()
+        if atualizar:
+            self._atualizar_tela()
+
+    def atualizar_item(self, indice, item=None, atualizar=True):
+        """Troca um item; se a linha dele existe, atualiza só ela"""
+        if item is not None:
+            self.itens[indice] = item
+        moldura = self._linhas.get(indice)
+        if moldura is None:
+            return False
+        self._vincular(moldura, self.itens[indice])
+        if atualizar and moldura.page is not None:
+            moldura.update()
+        return True
+
+    def redesenhar(self):
+        """Preenche de novo as linhas existentes (ex.: seleção mudou em todos os itens)"""
+        for indice, moldura in self._linhas.items():
+            self._vincular(moldura, self.itens[indice])
+        self._atualizar_tela()
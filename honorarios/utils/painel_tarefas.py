@@ -0,0 +1,85 @@
+"""
+Painel de progresso das tarefas em segundo plano (utils/tarefas.py).
+
+Fica no rodapé da área de conteúdo e mostra, para cada tarefa esperando ou
+rodando, o nome, a barra de progresso, feitos/total com o tempo restante
+estimado e um botão de cancelar. Some quando não há tarefa ativa.
+"""
+import threading
+
+import flet as ft
+
+from utils.theme import CORES
+from utils.tarefas import adicionar_observador_tarefas
+
+
+def formatar_eta(segundos):
+    """Tempo restante legível: '~45s', '~3min', '~1h05'"""
+    if segundos is None:
+        return ""
+    segundos = int(round(segundos))
+    if segundos < 60:
+        return f"~{segundos}s"
+    if segundos < 3600:
+        return f"~{segundos // 60}min"
+    return f"~{segundos // 3600}h{segundos % 3600 // 60:02d}"
+
+
+class PainelTarefas:
+    """painel.controle vai no layout; as linhas são atualizadas pelos avisos das tarefas"""
+
+    def __init__(self, theme):
+        self.theme = theme
+        self._linhas = {}  # tarefa.chave -> (linha, barra, texto)
+        self._lock = threading.Lock()
+        self._coluna = ft.Column([], spacing=6)
+        self.controle = ft.Container(
+            content=self._coluna,
+            padding=ft.padding.symmetric(horizontal=20, vertical=10),
+            bgcolor=theme.get_surface(),
+            border=ft.border.only(top=ft.BorderSide(1, theme.get_border())),
+            visible=False,
+        )
+        adicionar_observador_tarefas(self._on_tarefa, chave="painel")
+
+    def _criar_linha(self, tarefa):
+        barra = ft.ProgressBar(width=220, color=CORES["accent"], bgcolor=self.theme.get_surface_hover())
+        texto = ft.Text("", size=11, color=self.theme.get_text_secondary())
+        linha = ft.Row([
+            ft.Text(tarefa.nome, size=12, weight=ft.FontWeight.W_500, color=self.theme.get_text_color(), width=180),
+            barra,
+            texto,
+            ft.Container(expand=True),
+            ft.IconButton(
+                ft.Icons.CLOSE, icon_size=16, icon_color=CORES["danger"],
+                tooltip="Cancelar", on_click=lambda e: tarefa.cancelar(),
+            ),
+        ], spacing=12, vertical_alignment=ft.CrossAxisAlignment.CENTER)
+        return linha, barra, texto
+
+    def _on_tarefa(self, tarefa):
+        with self._lock:
+            if tarefa.terminada:
+                item = self._linhas.pop(tarefa.chave, None)
+                if item is not None:
+                    self._coluna.controls.remove(item[0])
+            else:
+                if tarefa.chave not in self._linhas:
+                    self._linhas[tarefa.chave] = self._criar_linha(tarefa)
+                    self._coluna.controls.append(self._linhas[tarefa.chave][0])
+                _, barra, texto = self._linhas[tarefa.chave]
+                barra.value = tarefa.fracao  # None = barra indeterminada
+                partes = []
+                if tarefa.status == "AGUARDANDO":
+                    partes.append("na fila")
+                elif tarefa.total:
+                    partes.append(f"{tarefa.feitos}/{tarefa.total}")
+                if tarefa.mensagem:
+                    partes.append(tarefa.mensagem)
+                eta = formatar_eta(tarefa.eta())
+                if eta and not tarefa.cancelada:
+                    partes.append(f"{eta} restantes")
+                texto.value = " • ".join(partes)
+            self.controle.visible = bool(self._linhas)
+            if self.controle.page is not None:
+                self.controle.update()
@@ -10,76 +10,7 @@ from reportlab.lib.colors import HexColor
 import os
 from datetime import datetime
 
-# Converte número para texto por extenso
-def numero_por_extenso(valor):
-    if valor == 0:
-        return "zero reais"
-        
-    unidades = ["", "um", "dois", "três", "quatro", "cinco", "seis", "sete", "oito", "nove"]
-    dezes = ["dez", "onze", "doze", "treze", "quatorze", "quinze", "dezesseis", "dezessete", "dezoito", "dezenove"]
-    dezenas = ["", "", "vinte", "trinta", "quarenta", "cinquenta", "sessenta", "setenta", "oitenta", "noventa"]
-    centenas = ["", "cento", "duzentos", "trezentos", "quatrocentos", "quinhentos", "seiscentos", "setecentos", "oitocentos", "novecentos"]
-    
-    def extenso_centena(n):
-        if n == 0: return ""
-        if n == 100: return "cem"
-        
-        c = n // 100
-        d = (n % 100)
-        
-        texto = []
-        if c > 0: texto.append(centenas[c])
-        
-        if d > 0:
-            if texto: texto.append("e")
-            if d < 10: texto.append(unidades[d])
-            elif d < 20: texto.append(dezes[d-10])
-            else:
-                texto.append(dezenas[d//10])
-                if d % 10 > 0:
-                    texto.append("e")
-                    texto.append(unidades[d%10])
-        return " ".join(texto)
-
-    def extenso_milhar(n):
-        if n == 0: return ""
-        partes = []
-        
-        milhoes = n // 1000000
-        mil = (n % 1000000) // 1000
-        cent = n % 1000
-        
-        if milhoes > 0:
-            partes.append(extenso_centena(milhoes))
-            partes.append("milhão" if milhoes == 1 else "milhões")
-            if (mil > 0 or cent > 0): partes.append("e")
-            
-        if mil > 0:
-            if mil == 1: partes.append("um mil")
-            else: 
-                partes.append(extenso_centena(mil))
-                partes.append("mil")
-            if cent > 0: partes.append("e")
-            
-        if cent > 0:
-            partes.append(extenso_centena(cent))
-            
-        return " ".join(partes)
-
-    inteiro = int(valor)
-    decimal = int(round((valor - inteiro) * 100))
-    
-    texto = []
-    if inteiro > 0:
-        texto.append(extenso_milhar(inteiro))
-        texto.append("real" if inteiro == 1 else "reais")
-    
-    if decimal > 0:
-        if inteiro > 0: texto.append("e")
-        texto.append(extenso_centena(decimal))
-        texto.append("centavo" if decimal == 1 else "centavos")
-        
-    return " ".join(texto)
+from utils.dinheiro import Dinheiro, formatar_moeda, numero_por_extenso
 
 
 MESES = [
@@ -114,15 +45,12 @@ def gerar_pdf_recibo(cliente, valor, mes, ano, numero_recibo, pasta_destino, dad
     
     margin = 50
     
-    # Calcular valores separados
-    valor_certificados = sum(cert.get('valor', 0) for cert in certificados)
-    valor_extras = sum(ext.get('valor', 0) for ext in extras)
+    # Calcular valores separados (em centavos, sem erro de arredondamento)
+    valor = Dinheiro(valor)
+    valor_certificados = sum((Dinheiro(cert.get('valor', 0)) for cert in certificados), Dinheiro())
+    valor_extras = sum((Dinheiro(ext.get('valor', 0)) for ext in extras), Dinheiro())
     valor_honorario = valor - valor_certificados - valor_extras  # Valor base do honorário
     
-    # Formatar valores
-    def formatar_moeda(v):
-        return f"R$ {v:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-    
     # ═══════════════════════════════════════════════════════════════
     # CABEÇALHO - Dados da empresa centralizados
     # ═══════════════════════════════════════════════════════════════
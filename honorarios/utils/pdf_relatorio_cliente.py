@@ -11,6 +11,8 @@ from reportlab.platypus import Table, TableStyle
 import os
 from datetime import datetime
 
+from utils.dinheiro import formatar_moeda
+
 
 MESES = [
     "Janeiro", "Fevereiro", "Março", "Abril", "Maio", "Junho",
@@ -20,11 +22,6 @@ MESES = [
 MESES_CURTO = ["Jan", "Fev", "Mar", "Abr", "Mai", "Jun", "Jul", "Ago", "Set", "Out", "Nov", "Dez", "13º"]
 
 
-def formatar_moeda(valor):
-    """Formata valor como moeda brasileira"""
-    return f"R$ {valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-
-
 def gerar_pdf_relatorio_cliente(dados_relatorio, pasta_destino, dados_empresa=None):
     """
     Gera um PDF premium com relatório completo do cliente
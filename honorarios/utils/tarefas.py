@@ -0,0 +1,199 @@
+"""
+Tarefas longas em segundo plano (recibos, exportações, importação, geração).
+
+executar(nome, funcao) devolve a Tarefa na hora e roda funcao(tarefa) num
+pool limitado de threads (MAX_TRABALHADORES): a tela continua respondendo.
+A função informa o andamento com tarefa.progresso(feitos, total) e, entre
+um passo e outro, chama tarefa.verificar(), que interrompe a tarefa com
+TarefaCancelada quando o usuário pediu para cancelar. Cada tarefa fica
+registrada na tabela tarefas (início, fim, resultado ou erro), e os
+observadores (o painel de progresso) são avisados das mudanças.
+
+    def gerar(tarefa):
+        for i, item in enumerate(itens):
+            tarefa.verificar()
+            ...
+            tarefa.progresso(i + 1, len(itens))
+        return f"{len(itens)} gerados"
+
+    executar("Gerar recibos", gerar, ao_terminar=mostrar_resultado)
+"""
+import itertools
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from database import registrar_tarefa, finalizar_tarefa, fechar_conexao_thread
+
+
+MAX_TRABALHADORES = 2   # tarefas rodando ao mesmo tempo; as demais esperam na fila
+INTERVALO_AVISO = 0.2   # segundos mínimos entre avisos de progresso da mesma tarefa
+
+_pool = [None]
+_pool_lock = threading.Lock()
+_ativas = {}                # tarefa.chave -> Tarefa (esperando ou rodando)
+_observadores_tarefas = {}  # chave -> funcao(tarefa)
+
+
+class TarefaCancelada(Exception):
+    """Levantada por Tarefa.verificar() quando o cancelamento foi pedido"""
+
+
+class Tarefa:
+    """Andamento de uma tarefa: status, feitos/total, mensagem, resultado ou erro"""
+
+    _contador = itertools.count(1)  # next() é atômico no CPython; += 1 não é
+
+    def __init__(self, nome, usuario=None, total=None):
+        self.chave = next(Tarefa._contador)
+        self.id = None  # id na tabela tarefas
+        self.nome = nome
+        self.usuario = usuario
+        self.status = "AGUARDANDO"
+        self.feitos = 0
+        self.total = total
+        self.mensagem = ""
+        self.resultado = None
+        self.erro = None
+        self.inicio = None
+        self._cancelar = threading.Event()
+        self._fim = threading.Event()
+        self._ultimo_aviso = 0.0
+
+    def __repr__(self):
+        return f"<Tarefa {self.nome!r} {self.status} {self.feitos}/{self.total}>"
+
+    @property
+    def cancelada(self):
+        return self._cancelar.is_set()
+
+    @property
+    def terminada(self):
+        return self.status in ("CONCLUIDA", "CANCELADA", "ERRO")
+
+    @property
+    def fracao(self):
+        """Parte concluída (0 a 1) ou None se o total não é conhecido"""
+        if not self.total:
+            return None
+        return min(1.0, self.feitos / self.total)
+
+    def eta(self):
+        """Segundos estimados até o fim (pelo ritmo até aqui) ou None"""
+        if not self.total or not self.feitos or self.inicio is None:
+            return None
+        decorrido = time.monotonic() - self.inicio
+        return decorrido / self.feitos * max(0, self.total - self.feitos)
+
+    def progresso(self, feitos=None, total=None, mensagem=None):
+        """Atualiza o andamento (chamado pela função da tarefa)"""
+        if feitos is not None:
+            self.feitos = feitos
+        if total is not None:
+            self.total = total
+        if mensagem is not None:
+            self.mensagem = mensagem
+        agora = time.monotonic()
+        if agora - self._ultimo_aviso >= INTERVALO_AVISO or (self.total and self.feitos >= self.total):
+            self._ultimo_aviso = agora
+            _avisar(self)
+
+    def verificar(self):
+        """Ponto de cancelamento: levanta TarefaCancelada se o usuário cancelou"""
+        if self._cancelar.is_set():
+            raise TarefaCancelada()
+
+    def cancelar(self):
+        """Pede o cancelamento; a tarefa para no próximo verificar()"""
+        if not self.terminada:
+            self._cancelar.set()
+            self.mensagem = "Cancelando..."
+            _avisar(self)
+
+    def aguardar(self, timeout=None):
+        """Espera a tarefa terminar (inclusive ao_terminar). Retorna False se estourar o timeout."""
+        return self._fim.wait(timeout)
+
+
+def _avisar(tarefa):
+    for funcao in list(_observadores_tarefas.values()):
+        try:
+            funcao(tarefa)
+        except Exception as ex:
+            print(f"[TAREFAS] Erro em observador: {ex}", file=sys.stderr)
+
+
+def adicionar_observador_tarefas(funcao, chave=None):
+    """funcao(tarefa) é chamada a cada mudança de andamento ou status"""
+    _observadores_tarefas[chave if chave is not None else funcao] = funcao
+
+
+def remover_observador_tarefas(chave):
+    _observadores_tarefas.pop(chave, None)
+
+
+def tarefas_ativas():
+    """Tarefas esperando ou rodando, na ordem em que foram criadas"""
+    return sorted(_ativas.values(), key=lambda t: t.chave)
+
+
+def _pool_tarefas():
+    with _pool_lock:
+        if _pool[0] is None:
+            _pool[0] = ThreadPoolExecutor(max_workers=MAX_TRABALHADORES, thread_name_prefix="tarefa")
+        return _pool[0]
+
+
+def _registrar(tarefa, fim=False):
+    """Histórico na tabela tarefas; uma falha aqui não interrompe a tarefa"""
+    try:
+        if tarefa.id is None:
+            tarefa.id = registrar_tarefa(tarefa.nome, tarefa.usuario, tarefa.total)
+        if fim:
+            resultado = None if tarefa.resultado is None else str(tarefa.resultado)[:1000]
+            finalizar_tarefa(tarefa.id, tarefa.status, tarefa.feitos, tarefa.total, resultado, tarefa.erro)
+    except Exception as ex:
+        print(f"[TAREFAS] Erro ao registrar '{tarefa.nome}': {ex}", file=sys.stderr)
+
+
+def _rodar(tarefa, funcao, ao_terminar):
+    try:
+        tarefa.verificar()  # cancelada enquanto esperava na fila
+        tarefa.status = "RODANDO"
+        tarefa.inicio = time.monotonic()
+        _registrar(tarefa)
+        _avisar(tarefa)
+        tarefa.resultado = funcao(tarefa)
+        tarefa.status = "CONCLUIDA"
+    except TarefaCancelada:
+        tarefa.status = "CANCELADA"
+    except Exception as ex:
+        tarefa.status = "ERRO"
+        tarefa.erro = str(ex) or ex.__class__.__name__
+        print(f"[TAREFAS] Erro em '{tarefa.nome}':\n{traceback.format_exc()}", file=sys.stderr)
+    finally:
+        _registrar(tarefa, fim=True)
+        _ativas.pop(tarefa.chave, None)
+        _avisar(tarefa)
+        if ao_terminar is not None:
+            try:
+                ao_terminar(tarefa)
+            except Exception as ex:
+                print(f"[TAREFAS] Erro ao terminar '{tarefa.nome}': {ex}", file=sys.stderr)
+        fechar_conexao_thread()
+        tarefa._fim.set()
+
+
+def executar(nome, funcao, usuario=None, total=None, ao_terminar=None):
+    """
+    Roda funcao(tarefa) em segundo plano e retorna a Tarefa.
+    ao_terminar(tarefa) roda na thread da tarefa quando ela acaba, com
+    tarefa.status CONCLUIDA (tarefa.resultado), CANCELADA ou ERRO (tarefa.erro).
+    """
+    tarefa = Tarefa(nome, usuario, total)
+    _ativas[tarefa.chave] = tarefa
+    _avisar(tarefa)
+    _pool_tarefas().submit(_rodar, tarefa, funcao, ao_terminar)
+    return tarefa
@@ -1,6 +1,12 @@
 """
 Gerenciador de Tema - Sistema de Honorários Contábeis
 Dark/Light mode com cores dinâmicas
+
+As cores que mudam com o tema são papéis do ColorScheme do Flet: get_surface()
+devolve "surface", get_text_color() "onsurface" etc., e page.theme/page.dark_theme
+dizem qual cor cada papel tem em cada modo (aplicar). O fundo não é um papel:
+vem do scaffold_bgcolor e do dialog_theme de cada tema, e get_bg() devolve None
+(transparente). Alternar o tema só troca page.theme_mode: nenhum controle é recriado.
 """
 
 # Design System - Cores
@@ -37,6 +43,23 @@ CORES = {
     "border_dark": "#334155",  # Borda sutil no modo escuro
 }
 
+# Papel do ColorScheme de cada cor do tema:
+# cor -> (campo do ft.ColorScheme, nome usado nos controles, cor clara, cor escura)
+# Inputs usam surfaceContainerHighest, o fundo dos campos preenchidos no Material 3.
+PAPEIS = {
+    "surface": ("surface", "surface", "surface_light", "surface_dark"),
+    "surface_hover": ("surface_variant", "surfacevariant", "surface_hover_light", "surface_hover_dark"),
+    "text_primary": ("on_surface", "onsurface", "text_primary_light", "text_primary_dark"),
+    "text_secondary": ("on_surface_variant", "onsurfacevariant", "text_secondary_light", "text_secondary_dark"),
+    "border": ("outline_variant", "outlinevariant", "border_light", "border_dark"),
+    "input_bg": ("surface_container_highest", "surfacecontainerhighest", "input_bg_light", "surface_hover_dark"),
+    "input_border": ("outline", "outline", "input_border_light", "border_dark"),
+}
+
+# Fundo das telas e diálogos (claro, escuro): fora do ColorScheme, cujo papel
+# "background" está obsoleto no Material 3
+FUNDO = ("bg_light", "bg_dark")
+
 # Gradiente do menu lateral - Azul escuro, branco e dourado
 MENU_GRADIENT_COLORS = ["#C4A962", "#B8976F", "#1A2957", "#152042", "#0F172A"]
 
@@ -69,29 +92,45 @@ class ThemeManager:
         mode = "dark" if self.is_dark[0] else "light"
         set_config("theme_mode", mode)
     
-    def get_bg(self) -> str:
-        """Cor de fundo principal"""
-        return CORES["bg_dark"] if self.is_dark[0] else CORES["bg_light"]
+    def aplicar(self, page, font_family=None):
+        """Cores de cada papel no modo claro e no escuro, e o modo atual (chame page.update())"""
+        import flet as ft
+        
+        font_family = font_family or (page.theme.font_family if page.theme else None)
+        for atributo, escuro in (("theme", False), ("dark_theme", True)):
+            # Campo a campo: surface_container_highest ainda não está declarado no
+            # ft.ColorScheme do Flet 0.25, mas o esquema vai ao cliente com todos os atributos
+            esquema = ft.ColorScheme()
+            for campo, _, clara, escura in PAPEIS.values():
+                setattr(esquema, campo, CORES[escura if escuro else clara])
+            fundo = CORES[FUNDO[escuro]]
+            setattr(page, atributo, ft.Theme(font_family=font_family, color_scheme=esquema,
+                                             scaffold_bgcolor=fundo, dialog_theme=ft.DialogTheme(bgcolor=fundo)))
+        page.theme_mode = ft.ThemeMode.DARK if self.is_dark[0] else ft.ThemeMode.LIGHT
+    
+    def get_bg(self):
+        """Fundo principal: None (transparente), o tema pinta a página e os diálogos"""
+        return None
     
     def get_surface(self) -> str:
         """Cor de superfície (cards, modais)"""
-        return CORES["surface_dark"] if self.is_dark[0] else CORES["surface_light"]
+        return PAPEIS["surface"][1]
     
     def get_surface_hover(self) -> str:
         """Cor de superfície no hover"""
-        return CORES["surface_hover_dark"] if self.is_dark[0] else CORES["surface_hover_light"]
+        return PAPEIS["surface_hover"][1]
     
     def get_text_color(self) -> str:
         """Cor do texto principal"""
-        return CORES["text_primary_dark"] if self.is_dark[0] else CORES["text_primary_light"]
+        return PAPEIS["text_primary"][1]
     
     def get_text_secondary(self) -> str:
         """Cor do texto secundário"""
-        return CORES["text_secondary_dark"] if self.is_dark[0] else CORES["text_secondary_light"]
+        return PAPEIS["text_secondary"][1]
     
     def get_border(self) -> str:
         """Cor da borda de cards"""
-        return CORES["border_dark"] if self.is_dark[0] else CORES["border_light"]
+        return PAPEIS["border"][1]
     
     def get_shadow_opacity(self) -> float:
         """Opacidade da sombra (mais visível no modo claro)"""
@@ -99,8 +138,8 @@ class ThemeManager:
     
     def get_input_bg(self) -> str:
         """Cor de fundo dos inputs"""
-        return CORES["surface_hover_dark"] if self.is_dark[0] else CORES["input_bg_light"]
+        return PAPEIS["input_bg"][1]
     
     def get_input_border(self) -> str:
         """Cor da borda dos inputs"""
-        return CORES["border_dark"] if self.is_dark[0] else CORES["input_border_light"]
+        return PAPEIS["input_border"][1]
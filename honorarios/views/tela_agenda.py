@@ -5,9 +5,14 @@ Calendário de cobranças com suporte light/dark
 import flet as ft
 from datetime import datetime
 import calendar
+import threading
 
-from database import listar_honorarios, marcar_como_pago, get_connection, registrar_log
+from database import (
+    get_vencimentos_mes, listar_honorarios_vencimento, buscar_honorario, marcar_como_pago,
+    get_resumo_ano, registrar_log, fechar_conexao_thread
+)
 from utils.theme import CORES
+from utils.dinheiro import formatar_moeda
 from utils.toast import toast_success
 
 
@@ -37,29 +42,28 @@ def criar_tela_agenda(page: ft.Page, theme, usuario_logado=None):
     detalhes_container = ft.Column([], scroll=ft.ScrollMode.AUTO)
     titulo_mes = ft.Text("", size=18, weight=ft.FontWeight.BOLD, color=TEXT_PRIMARY)
     
-    def formatar_moeda(valor):
-        return f"R$ {valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+    def mes_vizinho(mes, ano, delta):
+        indice = ano * 12 + (mes - 1) + delta
+        return indice % 12 + 1, indice // 12
     
-    def get_honorarios_dia(dia, mes, ano):
-        """Honorários que vencem no dia 10 do mês seguinte"""
-        if dia != 10:
-            return []
-        
-        mes_ref = mes - 1 if mes > 1 else 12
-        ano_ref = ano if mes > 1 else ano - 1
-        
-        honorarios = listar_honorarios(ano=ano_ref)
-        return [h for h in honorarios if h['mes'] == mes_ref]
+    def pre_carregar(meses):
+        """Aquece o cache dos meses vizinhos: navegar até eles não espera o banco"""
+        try:
+            for mes, ano in meses:
+                get_vencimentos_mes(ano, mes)
+        except Exception as ex:
+            print(f"[AGENDA] Erro ao pré-carregar vencimentos: {ex}")
+        finally:
+            fechar_conexao_thread()
     
-    def criar_celula(dia, mes, ano):
+    def criar_celula(dia, mes, ano, vencimentos):
         if dia == 0:
             return ft.Container(width=45, height=45)
         
         is_hoje = (dia == hoje.day and mes == hoje.month and ano == hoje.year)
-        honorarios_dia = get_honorarios_dia(dia, mes, ano)
-        
-        pendentes = sum(1 for h in honorarios_dia if h['status'] != 'PAGO')
-        pagos = sum(1 for h in honorarios_dia if h['status'] == 'PAGO')
+        dia_info = vencimentos.get(dia)
+        pendentes = dia_info['pendentes'] if dia_info else 0
+        pagos = dia_info['pagos'] if dia_info else 0
         
         if pendentes > 0:
             cor = WARNING
@@ -89,11 +93,12 @@ def criar_tela_agenda(page: ft.Page, theme, usuario_logado=None):
             border_radius=8,
             alignment=ft.alignment.center,
             on_click=lambda e, d=dia: mostrar_detalhes(d, mes, ano),
+            tooltip=f"A receber: {formatar_moeda(dia_info['valor_pendente'])}" if pendentes else None,
             ink=True,
         )
     
     def mostrar_detalhes(dia, mes, ano):
-        honorarios = get_honorarios_dia(dia, mes, ano)
+        honorarios = listar_honorarios_vencimento(f"{ano:04d}-{mes:02d}-{dia:02d}")
         detalhes_container.controls.clear()
         
         if not honorarios:
@@ -101,25 +106,20 @@ def criar_tela_agenda(page: ft.Page, theme, usuario_logado=None):
                 ft.Text(f"Nenhum vencimento em {dia:02d}/{mes:02d}", size=12, color=TEXT_SECONDARY)
             )
         else:
-            mes_ref = mes - 1 if mes > 1 else 12
-            ano_ref = ano if mes > 1 else ano - 1
-            
             detalhes_container.controls.append(
                 ft.Text(f"📅 Vencimentos {dia:02d}/{mes:02d}", size=14, weight=ft.FontWeight.BOLD, color=TEXT_PRIMARY)
             )
-            detalhes_container.controls.append(
-                ft.Text(f"Ref: {MESES[mes_ref-1]}/{ano_ref}", size=11, color=TEXT_SECONDARY)
-            )
             detalhes_container.controls.append(ft.Container(height=10))
             
             for h in honorarios:
                 cor = SUCCESS if h['status'] == 'PAGO' else WARNING
+                ref = f"{MESES[h['mes']-1][:3]}/{h['ano']}" if h['mes'] <= 12 else f"13º/{h['ano']}"
                 detalhes_container.controls.append(
                     ft.Container(
                         content=ft.Row([
                             ft.Column([
                                 ft.Text(h['cliente_nome'][:20], size=11, weight=ft.FontWeight.BOLD, color=TEXT_PRIMARY),
-                                ft.Text(formatar_moeda(h['valor']), size=10, color=TEXT_SECONDARY),
+                                ft.Text(f"{formatar_moeda(h['valor'])} • Ref: {ref}", size=10, color=TEXT_SECONDARY),
                             ], spacing=2, expand=True),
                             ft.Container(
                                 content=ft.Text(h['status'][:4], size=9, color=TEXT_PRIMARY),
@@ -146,16 +146,7 @@ def criar_tela_agenda(page: ft.Page, theme, usuario_logado=None):
     
     def marcar_e_atualizar(hid, dia, mes, ano):
         # Buscar dados do honorário para log detalhado
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT h.*, c.nome as cliente_nome 
-            FROM honorarios h 
-            JOIN clientes c ON h.cliente_id = c.id
-            WHERE h.id = ?
-        """, (hid,))
-        hon = cursor.fetchone()
-        conn.close()
+        hon = buscar_honorario(hid)
         
         marcar_como_pago(hid)
         
@@ -186,12 +177,14 @@ def criar_tela_agenda(page: ft.Page, theme, usuario_logado=None):
         
         cal = calendar.Calendar(firstweekday=0)
         dias = list(cal.itermonthdays(ano, mes))
+        # Uma consulta agrupada por dia para o mês inteiro (em cache até os honorários mudarem)
+        vencimentos = get_vencimentos_mes(ano, mes)
         
         semanas = []
         semana = []
         
         for dia in dias:
-            semana.append(criar_celula(dia, mes, ano))
+            semana.append(criar_celula(dia, mes, ano, vencimentos))
             if len(semana) == 7:
                 semanas.append(ft.Row(semana, spacing=5))
                 semana = []
@@ -203,6 +196,9 @@ def criar_tela_agenda(page: ft.Page, theme, usuario_logado=None):
         
         calendario_container.content = ft.Column([header, *semanas], spacing=5)
         page.update()
+        
+        vizinhos = [mes_vizinho(mes, ano, -1), mes_vizinho(mes, ano, 1)]
+        threading.Thread(target=pre_carregar, args=(vizinhos,), daemon=True).start()
     
     def mudar_mes(delta):
         mes_atual[0] += delta
@@ -214,17 +210,8 @@ def criar_tela_agenda(page: ft.Page, theme, usuario_logado=None):
             ano_atual[0] -= 1
         atualizar_calendario()
     
-    # Resumo
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT COUNT(*) as total,
-               SUM(CASE WHEN status = 'PAGO' THEN 1 ELSE 0 END) as pagos,
-               SUM(CASE WHEN status != 'PAGO' THEN valor ELSE 0 END) as valor_pendente
-        FROM honorarios WHERE ano = ?
-    """, (ano_atual[0],))
-    resumo = cursor.fetchone()
-    conn.close()
+    # Resumo (tabela honorarios_resumo)
+    resumo = get_resumo_ano(ano_atual[0])
     
     total = resumo['total'] or 0
     pagos = resumo['pagos'] or 0
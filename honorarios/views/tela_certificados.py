@@ -5,12 +5,16 @@ import flet as ft
 from datetime import datetime, timedelta
 
 from database import (
-    listar_clientes, listar_certificados, adicionar_certificado,
+    listar_clientes, buscar_clientes, listar_certificados, adicionar_certificado,
     buscar_certificado, atualizar_certificado, excluir_certificado,
-    get_certificados_vencendo, registrar_log, get_connection
+    get_certificados_vencendo, registrar_log, get_connection, invalidar_cache,
+    ultima_alteracao, adicionar_observador_alteracoes, fechar_conexao_thread
 )
 from utils.theme import CORES
+from utils.dinheiro import Dinheiro, formatar_moeda
 from utils.toast import toast_success, toast_error, toast_warning
+from utils.lista_virtual import ListaVirtual
+from utils.busca import BuscaAdiada
 
 
 # Tipos de certificados
@@ -45,8 +49,9 @@ def criar_tela_certificados(page: ft.Page, theme, usuario_logado=None):
     DANGER = CORES["danger"]
     PURPLE = "#8B5CF6"
     
-    lista_certificados = ft.Column([], spacing=8, scroll=ft.ScrollMode.AUTO, expand=True)
     filtro_status = ["TODOS"]
+    filtro_busca = [""]
+    visto = [0]  # último seq do registro de alterações já refletido na lista
     
     from datetime import datetime
     ano_atual = datetime.now().year
@@ -56,12 +61,9 @@ def criar_tela_certificados(page: ft.Page, theme, usuario_logado=None):
     
     MESES = ["Todos", "Jan", "Fev", "Mar", "Abr", "Mai", "Jun", "Jul", "Ago", "Set", "Out", "Nov", "Dez"]
     
-    def formatar_moeda(valor):
-        return f"R$ {valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-    
-    def carregar_certificados():
-        lista_certificados.controls.clear()
-        
+    def consultar_certificados(texto):
+        """Certificados dos filtros atuais com a busca `texto`: (seq, certificados)"""
+        seq = ultima_alteracao()
         status_filtro = filtro_status[0] if filtro_status[0] != "TODOS" else None
         certs = listar_certificados(status=status_filtro)
         
@@ -80,106 +82,136 @@ def criar_tela_certificados(page: ft.Page, theme, usuario_logado=None):
                     certs_filtrados.append(c)
             certs = certs_filtrados
         
-        if not certs:
-            lista_certificados.controls.append(
-                ft.Container(
-                    content=ft.Column([
-                        ft.Icon(ft.Icons.VERIFIED_USER_OUTLINED, size=48, color=TEXT_SECONDARY),
-                        ft.Text("Nenhum certificado cadastrado", color=TEXT_SECONDARY),
-                    ], horizontal_alignment=ft.CrossAxisAlignment.CENTER, spacing=10),
-                    alignment=ft.alignment.center,
-                    padding=40,
-                )
-            )
+        # Busca: clientes pelo índice de busca, avulsos pelo nome/documento
+        texto = texto.strip()
+        if texto:
+            ids = {c['id'] for c in buscar_clientes(texto, limite=None, ativo=None)}
+            termos = texto.lower().split()
+            certs = [
+                c for c in certs
+                if c['cliente_id'] in ids or (not c['cliente_id'] and all(
+                    t in f"{c['nome_avulso'] or ''} {c['cpf_cnpj'] or ''}".lower() for t in termos
+                ))
+            ]
+        return seq, certs
+    
+    def exibir_certificados(seq, certs):
+        visto[0] = seq
+        vazio.visible = not certs
+        lista_certificados.definir_itens(certs)
+        page.update()
+    
+    def carregar_certificados():
+        exibir_certificados(*consultar_certificados(filtro_busca[0]))
+    
+    def buscar(texto, cancelada):
+        """Roda na thread da busca"""
+        resultado = consultar_certificados(texto)
+        return None if cancelada() else resultado
+    
+    def mostrar_busca(texto, resultado):
+        filtro_busca[0] = texto
+        exibir_certificados(*resultado)
+    
+    busca_adiada = BuscaAdiada(buscar, mostrar_busca, atraso=0.2, ao_encerrar=fechar_conexao_thread)
+    
+    def criar_linha_certificado(cert):
+        # Determinar status visual
+        data_venc = datetime.strptime(cert['data_vencimento'], "%Y-%m-%d")
+        dias_restantes = (data_venc - datetime.now()).days
+        
+        if cert['status'] == 'VENCIDO' or dias_restantes < 0:
+            status_cor = DANGER
+            status_icon = ft.Icons.ERROR_OUTLINE
+        elif dias_restantes <= 30:
+            status_cor = WARNING
+            status_icon = ft.Icons.WARNING_AMBER_OUTLINED
         else:
-            for cert in certs:
-                # Determinar status visual
-                data_venc = datetime.strptime(cert['data_vencimento'], "%Y-%m-%d")
-                dias_restantes = (data_venc - datetime.now()).days
-                
-                if cert['status'] == 'VENCIDO' or dias_restantes < 0:
-                    status_cor = DANGER
-                    status_icon = ft.Icons.ERROR_OUTLINE
-                elif dias_restantes <= 30:
-                    status_cor = WARNING
-                    status_icon = ft.Icons.WARNING_AMBER_OUTLINED
-                else:
-                    status_cor = SUCCESS
-                    status_icon = ft.Icons.VERIFIED_USER
-                
-                # Nome do titular
-                nome = cert.get('cliente_nome') or cert.get('nome_avulso') or 'Avulso'
-                
-                # Status de pagamento
-                pag_status = cert.get('pagamento_status', 'PENDENTE')
-                if pag_status == 'PAGO':
-                    pag_cor = SUCCESS
-                    pag_icon = ft.Icons.PAID
-                elif pag_status == 'PENDENTE':
-                    pag_cor = TEXT_SECONDARY
-                    pag_icon = ft.Icons.HOURGLASS_EMPTY
-                else:
-                    pag_cor = DANGER
-                    pag_icon = ft.Icons.MONEY_OFF
-                
-                def toggle_pagamento(e, cid=cert['id'], status=pag_status):
-                    novo_status = 'PAGO' if status != 'PAGO' else 'PENDENTE'
-                    atualizar_certificado(cid, pagamento_status=novo_status)
-                    # Log
-                    username = usuario_logado[0].get('username', 'desconhecido') if usuario_logado and usuario_logado[0] else 'desconhecido'
-                    registrar_log(username, f"Certificado {novo_status.lower()}", tabela="certificados", registro_id=cid)
-                    carregar_certificados()
-                
-                row = ft.Container(
-                    content=ft.Row([
-                        ft.Container(
-                            content=ft.Icon(status_icon, size=20, color=status_cor),
-                            bgcolor=ft.Colors.with_opacity(0.15, status_cor),
-                            border_radius=8, padding=8,
-                        ),
-                        ft.Column([
-                            ft.Text(nome[:30], size=12, weight=ft.FontWeight.W_500, color=TEXT_PRIMARY),
-                            ft.Text(f"{cert['tipo']} • {cert['cpf_cnpj'] or '-'}", size=9, color=TEXT_SECONDARY),
-                        ], spacing=2, expand=True),
-                        # Badge de pagamento
-                        ft.Container(
-                            content=ft.Row([
-                                ft.Icon(pag_icon, size=12, color="#FFFFFF"),
-                                ft.Text(pag_status, size=8, color="#FFFFFF"),
-                            ], spacing=4),
-                            bgcolor=pag_cor,
-                            border_radius=4, padding=ft.padding.symmetric(horizontal=6, vertical=3),
-                            on_click=toggle_pagamento,
-                            ink=True,
-                            tooltip="Clique para alternar pago/pendente",
-                        ),
-                        ft.Column([
-                            ft.Text(f"Vence: {data_venc.strftime('%d/%m/%Y')}", size=10, color=TEXT_PRIMARY),
-                            ft.Text(f"{dias_restantes} dias" if dias_restantes > 0 else "VENCIDO", 
-                                   size=9, color=status_cor, weight=ft.FontWeight.BOLD),
-                        ], spacing=2, width=100),
-                        ft.Text(formatar_moeda(cert['valor']), size=11, weight=ft.FontWeight.BOLD, color=ACCENT, width=90),
-                        ft.Row([
-                            ft.IconButton(
-                                ft.Icons.EDIT_OUTLINED, icon_color=ACCENT, icon_size=16,
-                                tooltip="Editar",
-                                on_click=lambda e, c=cert: abrir_modal_editar(c),
-                            ),
-                            ft.IconButton(
-                                ft.Icons.DELETE_OUTLINE, icon_color=DANGER, icon_size=16,
-                                tooltip="Excluir",
-                                on_click=lambda e, c=cert: confirmar_exclusao(c),
-                            ),
-                        ], spacing=0, width=70),
-                    ], spacing=12),
-                    padding=12,
-                    bgcolor=SURFACE if pag_status != 'PENDENTE' else ft.Colors.with_opacity(0.5, SURFACE),
-                    border_radius=10,
-                    border=ft.border.all(1, pag_cor if pag_status == 'PAGO' else (status_cor if dias_restantes <= 30 else theme.get_border())),
-                )
-                lista_certificados.controls.append(row)
+            status_cor = SUCCESS
+            status_icon = ft.Icons.VERIFIED_USER
         
-        page.update()
+        # Nome do titular
+        nome = cert.get('cliente_nome') or cert.get('nome_avulso') or 'Avulso'
+        
+        # Status de pagamento
+        pag_status = cert.get('pagamento_status', 'PENDENTE')
+        if pag_status == 'PAGO':
+            pag_cor = SUCCESS
+            pag_icon = ft.Icons.PAID
+        elif pag_status == 'PENDENTE':
+            pag_cor = TEXT_SECONDARY
+            pag_icon = ft.Icons.HOURGLASS_EMPTY
+        else:
+            pag_cor = DANGER
+            pag_icon = ft.Icons.MONEY_OFF
+        
+        def toggle_pagamento(e, cid=cert['id'], status=pag_status):
+            novo_status = 'PAGO' if status != 'PAGO' else 'PENDENTE'
+            atualizar_certificado(cid, pagamento_status=novo_status)
+            # Log
+            username = usuario_logado[0].get('username', 'desconhecido') if usuario_logado and usuario_logado[0] else 'desconhecido'
+            registrar_log(username, f"Certificado {novo_status.lower()}", tabela="certificados", registro_id=cid)
+            carregar_certificados()
+        
+        return ft.Container(
+            content=ft.Row([
+                ft.Container(
+                    content=ft.Icon(status_icon, size=20, color=status_cor),
+                    bgcolor=ft.Colors.with_opacity(0.15, status_cor),
+                    border_radius=8, padding=8,
+                ),
+                ft.Column([
+                    ft.Text(nome[:30], size=12, weight=ft.FontWeight.W_500, color=TEXT_PRIMARY),
+                    ft.Text(f"{cert['tipo']} • {cert['cpf_cnpj'] or '-'}", size=9, color=TEXT_SECONDARY),
+                ], spacing=2, expand=True),
+                # Badge de pagamento
+                ft.Container(
+                    content=ft.Row([
+                        ft.Icon(pag_icon, size=12, color="#FFFFFF"),
+                        ft.Text(pag_status, size=8, color="#FFFFFF"),
+                    ], spacing=4),
+                    bgcolor=pag_cor,
+                    border_radius=4, padding=ft.padding.symmetric(horizontal=6, vertical=3),
+                    on_click=toggle_pagamento,
+                    ink=True,
+                    tooltip="Clique para alternar pago/pendente",
+                ),
+                ft.Column([
+                    ft.Text(f"Vence: {data_venc.strftime('%d/%m/%Y')}", size=10, color=TEXT_PRIMARY),
+                    ft.Text(f"{dias_restantes} dias" if dias_restantes > 0 else "VENCIDO", 
+                           size=9, color=status_cor, weight=ft.FontWeight.BOLD),
+                ], spacing=2, width=100),
+                ft.Text(formatar_moeda(cert['valor']), size=11, weight=ft.FontWeight.BOLD, color=ACCENT, width=90),
+                ft.Row([
+                    ft.IconButton(
+                        ft.Icons.EDIT_OUTLINED, icon_color=ACCENT, icon_size=16,
+                        tooltip="Editar",
+                        on_click=lambda e, c=cert: abrir_modal_editar(c),
+                    ),
+                    ft.IconButton(
+                        ft.Icons.DELETE_OUTLINE, icon_color=DANGER, icon_size=16,
+                        tooltip="Excluir",
+                        on_click=lambda e, c=cert: confirmar_exclusao(c),
+                    ),
+                ], spacing=0, width=70),
+            ], spacing=12),
+            padding=12,
+            bgcolor=SURFACE if pag_status != 'PENDENTE' else ft.Colors.with_opacity(0.5, SURFACE),
+            border_radius=10,
+            border=ft.border.all(1, pag_cor if pag_status == 'PAGO' else (status_cor if dias_restantes <= 30 else theme.get_border())),
+        )
+    
+    # Só as linhas visíveis existem como controles (ListView virtualizada)
+    lista_certificados = ListaVirtual(criar_linha_certificado, altura_item=74, espacamento=8)
+    vazio = ft.Container(
+        content=ft.Column([
+            ft.Icon(ft.Icons.VERIFIED_USER_OUTLINED, size=48, color=TEXT_SECONDARY),
+            ft.Text("Nenhum certificado cadastrado", color=TEXT_SECONDARY),
+        ], horizontal_alignment=ft.CrossAxisAlignment.CENTER, spacing=10),
+        alignment=ft.alignment.center,
+        padding=40,
+        visible=False,
+    )
     
     def abrir_modal_novo():
         clientes = sorted(listar_clientes(), key=lambda c: int(c['codigo_interno']) if c['codigo_interno'] and c['codigo_interno'].isdigit() else float('inf'))
@@ -313,9 +345,10 @@ def criar_tela_certificados(page: ft.Page, theme, usuario_logado=None):
                 cursor.execute("""
                     UPDATE honorarios SET valor = valor + ?, observacao = COALESCE(observacao, '') || ?
                     WHERE cliente_id = ? AND mes = ? AND ano = ?
-                """, (valor_float, descricao_cert, int(cliente_dd.value), hoje.month, hoje.year))
+                """, (Dinheiro(valor_float), descricao_cert, int(cliente_dd.value), hoje.month, hoje.year))
                 conn.commit()
                 conn.close()
+                invalidar_cache("honorarios")
                 toast_success(page, f"Certificado cadastrado e {formatar_moeda(valor_float)} adicionado ao honorário!")
             else:
                 toast_success(page, "Certificado cadastrado!")
@@ -452,8 +485,15 @@ def criar_tela_certificados(page: ft.Page, theme, usuario_logado=None):
         filtro_status[0] = e.control.value
         carregar_certificados()
     
+    def on_alteracoes(alteracoes):
+        """Monitor de alterações: recarrega se outra ação/estação mexeu nos certificados"""
+        if alteracoes is None or any(a['seq'] > visto[0] and a['tabela'] in ("certificados", "clientes")
+                                     for a in alteracoes):
+            carregar_certificados()
+    
     # Carregar dados iniciais
     carregar_certificados()
+    adicionar_observador_alteracoes(on_alteracoes, chave="tela")
     
     # Alertas de vencimento
     vencendo = get_certificados_vencendo(dias=30)
@@ -470,6 +510,9 @@ def criar_tela_certificados(page: ft.Page, theme, usuario_logado=None):
             border_radius=8,
         )
     
+    def on_busca_change(e):
+        busca_adiada.digitar(e.control.value or "")
+    
     def on_mes_change(e):
         filtro_mes[0] = int(e.control.value)
         carregar_certificados()
@@ -484,6 +527,11 @@ def criar_tela_certificados(page: ft.Page, theme, usuario_logado=None):
                 ft.Icon(ft.Icons.VERIFIED_USER, size=26, color=ACCENT),
                 ft.Text("Certificados Digitais", size=20, weight=ft.FontWeight.BOLD, color=TEXT_PRIMARY),
                 ft.Container(expand=True),
+                ft.TextField(
+                    label="Buscar", width=180, prefix_icon=ft.Icons.SEARCH,
+                    bgcolor=INPUT_BG, border_color=INPUT_BORDER, color=TEXT_PRIMARY,
+                    on_change=on_busca_change,
+                ),
                 ft.Dropdown(
                     value="0", width=110, bgcolor=INPUT_BG, border_color=INPUT_BORDER,
                     color=TEXT_PRIMARY, label_style=ft.TextStyle(color=TEXT_SECONDARY),
@@ -517,7 +565,8 @@ def criar_tela_certificados(page: ft.Page, theme, usuario_logado=None):
             ], spacing=10),
             alerta if alerta else ft.Container(),
             ft.Container(height=10),
-            lista_certificados,
+            vazio,
+            lista_certificados.controle,
         ]),
         expand=True,
         padding=20,
@@ -6,9 +6,13 @@ import flet as ft
 from datetime import datetime
 import os
 
-from database import listar_clientes, adicionar_cliente, atualizar_cliente, get_config, set_config, get_connection, set_valor_honorario_ano, listar_valores_honorarios_cliente, criar_honorarios_ano_cliente
+from database import listar_clientes, buscar_clientes, buscar_cliente, ultima_alteracao, adicionar_observador_alteracoes, invalidar_cache, adicionar_cliente, atualizar_cliente, get_config, set_configs, transacao, set_valor_honorario_ano, listar_valores_honorarios_cliente, criar_honorarios_ano_cliente, registrar_log
+from geracao_honorarios import gerar_honorarios_lote
 from utils.theme import CORES
+from utils.dinheiro import Dinheiro
 from utils.toast import toast_success, toast_error, toast_warning
+from utils.lista_virtual import ListaVirtual
+from utils.tarefas import executar
 
 
 def criar_tela_configuracoes(page: ft.Page, usuario_logado, theme, VERSION="0.1"):
@@ -27,44 +31,80 @@ def criar_tela_configuracoes(page: ft.Page, usuario_logado, theme, VERSION="0.1"
     WARNING = CORES["warning"]
     DANGER = CORES["danger"]
     
-    clientes_list = ft.Column([], spacing=4, scroll=ft.ScrollMode.AUTO)
+    filtro_clientes = [""]
+    posicoes = {}   # cliente_id -> (posição em clientes_list, código exibido)
+    visto = [0]     # último seq do registro de alterações já refletido na lista
     
-    def atualizar_clientes(filtro=""):
-        clientes_list.controls.clear()
-        clientes = sorted(listar_clientes(), key=lambda c: int(c['codigo_interno']) if c['codigo_interno'] and c['codigo_interno'].isdigit() else float('inf'))
+    def criar_linha_cliente(cliente):
+        linha = ft.Container(
+            content=ft.Row([
+                ft.Text("", size=10, width=50, color=TEXT_SECONDARY),
+                ft.Text("", size=11, color=TEXT_PRIMARY, expand=True),
+                ft.Text("", size=9, color=TEXT_SECONDARY, width=120),
+                ft.Text("", size=10, weight=ft.FontWeight.BOLD, width=90),
+                ft.IconButton(
+                    ft.Icons.EDIT,
+                    icon_color=ACCENT,
+                    icon_size=16,
+                    on_click=lambda e: abrir_modal(linha.data),
+                ),
+            ]),
+            padding=ft.padding.symmetric(horizontal=10, vertical=6),
+            bgcolor=SURFACE,
+            border_radius=8,
+            border=ft.border.all(1, theme.get_border()),
+        )
+        preencher_linha_cliente(linha, cliente)
+        return linha
+    
+    def preencher_linha_cliente(linha, cliente):
+        # Tentar acessar valor_honorario de forma segura
+        try:
+            valor_hon = cliente['valor_honorario']
+        except (KeyError, IndexError):
+            valor_hon = None
+        codigo, nome, documento, valor, _ = linha.content.controls
+        codigo.value = cliente['codigo_interno'] or str(cliente['id'])
+        nome.value = cliente['nome'][:25]
+        documento.value = cliente['cnpj'] or cliente['cpf'] or "-"
+        valor.value = f"R$ {valor_hon:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".") if valor_hon else "-"
+        valor.color = SUCCESS if valor_hon else TEXT_SECONDARY
+        linha.data = cliente
+    
+    # Só as linhas visíveis existem como controles; ao rolar elas são reaproveitadas
+    clientes_list = ListaVirtual(criar_linha_cliente, preencher_linha_cliente, altura_item=52, altura_visivel=340)
+    
+    def atualizar_clientes(filtro=None):
+        if filtro is not None:
+            filtro_clientes[0] = filtro
+        posicoes.clear()
+        visto[0] = ultima_alteracao()
+        clientes = sorted(buscar_clientes(filtro_clientes[0], limite=None), key=lambda c: int(c['codigo_interno']) if c['codigo_interno'] and c['codigo_interno'].isdigit() else float('inf'))
         
-        for cliente in clientes:
-            if filtro and filtro.lower() not in cliente['nome'].lower():
-                continue
-            
-            codigo = cliente['codigo_interno'] or str(cliente['id'])
-            # Tentar acessar valor_honorario de forma segura
-            try:
-                valor_hon = cliente['valor_honorario']
-            except (KeyError, IndexError):
-                valor_hon = None
-            valor_str = f"R$ {valor_hon:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".") if valor_hon else "-"
-            
-            clientes_list.controls.append(
-                ft.Container(
-                    content=ft.Row([
-                        ft.Text(codigo, size=10, width=50, color=TEXT_SECONDARY),
-                        ft.Text(cliente['nome'][:25], size=11, color=TEXT_PRIMARY, expand=True),
-                        ft.Text(cliente['cnpj'] or cliente['cpf'] or "-", size=9, color=TEXT_SECONDARY, width=120),
-                        ft.Text(valor_str, size=10, weight=ft.FontWeight.BOLD, color=SUCCESS if valor_hon else TEXT_SECONDARY, width=90),
-                        ft.IconButton(
-                            ft.Icons.EDIT,
-                            icon_color=ACCENT,
-                            icon_size=16,
-                            on_click=lambda e, c=cliente: abrir_modal(c),
-                        ),
-                    ]),
-                    padding=ft.padding.symmetric(horizontal=10, vertical=6),
-                    bgcolor=SURFACE,
-                    border_radius=8,
-                    border=ft.border.all(1, theme.get_border()),
-                )
-            )
+        for i, cliente in enumerate(clientes):
+            posicoes[cliente['id']] = (i, cliente['codigo_interno'])
+        clientes_list.definir_itens(clientes)
+        page.update()
+    
+    def on_alteracoes(alteracoes):
+        """Monitor de alterações: troca só as linhas dos clientes editados"""
+        if alteracoes is None:
+            atualizar_clientes()
+            return
+        novas = [a for a in alteracoes if a['seq'] > visto[0] and a['tabela'] == "clientes"]
+        if not novas:
+            return
+        visto[0] = novas[-1]['seq']
+        
+        for a in novas:
+            pos, codigo = posicoes.get(a['registro_id'], (None, None))
+            cliente = buscar_cliente(a['registro_id']) if a['operacao'] != "D" else None
+            # Novo, excluído ou alterado de um jeito que muda ordem/filtro: recarrega a lista
+            if (pos is None or cliente is None or not cliente['ativo']
+                    or cliente['codigo_interno'] != codigo or filtro_clientes[0].strip()):
+                atualizar_clientes()
+                return
+            clientes_list.atualizar_item(pos, cliente)
         page.update()
     
     def abrir_modal(cliente=None):
@@ -174,10 +214,19 @@ def criar_tela_configuracoes(page: ft.Page, usuario_logado, theme, VERSION="0.1"
             
             try:
                 valor = float(valor_str.replace(",", "."))
-                criar_honorarios_ano_cliente(cliente['id'], ano_selecionado, valor)
-                toast_success(page, f"Honorários de {ano_selecionado} gerados!")
-            except Exception as ex:
-                toast_error(page, f"Erro: {ex}")
+            except ValueError:
+                toast_error(page, "Valor inválido!")
+                return
+            
+            def terminar(tarefa):
+                if tarefa.status == "CONCLUIDA":
+                    toast_success(page, f"Honorários de {ano_selecionado} gerados!")
+                elif tarefa.status == "ERRO":
+                    toast_error(page, f"Erro: {tarefa.erro}")
+            
+            executar(f"Gerar honorários {ano_selecionado}",
+                     lambda tarefa: criar_honorarios_ano_cliente(cliente['id'], ano_selecionado, valor),
+                     usuario=nome_usuario(), ao_terminar=terminar)
         
         def salvar_valores_anos(e):
             """Salva todos os valores por ano"""
@@ -268,8 +317,18 @@ def criar_tela_configuracoes(page: ft.Page, usuario_logado, theme, VERSION="0.1"
     # ═══ EXPORTAR CLIENTES ═══
     wb_exportar = [None]  # Para armazenar o workbook temporariamente
     
+    def nome_usuario():
+        return usuario_logado[0].get('username', 'desconhecido') if usuario_logado and usuario_logado[0] else 'desconhecido'
+    
     def preparar_exportacao(e):
         try:
+            import openpyxl  # noqa: F401 - só confere se está instalado
+        except ImportError:
+            toast_error(page, "Instale: pip install openpyxl")
+            return
+        
+        def montar(tarefa):
+            """Roda em segundo plano: monta a planilha cliente a cliente"""
             from openpyxl import Workbook
             from openpyxl.styles import Font, Alignment, PatternFill
             
@@ -297,7 +356,9 @@ def criar_tela_configuracoes(page: ft.Page, usuario_logado, theme, VERSION="0.1"
             
             # Dados
             clientes = sorted(listar_clientes(), key=lambda c: int(c['codigo_interno']) if c['codigo_interno'] and c['codigo_interno'].isdigit() else float('inf'))
+            tarefa.progresso(0, len(clientes))
             for row, cliente in enumerate(clientes, 2):
+                tarefa.verificar()
                 ws.cell(row=row, column=1, value=cliente['id'])
                 ws.cell(row=row, column=2, value=cliente['codigo_interno'] or "")
                 ws.cell(row=row, column=3, value=cliente['nome'])
@@ -318,6 +379,7 @@ def criar_tela_configuracoes(page: ft.Page, usuario_logado, theme, VERSION="0.1"
                 for col_idx, ano in enumerate(anos, 10):
                     valor_ano = valores_dict.get(ano, "")
                     ws.cell(row=row, column=col_idx, value=valor_ano if valor_ano else "")
+                tarefa.progresso(row - 1)
             
             # Ajustar largura
             ws.column_dimensions['A'].width = 8
@@ -334,26 +396,34 @@ def criar_tela_configuracoes(page: ft.Page, usuario_logado, theme, VERSION="0.1"
             for i in range(len(anos)):
                 ws.column_dimensions[get_column_letter(10 + i)].width = 12
             
-            wb_exportar[0] = wb
-            # Abrir seletor de pasta
-            export_picker.save_file(
-                file_name=f"clientes_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-                allowed_extensions=["xlsx"]
-            )
-        except ImportError:
-            toast_error(page, "Instale: pip install openpyxl")
-        except Exception as ex:
-            toast_error(page, f"Erro: {str(ex)}")
+            return wb
+        
+        def terminar(tarefa):
+            if tarefa.status == "ERRO":
+                toast_error(page, f"Erro: {tarefa.erro}")
+            elif tarefa.status == "CONCLUIDA":
+                wb_exportar[0] = tarefa.resultado
+                # Abrir seletor de pasta
+                export_picker.save_file(
+                    file_name=f"clientes_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
+                    allowed_extensions=["xlsx"]
+                )
+        
+        executar("Exportar clientes", montar, usuario=nome_usuario(), ao_terminar=terminar)
     
     def salvar_exportacao(e: ft.FilePickerResultEvent):
         if not e.path or not wb_exportar[0]:
             return
-        try:
-            wb_exportar[0].save(e.path)
-            toast_success(page, f"Exportado: {os.path.basename(e.path)}")
-            wb_exportar[0] = None
-        except Exception as ex:
-            toast_error(page, f"Erro ao salvar: {str(ex)}")
+        wb, wb_exportar[0] = wb_exportar[0], None
+        caminho = e.path
+        
+        def terminar(tarefa):
+            if tarefa.status == "CONCLUIDA":
+                toast_success(page, f"Exportado: {os.path.basename(caminho)}")
+            elif tarefa.status == "ERRO":
+                toast_error(page, f"Erro ao salvar: {tarefa.erro}")
+        
+        executar("Salvar exportação", lambda tarefa: wb.save(caminho), usuario=nome_usuario(), ao_terminar=terminar)
     
     export_picker = ft.FilePicker(on_result=salvar_exportacao)
     page.overlay.append(export_picker)
@@ -362,16 +432,21 @@ def criar_tela_configuracoes(page: ft.Page, usuario_logado, theme, VERSION="0.1"
     def importar_clientes(e: ft.FilePickerResultEvent):
         if not e.files:
             return
-        
         try:
+            import openpyxl  # noqa: F401 - só confere se está instalado
+        except ImportError:
+            toast_error(page, "Instale: pip install openpyxl")
+            return
+        filepath = e.files[0].path
+        
+        def importar(tarefa):
+            """Roda em segundo plano, numa transação: cancelar desfaz a importação inteira"""
             from openpyxl import load_workbook
             
-            filepath = e.files[0].path
+            tarefa.progresso(mensagem="lendo planilha")
             wb = load_workbook(filepath)
             ws = wb.active
-            
-            conn = get_connection()
-            cursor = conn.cursor()
+            tarefa.progresso(0, max(0, ws.max_row - 1), "")
             
             atualizados = 0
             adicionados = 0
@@ -388,65 +463,67 @@ def criar_tela_configuracoes(page: ft.Page, usuario_logado, theme, VERSION="0.1"
                     except:
                         pass
             
-            for row in range(2, ws.max_row + 1):
-                cliente_id = ws.cell(row=row, column=1).value
-                codigo = ws.cell(row=row, column=2).value or None
-                nome = ws.cell(row=row, column=3).value
-                
-                if not nome:  # Pular linhas sem nome
-                    continue
-                
-                cnpj = ws.cell(row=row, column=4).value or None
-                cpf = ws.cell(row=row, column=5).value or None
-                endereco = ws.cell(row=row, column=6).value or None
-                telefone = ws.cell(row=row, column=7).value or None
-                email = ws.cell(row=row, column=8).value or None
-                valor_hon = ws.cell(row=row, column=9).value
-                
-                if valor_hon and isinstance(valor_hon, str):
-                    try:
-                        valor_hon = float(valor_hon.replace(",", ".").replace("R$", "").strip())
-                    except:
-                        valor_hon = None
-                
-                if cliente_id:
-                    # Atualizar cliente existente
-                    cursor.execute("""
-                        UPDATE clientes 
-                        SET codigo_interno=?, nome=?, cnpj=?, cpf=?, endereco=?, telefone=?, email=?, valor_honorario=?
-                        WHERE id=?
-                    """, (codigo, nome, cnpj, cpf, endereco, telefone, email, valor_hon, cliente_id))
-                    atualizados += 1
-                    atual_cliente_id = cliente_id
-                else:
-                    # Adicionar novo cliente
-                    cursor.execute("""
-                        INSERT INTO clientes (codigo_interno, nome, cnpj, cpf, endereco, telefone, email, valor_honorario)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (codigo, nome, cnpj, cpf, endereco, telefone, email, valor_hon))
-                    adicionados += 1
-                    atual_cliente_id = cursor.lastrowid
-                
-                # Importar valores por ano
-                for ano, col in anos_colunas.items():
-                    valor_ano = ws.cell(row=row, column=col).value
-                    if valor_ano:
-                        if isinstance(valor_ano, str):
-                            try:
-                                valor_ano = float(valor_ano.replace(",", ".").replace("R$", "").strip())
-                            except:
-                                continue
-                        if valor_ano and valor_ano > 0:
-                            cursor.execute("""
-                                INSERT OR REPLACE INTO valores_honorarios (cliente_id, ano, valor)
-                                VALUES (?, ?, ?)
-                            """, (atual_cliente_id, ano, valor_ano))
-                            valores_salvos += 1
+            with transacao(imediata=True) as conn:
+                cursor = conn.cursor()
+                for row in range(2, ws.max_row + 1):
+                    tarefa.verificar()
+                    tarefa.progresso(row - 1)
+                    cliente_id = ws.cell(row=row, column=1).value
+                    codigo = ws.cell(row=row, column=2).value or None
+                    nome = ws.cell(row=row, column=3).value
+                    
+                    if not nome:  # Pular linhas sem nome
+                        continue
+                    
+                    cnpj = ws.cell(row=row, column=4).value or None
+                    cpf = ws.cell(row=row, column=5).value or None
+                    endereco = ws.cell(row=row, column=6).value or None
+                    telefone = ws.cell(row=row, column=7).value or None
+                    email = ws.cell(row=row, column=8).value or None
+                    valor_hon = ws.cell(row=row, column=9).value
+                    
+                    if valor_hon and isinstance(valor_hon, str):
+                        try:
+                            valor_hon = float(valor_hon.replace(",", ".").replace("R$", "").strip())
+                        except:
+                            valor_hon = None
+                    
+                    if cliente_id:
+                        # Atualizar cliente existente
+                        cursor.execute("""
+                            UPDATE clientes 
+                            SET codigo_interno=?, nome=?, cnpj=?, cpf=?, endereco=?, telefone=?, email=?, valor_honorario=?
+                            WHERE id=?
+                        """, (codigo, nome, cnpj, cpf, endereco, telefone, email, Dinheiro.de_reais(valor_hon), cliente_id))
+                        atualizados += 1
+                        atual_cliente_id = cliente_id
+                    else:
+                        # Adicionar novo cliente
+                        cursor.execute("""
+                            INSERT INTO clientes (codigo_interno, nome, cnpj, cpf, endereco, telefone, email, valor_honorario)
+                            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                        """, (codigo, nome, cnpj, cpf, endereco, telefone, email, Dinheiro.de_reais(valor_hon)))
+                        adicionados += 1
+                        atual_cliente_id = cursor.lastrowid
+                    
+                    # Importar valores por ano
+                    for ano, col in anos_colunas.items():
+                        valor_ano = ws.cell(row=row, column=col).value
+                        if valor_ano:
+                            if isinstance(valor_ano, str):
+                                try:
+                                    valor_ano = float(valor_ano.replace(",", ".").replace("R$", "").strip())
+                                except:
+                                    continue
+                            if valor_ano and valor_ano > 0:
+                                cursor.execute("""
+                                    INSERT OR REPLACE INTO valores_honorarios (cliente_id, ano, valor)
+                                    VALUES (?, ?, ?)
+                                """, (atual_cliente_id, ano, Dinheiro(valor_ano)))
+                                valores_salvos += 1
             
-            conn.commit()
-            conn.close()
+            invalidar_cache("clientes", "valores_honorarios")
             
-            atualizar_clientes()
             msg = []
             if adicionados > 0:
                 msg.append(f"{adicionados} adicionado(s)")
@@ -454,11 +531,18 @@ def criar_tela_configuracoes(page: ft.Page, usuario_logado, theme, VERSION="0.1"
                 msg.append(f"{atualizados} atualizado(s)")
             if valores_salvos > 0:
                 msg.append(f"{valores_salvos} valores/ano")
-            toast_success(page, " | ".join(msg) if msg else "Nenhuma alteração")
-        except ImportError:
-            toast_error(page, "Instale: pip install openpyxl")
-        except Exception as ex:
-            toast_error(page, f"Erro: {str(ex)}")
+            return " | ".join(msg) if msg else "Nenhuma alteração"
+        
+        def terminar(tarefa):
+            if tarefa.status == "CONCLUIDA":
+                atualizar_clientes()
+                toast_success(page, tarefa.resultado)
+            elif tarefa.status == "CANCELADA":
+                toast_warning(page, "Importação cancelada, nada foi alterado")
+            else:
+                toast_error(page, f"Erro: {tarefa.erro}")
+        
+        executar("Importar clientes", importar, usuario=nome_usuario(), ao_terminar=terminar)
     
     file_picker = ft.FilePicker(on_result=importar_clientes)
     page.overlay.append(file_picker)
@@ -502,17 +586,65 @@ Atenciosamente,
                               bgcolor=INPUT_BG, border_color=INPUT_BORDER, color=TEXT_PRIMARY)
     
     def salvar_empresa(e):
-        set_config('empresa_nome', empresa_nome.value)
-        set_config('empresa_cnpj', empresa_cnpj.value)
-        set_config('empresa_endereco', empresa_endereco.value)
-        set_config('empresa_cidade', empresa_cidade.value)
-        set_config('empresa_telefone', empresa_telefone.value)
-        set_config('empresa_email', empresa_email.value)
-        set_config('email_senha_app', email_senha_app.value)
-        set_config('email_template', email_template.value)
-        set_config('empresa_pix', empresa_pix.value)
+        set_configs({
+            'empresa_nome': empresa_nome.value,
+            'empresa_cnpj': empresa_cnpj.value,
+            'empresa_endereco': empresa_endereco.value,
+            'empresa_cidade': empresa_cidade.value,
+            'empresa_telefone': empresa_telefone.value,
+            'empresa_email': empresa_email.value,
+            'email_senha_app': email_senha_app.value,
+            'email_template': email_template.value,
+            'empresa_pix': empresa_pix.value,
+        })
         toast_success(page, "Dados salvos!")
     
+    # ═══ GERAÇÃO DE HONORÁRIOS EM LOTE ═══
+    def gerar_pendentes_lote(e):
+        """Simula a geração e pede confirmação antes de criar"""
+        previsao = gerar_honorarios_lote(dry_run=True)
+        if previsao['criados'] == 0:
+            toast_success(page, f"Nada a gerar ({previsao['pulados']} já existem)")
+            return
+        
+        def confirmar(e):
+            dlg.open = False
+            page.update()
+            username = nome_usuario()
+            
+            def gerar(tarefa):
+                tarefa.progresso(mensagem=f"{previsao['criados']} honorário(s)")
+                resultado = gerar_honorarios_lote()
+                registrar_log(username, "Honorários gerados em lote", tabela="honorarios",
+                             detalhes=f"Criados: {resultado['criados']} | Já existiam: {resultado['pulados']}")
+                return resultado
+            
+            def terminar(tarefa):
+                if tarefa.status == "CONCLUIDA":
+                    toast_success(page, f"{tarefa.resultado['criados']} honorário(s) criado(s)!")
+                elif tarefa.status == "ERRO":
+                    toast_error(page, f"Erro: {tarefa.erro}")
+            
+            executar("Gerar honorários pendentes", gerar, usuario=username, ao_terminar=terminar)
+        
+        dlg = ft.AlertDialog(
+            modal=True,
+            title=ft.Text("⚡ Gerar Honorários Pendentes", weight=ft.FontWeight.BOLD, color=TEXT_PRIMARY),
+            bgcolor=BG,
+            content=ft.Text(
+                f"Serão criados {previsao['criados']} honorário(s) pendente(s) a partir dos valores por ano.\n"
+                f"{previsao['pulados']} já existem e serão mantidos.",
+                color=TEXT_SECONDARY,
+            ),
+            actions=[
+                ft.TextButton("Cancelar", on_click=lambda e: setattr(dlg, 'open', False) or page.update()),
+                ft.ElevatedButton("Gerar", bgcolor=SUCCESS, color=TEXT_PRIMARY, on_click=confirmar),
+            ],
+        )
+        page.overlay.append(dlg)
+        dlg.open = True
+        page.update()
+    
     tabs = ft.Tabs(
         selected_index=0,
         animation_duration=150,
@@ -527,6 +659,7 @@ Atenciosamente,
                         ft.Row([
                             ft.TextField(
                                 label="Buscar",
+                                hint_text="Nome, código, CNPJ/CPF ou email",
                                 width=250,
                                 prefix_icon=ft.Icons.SEARCH,
                                 bgcolor=INPUT_BG,
@@ -540,7 +673,7 @@ Atenciosamente,
                             ft.ElevatedButton("➕ Novo", bgcolor=SUCCESS, color=TEXT_PRIMARY, on_click=lambda e: abrir_modal()),
                         ], spacing=8),
                         ft.Container(height=10),
-                        ft.Container(content=clientes_list, height=360, bgcolor=BG, border_radius=10, padding=10),
+                        ft.Container(content=clientes_list.controle, height=360, bgcolor=BG, border_radius=10, padding=10),
                     ]),
                     padding=20,
                 ),
@@ -574,6 +707,11 @@ Atenciosamente,
                         ft.Text(f"Versão: {VERSION}", size=12, color=TEXT_SECONDARY),
                         ft.Container(height=10),
                         ft.Text("💡 Use o botão no menu lateral para alternar o tema.", size=11, color=TEXT_SECONDARY, italic=True),
+                        ft.Container(height=20),
+                        ft.Text("Honorários", size=14, weight=ft.FontWeight.BOLD, color=TEXT_PRIMARY),
+                        ft.Text("Cria os honorários pendentes que faltam (anos anteriores completos e o ano atual até este mês).",
+                               size=11, color=TEXT_SECONDARY),
+                        ft.ElevatedButton("⚡ Gerar Pendentes", bgcolor=ACCENT, color=TEXT_PRIMARY, on_click=gerar_pendentes_lote),
                     ]),
                     padding=20,
                 ),
@@ -583,6 +721,7 @@ Atenciosamente,
     )
     
     atualizar_clientes()
+    adicionar_observador_alteracoes(on_alteracoes, chave="tela")
     
     return ft.Container(
         content=ft.Column([
@@ -6,10 +6,13 @@ import flet as ft
 from datetime import datetime
 import os
 
-from database import listar_clientes, criar_recibo, get_config, buscar_cliente, get_connection, registrar_log
+from database import listar_clientes, buscar_clientes, criar_recibos_lote, get_configs, buscar_cliente, get_connection, registrar_log
 from utils.theme import CORES
+from utils.dinheiro import formatar_moeda
 from utils.toast import toast_success, toast_error, toast_warning
 from utils.email_sender import enviar_recibo_email
+from utils.lista_virtual import ListaVirtual
+from utils.tarefas import executar
 
 
 MESES = ["Jan", "Fev", "Mar", "Abr", "Mai", "Jun", "Jul", "Ago", "Set", "Out", "Nov", "Dez"]
@@ -35,58 +38,60 @@ def criar_tela_gerar_recibo(page: ft.Page, file_picker, theme, usuario_logado=No
     mes_atual = datetime.now().month
     
     clientes = sorted(listar_clientes(), key=lambda c: int(c['codigo_interno']) if c['codigo_interno'] and c['codigo_interno'].isdigit() else c['id'])
+    visiveis = list(clientes)
     valores_cache = {}
     clientes_dados = {}
     
-    lista_clientes = ft.Column([], spacing=4, scroll=ft.ScrollMode.AUTO)
+    periodo = [mes_atual, ano_atual]
     resultado_text = ft.Text("", size=12)
     progresso = ft.ProgressBar(width=250, visible=False, color=ACCENT)
     enviar_email_cb = ft.Checkbox(label="Enviar por email", value=False, active_color=ACCENT, check_color=TEXT_PRIMARY)
     
-    def formatar_moeda(valor):
-        return f"R$ {valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-    
-    def carregar_valores(mes, ano):
+    def ler_valores(mes, ano):
+        """{(cliente_id, mes, ano): valor} do período, num dict novo"""
         conn = get_connection()
         cursor = conn.cursor()
         cursor.execute("SELECT cliente_id, valor FROM honorarios WHERE ano = ? AND mes = ?", (ano, mes))
-        valores_cache.clear()
-        for row in cursor.fetchall():
-            valores_cache[(row['cliente_id'], mes, ano)] = row['valor']
+        valores = {(row['cliente_id'], mes, ano): row['valor'] for row in cursor.fetchall()}
         conn.close()
+        return valores
     
-    def criar_linha(cliente, mes, ano):
-        cid = cliente['id']
-        codigo = cliente['codigo_interno'] or str(cid)
-        valor = valores_cache.get((cid, mes, ano), 0)
-        
+    def carregar_valores(mes, ano):
+        """Só na thread da interface: valores_cache é o período exibido"""
+        valores = ler_valores(mes, ano)
+        valores_cache.clear()
+        valores_cache.update(valores)
+    
+    def dados_do(cid):
         if cid not in clientes_dados:
             clientes_dados[cid] = {'selecionado': False, 'acrescimo': 0, 'decrescimo': 0, 'descricao': ''}
+        return clientes_dados[cid]
+    
+    def criar_linha(cliente):
+        """Linha de um cliente; os valores digitados ficam em clientes_dados, não nos controles"""
+        def on_sel(e):
+            dados_do(linha.data)['selecionado'] = e.control.value
         
-        def on_sel(e, cliente_id=cid):
-            clientes_dados[cliente_id]['selecionado'] = e.control.value
-        
-        def on_acre(e, cliente_id=cid):
+        def on_acre(e):
             try:
-                clientes_dados[cliente_id]['acrescimo'] = float(e.control.value.replace(",", ".")) if e.control.value else 0
+                dados_do(linha.data)['acrescimo'] = float(e.control.value.replace(",", ".")) if e.control.value else 0
             except: pass
         
-        def on_decr(e, cliente_id=cid):
+        def on_decr(e):
             try:
-                clientes_dados[cliente_id]['decrescimo'] = float(e.control.value.replace(",", ".")) if e.control.value else 0
+                dados_do(linha.data)['decrescimo'] = float(e.control.value.replace(",", ".")) if e.control.value else 0
             except: pass
         
-        def on_desc(e, cliente_id=cid):
-            clientes_dados[cliente_id]['descricao'] = e.control.value or ''
+        def on_desc(e):
+            dados_do(linha.data)['descricao'] = e.control.value or ''
         
-        return ft.Container(
+        linha = ft.Container(
             content=ft.Row([
-                ft.Checkbox(value=clientes_dados[cid]['selecionado'], on_change=on_sel, 
-                           active_color=ACCENT, check_color=TEXT_PRIMARY),
-                ft.Text(codigo, size=10, width=45, color=TEXT_SECONDARY),
-                ft.Text(cliente['nome'][:20], size=11, width=160, color=TEXT_PRIMARY),
-                ft.Text(formatar_moeda(valor), size=10, width=85, color=ACCENT),
-        ft.TextField(width=75, hint_text="+R$", text_size=10, content_padding=5, 
+                ft.Checkbox(on_change=on_sel, active_color=ACCENT, check_color=TEXT_PRIMARY),
+                ft.Text("", size=10, width=45, color=TEXT_SECONDARY),
+                ft.Text("", size=11, width=160, color=TEXT_PRIMARY),
+                ft.Text("", size=10, width=85, color=ACCENT),
+                ft.TextField(width=75, hint_text="+R$", text_size=10, content_padding=5, 
                             bgcolor=INPUT_BG, border_color=INPUT_BORDER, color=TEXT_PRIMARY, on_change=on_acre),
                 ft.TextField(width=75, hint_text="-R$", text_size=10, content_padding=5, 
                             bgcolor=INPUT_BG, border_color=INPUT_BORDER, color=TEXT_PRIMARY, on_change=on_decr),
@@ -98,28 +103,51 @@ def criar_tela_gerar_recibo(page: ft.Page, file_picker, theme, usuario_logado=No
             border_radius=8,
             border=ft.border.all(1, theme.get_border()),
         )
+        preencher_linha(linha, cliente)
+        return linha
+    
+    def preencher_linha(linha, cliente):
+        cid = cliente['id']
+        mes, ano = periodo
+        dados = dados_do(cid)
+        sel, codigo, nome, valor, acre, decr, desc = linha.content.controls
+        sel.value = dados['selecionado']
+        codigo.value = cliente['codigo_interno'] or str(cid)
+        nome.value = cliente['nome'][:20]
+        valor.value = formatar_moeda(valores_cache.get((cid, mes, ano), 0))
+        acre.value = str(dados['acrescimo']).replace(".", ",") if dados['acrescimo'] else ""
+        decr.value = str(dados['decrescimo']).replace(".", ",") if dados['decrescimo'] else ""
+        desc.value = dados['descricao']
+        linha.data = cid
+    
+    # Só as linhas visíveis existem como controles; ao rolar elas são reaproveitadas
+    lista_clientes = ListaVirtual(criar_linha, preencher_linha, altura_item=50, altura_visivel=350)
     
     def atualizar_lista():
-        mes = int(mes_dd.value) if mes_dd.value else mes_atual
-        ano = int(ano_dd.value) if ano_dd.value else ano_atual
-        carregar_valores(mes, ano)
-        lista_clientes.controls.clear()
-        for cliente in clientes:
-            lista_clientes.controls.append(criar_linha(cliente, mes, ano))
+        periodo[:] = [int(mes_dd.value) if mes_dd.value else mes_atual,
+                      int(ano_dd.value) if ano_dd.value else ano_atual]
+        carregar_valores(*periodo)
+        lista_clientes.definir_itens(visiveis)
         page.update()
     
-    def selecionar_todos(e):
-        for c in clientes:
-            if c['id'] not in clientes_dados:
-                clientes_dados[c['id']] = {'selecionado': True, 'acrescimo': 0, 'decrescimo': 0, 'descricao': ''}
-            else:
-                clientes_dados[c['id']]['selecionado'] = True
+    def on_busca_change(e):
+        texto = e.control.value or ""
+        if texto.strip():
+            ids = {c['id'] for c in buscar_clientes(texto, limite=None)}
+            visiveis[:] = [c for c in clientes if c['id'] in ids]
+        else:
+            visiveis[:] = clientes
         atualizar_lista()
     
+    def selecionar_todos(e):
+        for c in visiveis:
+            dados_do(c['id'])['selecionado'] = True
+        lista_clientes.redesenhar()
+    
     def desmarcar_todos(e):
         for cid in clientes_dados:
             clientes_dados[cid]['selecionado'] = False
-        atualizar_lista()
+        lista_clientes.redesenhar()
     
     mes_dd = ft.Dropdown(
         label="Mês", width=130, value=str(mes_atual),
@@ -137,6 +165,12 @@ def criar_tela_gerar_recibo(page: ft.Page, file_picker, theme, usuario_logado=No
         on_change=lambda e: atualizar_lista(),
     )
     
+    busca = ft.TextField(
+        label="Buscar", width=200, prefix_icon=ft.Icons.SEARCH,
+        bgcolor=INPUT_BG, border_color=INPUT_BORDER, color=TEXT_PRIMARY,
+        on_change=on_busca_change,
+    )
+    
     def gerar_recibos(e):
         selecionados = [cid for cid, d in clientes_dados.items() if d.get('selecionado')]
         
@@ -152,35 +186,46 @@ def criar_tela_gerar_recibo(page: ft.Page, file_picker, theme, usuario_logado=No
                 return
             
             pasta = ev.path
+            enviar_email = enviar_email_cb.value
+            username = usuario_logado[0].get('username', 'desconhecido') if usuario_logado and usuario_logado[0] else 'desconhecido'
             progresso.visible = True
             resultado_text.value = "Gerando..."
             resultado_text.color = TEXT_SECONDARY
             page.update()
             
-            gerados = 0
-            erros = 0
-            
-            try:
+            def gerar(tarefa):
+                """Roda em segundo plano: monta, grava e gera os PDFs (e emails)"""
                 from utils.pdf_recibo import gerar_pdf_recibo
                 
+                gerados = 0
+                erros = 0
+                empresa = get_configs('empresa_')
                 dados_empresa = {
-                    'nome': get_config('empresa_nome', 'Escritório'),
-                    'cnpj': get_config('empresa_cnpj', ''),
-                    'endereco': get_config('empresa_endereco', ''),
-                    'cidade': get_config('empresa_cidade', ''),
-                    'telefone': get_config('empresa_telefone', ''),
-                    'email': get_config('empresa_email', ''),
-                    'chave_pix': get_config('empresa_pix', ''),
+                    'nome': empresa.get('empresa_nome', 'Escritório'),
+                    'cnpj': empresa.get('empresa_cnpj', ''),
+                    'endereco': empresa.get('empresa_endereco', ''),
+                    'cidade': empresa.get('empresa_cidade', ''),
+                    'telefone': empresa.get('empresa_telefone', ''),
+                    'email': empresa.get('empresa_email', ''),
+                    'chave_pix': empresa.get('empresa_pix', ''),
                 }
                 
+                # Valores lidos agora e só para esta geração: a tela pode estar guardada desde
+                # antes de os honorários mudarem, e valores_cache segue o período exibido
+                valores = ler_valores(mes, ano)
+                
+                # 1ª passada: monta os recibos de todos os selecionados
+                pendentes = []
+                tarefa.progresso(0, len(selecionados), "preparando")
                 for cid in selecionados:
+                    tarefa.verificar()
                     cliente = buscar_cliente(cid)
                     if not cliente:
                         erros += 1
                         continue
                     
                     dados = clientes_dados.get(cid, {})
-                    valor_base = valores_cache.get((cid, mes, ano), 0)
+                    valor_base = valores.get((cid, mes, ano), 0)
                     valor = valor_base + dados.get('acrescimo', 0) - dados.get('decrescimo', 0)
                     
                     mes_nome = MESES[mes-1] if mes <= 12 else "13º"
@@ -211,11 +256,31 @@ def criar_tela_gerar_recibo(page: ft.Page, file_picker, theme, usuario_logado=No
                     except:
                         pass
                     
-                    recibo_id, numero = criar_recibo(
-                        cliente_id=cid, valor=valor, descricao=descricao,
-                        referencia_mes=mes, referencia_ano=ano,
-                    )
-                    
+                    pendentes.append({
+                        'cliente': cliente, 'valor': valor, 'descricao': descricao,
+                        'extras': extras, 'certificados': certificados_mes,
+                    })
+                
+                # Último ponto de cancelamento antes de gravar os recibos
+                tarefa.verificar()
+                # Números reservados de uma vez e recibos gravados numa única transação
+                criados = criar_recibos_lote([
+                    {'cliente_id': p['cliente']['id'], 'valor': p['valor'], 'descricao': p['descricao'],
+                     'referencia_mes': mes, 'referencia_ano': ano}
+                    for p in pendentes
+                ])
+                
+                # 2ª passada: PDFs e emails
+                tarefa.progresso(0, len(criados), "gerando PDFs")
+                faltando = 0
+                for i, (p, (recibo_id, numero)) in enumerate(zip(pendentes, criados)):
+                    if tarefa.cancelada:
+                        # Os recibos já estão gravados: informa quantos ficaram sem PDF
+                        faltando = len(criados) - i
+                        break
+                    cliente = p['cliente']
+                    cid = cliente['id']
+                    valor = p['valor']
                     try:
                         # Gerar nome do arquivo para o PDF
                         codigo = cliente['codigo_interno'] or str(cid)
@@ -225,12 +290,12 @@ def criar_tela_gerar_recibo(page: ft.Page, file_picker, theme, usuario_logado=No
                         gerar_pdf_recibo(
                             cliente=dict(cliente), valor=valor, mes=mes, ano=ano,
                             numero_recibo=numero, pasta_destino=pasta, dados_empresa=dados_empresa,
-                            certificados=certificados_mes, extras=extras,
+                            certificados=p['certificados'], extras=p['extras'],
                         )
                         gerados += 1
                         
                         # Enviar por email se marcado
-                        if enviar_email_cb.value and cliente['email']:
+                        if enviar_email and cliente['email']:
                             try:
                                 sucesso, msg = enviar_recibo_email(
                                     cliente_email=cliente['email'],
@@ -246,31 +311,41 @@ def criar_tela_gerar_recibo(page: ft.Page, file_picker, theme, usuario_logado=No
                                 pass  # Ignora erro de email, PDF já foi gerado
                     except:
                         erros += 1
-                
-                progresso.visible = False
-                resultado_text.value = f"✅ {gerados} gerados | ❌ {erros} erros"
-                resultado_text.color = SUCCESS if erros == 0 else WARNING
-                page.update()
+                    tarefa.progresso(i + 1)
                 
                 if gerados > 0:
                     # Log da geração
-                    username = usuario_logado[0].get('username', 'desconhecido') if usuario_logado and usuario_logado[0] else 'desconhecido'
                     registrar_log(username, "Recibos PDF gerados", detalhes=f"{gerados} recibos ref. {mes}/{ano}")
-                    toast_success(page, f"{gerados} recibos gerados!")
-                
-            except Exception as ex:
+                tarefa.resultado = (gerados, erros, faltando)
+                tarefa.verificar()
+                return tarefa.resultado
+            
+            def terminar(tarefa):
                 progresso.visible = False
-                resultado_text.value = f"Erro: {str(ex)}"
-                resultado_text.color = DANGER
+                if tarefa.status == "ERRO":
+                    resultado_text.value = f"Erro: {tarefa.erro}"
+                    resultado_text.color = DANGER
+                elif tarefa.resultado is None:
+                    resultado_text.value = "Cancelado antes de gravar os recibos"
+                    resultado_text.color = WARNING
+                else:
+                    gerados, erros, faltando = tarefa.resultado
+                    resultado_text.value = f"✅ {gerados} gerados | ❌ {erros} erros"
+                    if faltando:
+                        resultado_text.value += f" | ⏹ cancelado: {faltando} recibos gravados sem PDF"
+                    resultado_text.color = SUCCESS if erros == 0 and not faltando else WARNING
+                    if tarefa.status == "CONCLUIDA" and gerados > 0:
+                        toast_success(page, f"{gerados} recibos gerados!")
                 page.update()
+            
+            executar("Gerar recibos", gerar, usuario=username, total=len(selecionados), ao_terminar=terminar)
         
         file_picker.on_result = on_result
         file_picker.get_directory_path(dialog_title="Pasta para recibos")
     
     # Inicializar
     carregar_valores(mes_atual, ano_atual)
-    for cliente in clientes:
-        lista_clientes.controls.append(criar_linha(cliente, mes_atual, ano_atual))
+    lista_clientes.definir_itens(clientes, atualizar=False)
     
     return ft.Container(
         content=ft.Column([
@@ -281,6 +356,7 @@ def criar_tela_gerar_recibo(page: ft.Page, file_picker, theme, usuario_logado=No
             ft.Row([
                 mes_dd,
                 ano_dd,
+                busca,
                 ft.Container(width=20),
                 ft.ElevatedButton("✅ Todos", bgcolor=ACCENT, color=TEXT_PRIMARY, on_click=selecionar_todos),
                 ft.ElevatedButton("❌ Nenhum", bgcolor=SURFACE_HOVER, color=TEXT_PRIMARY, on_click=desmarcar_todos),
@@ -304,7 +380,7 @@ def criar_tela_gerar_recibo(page: ft.Page, file_picker, theme, usuario_logado=No
             ),
             
             ft.Container(
-                content=lista_clientes,
+                content=lista_clientes.controle,
                 height=350,
                 border_radius=12,
                 border=ft.border.all(1, SURFACE_HOVER),
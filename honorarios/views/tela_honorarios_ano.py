@@ -4,14 +4,21 @@ OTIMIZADO: Query única, suporte light/dark
 """
 import flet as ft
 from datetime import datetime
+import asyncio
 import csv
 import os
+import re
+import threading
 
 from database import (
-    listar_honorarios, listar_clientes, adicionar_honorario,
-    marcar_como_pago, atualizar_honorario, get_connection, registrar_log
+    listar_honorarios_pagina, contar_honorarios_ano, get_connection, registrar_log,
+    buscar_honorarios, ultima_alteracao, adicionar_observador_alteracoes, fechar_conexao_thread
 )
+from database_async import db
 from utils.theme import CORES
+from utils.dinheiro import formatar_moeda
+from utils.busca import BuscaAdiada, termos_busca, casa_termos, refina
+from utils.lista_virtual import ListaVirtual
 from utils.toast import toast_success, toast_error, toast_warning
 
 
@@ -35,138 +42,358 @@ def criar_tela_honorarios_ano(page: ft.Page, ano: int, mes_filtro, theme, voltar
     DANGER = CORES["danger"]
     
     filtro_mes = [mes_filtro]
+    filtro_status = [None]
     filtro_cliente = [""]
-    dados_tabela = []
+    dados_tabela = []  # honorários já exibidos (páginas carregadas)
+    posicoes = {}   # honorario_id -> posição em dados_tabela
+    selecionados = set()  # ids marcados para "baixar selecionados"
+    visto = [0]     # último seq do registro de alterações já refletido na lista
+    # dados_tabela, posicoes e selecionados mudam no loop do Flet, na thread do monitor
+    # e na da busca: recriar e trocar linhas só com este lock
+    estado_lock = threading.RLock()
     
-    # Cache de códigos internos (carrega uma única vez)
+    # Cache de códigos internos e das palavras de busca de cada cliente (carrega uma única vez)
     codigos_cache = {}
-    
-    # Container para linhas (não usa DataTable que é pesado)
-    lista_honorarios = ft.Column([], spacing=4, scroll=ft.ScrollMode.AUTO)
-    
-    def formatar_moeda(valor):
-        return f"R$ {valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+    palavras_clientes = {}
     
     def carregar_codigos():
-        """Carrega todos os códigos internos em uma única query"""
+        """Carrega todos os códigos internos (e o texto de busca) em uma única query"""
         conn = get_connection()
         cursor = conn.cursor()
-        cursor.execute("SELECT id, codigo_interno FROM clientes")
+        cursor.execute("SELECT id, codigo_interno, nome, cnpj, cpf, email FROM clientes")
         for row in cursor.fetchall():
             codigos_cache[row['id']] = row['codigo_interno'] or str(row['id'])
+            # Mesmos campos do índice de busca: documentos também só com dígitos
+            documentos = [re.sub(r"\D", "", d) for d in (row['cnpj'], row['cpf']) if d]
+            texto = " ".join(str(v) for v in (row['nome'], row['codigo_interno'], row['cnpj'], row['cpf'], row['email'], *documentos) if v)
+            palavras_clientes[row['id']] = termos_busca(texto)
         conn.close()
     
     def criar_linha(h):
-        codigo = codigos_cache.get(h['cliente_id'], str(h['cliente_id']))
-        status = h['status']
-        cor_status = SUCCESS if status == "PAGO" else WARNING if status == "PENDENTE" else DANGER
+        """Linha de um honorário; preencher_linha troca o honorário sem recriar os controles"""
+        async def on_pagar(e):
+            await marcar_pago(linha.data['id'])
+        
+        btn_pago = ft.IconButton(
+            ft.Icons.CHECK_CIRCLE,
+            icon_color=SUCCESS,
+            icon_size=18,
+            on_click=on_pagar,
+        )
         
-        return ft.Container(
+        def on_sel(e):
+            if e.control.value:
+                selecionados.add(linha.data['id'])
+            else:
+                selecionados.discard(linha.data['id'])
+            atualizar_selecao()
+        
+        linha = ft.Container(
             content=ft.Row([
-                ft.Text(codigo, size=10, width=50, color=TEXT_SECONDARY),
-                ft.Text(h['cliente_nome'][:25], size=11, width=200, color=TEXT_PRIMARY),
-                ft.Text(MESES[h['mes']-1] if h['mes'] <= 13 else str(h['mes']), size=11, width=50, color=TEXT_SECONDARY),
-                ft.Text(formatar_moeda(h['valor']), size=11, width=100, color=ACCENT),
+                ft.Checkbox(on_change=on_sel, active_color=ACCENT, check_color=TEXT_PRIMARY, width=30),
+                ft.Text("", size=10, width=50, color=TEXT_SECONDARY),
+                ft.Text("", size=11, width=200, color=TEXT_PRIMARY),
+                ft.Text("", size=11, width=50, color=TEXT_SECONDARY),
+                ft.Text("", size=11, width=100, color=ACCENT),
                 ft.Container(
-                    content=ft.Text(status[:4], size=9, color=TEXT_PRIMARY),
-                    bgcolor=cor_status,
+                    content=ft.Text("", size=9, color=TEXT_PRIMARY),
                     border_radius=4,
                     padding=ft.padding.symmetric(horizontal=8, vertical=3),
                     width=60,
                 ),
                 ft.Row([
-                    ft.IconButton(
-                        ft.Icons.CHECK_CIRCLE,
-                        icon_color=SUCCESS,
-                        icon_size=18,
-                        on_click=lambda e, hid=h['id']: marcar_pago(hid),
-                        visible=status != "PAGO",
-                    ) if status != "PAGO" else ft.Container(width=40),
+                    ft.Container(content=btn_pago, width=40),
                     ft.IconButton(
                         ft.Icons.EDIT,
                         icon_color=ACCENT,
                         icon_size=18,
-                        on_click=lambda e, hon=h: abrir_modal_editar(hon),
+                        on_click=lambda e: abrir_modal_editar(linha.data),
                     ),
-        ], spacing=0, width=80),
+                ], spacing=0, width=80),
             ]),
             padding=ft.padding.symmetric(horizontal=12, vertical=8),
             bgcolor=SURFACE,
             border_radius=8,
             border=ft.border.all(1, theme.get_border()),
         )
+        preencher_linha(linha, h)
+        return linha
+    
+    def preencher_linha(linha, h):
+        sel, codigo, nome, mes, valor, badge, acoes = linha.content.controls
+        status = h['status']
+        sel.value = h['id'] in selecionados
+        sel.disabled = status == "PAGO"
+        codigo.value = codigos_cache.get(h['cliente_id'], str(h['cliente_id']))
+        nome.value = h['cliente_nome'][:25]
+        mes.value = MESES[h['mes']-1] if h['mes'] <= 13 else str(h['mes'])
+        valor.value = formatar_moeda(h['valor'])
+        badge.content.value = status[:4]
+        badge.bgcolor = SUCCESS if status == "PAGO" else WARNING if status == "PENDENTE" else DANGER
+        acoes.controls[0].content.visible = status != "PAGO"
+        linha.data = h
     
-    # Paginação para performance
+    # Só as linhas visíveis existem como controles (ListView virtualizada)
+    lista_honorarios = ListaVirtual(criar_linha, preencher_linha, altura_item=60)
+    
+    # Paginação por chave: cada página é uma consulta filtrada no banco
     ITEMS_PER_PAGE = 100
-    itens_exibidos = [0]
+    total_filtrado = [0]
     
     btn_carregar_mais = ft.ElevatedButton(
         "Carregar mais...",
         bgcolor=ACCENT,
         color=TEXT_PRIMARY,
         visible=False,
-        on_click=lambda e: carregar_mais(),
     )
     
     info_paginacao = ft.Text("", size=11, color=TEXT_SECONDARY)
     
-    def carregar_mais():
-        """Carrega mais itens da lista"""
-        inicio = itens_exibidos[0]
-        fim = min(inicio + ITEMS_PER_PAGE, len(dados_tabela))
-        
-        for i in range(inicio, fim):
-            lista_honorarios.controls.append(criar_linha(dados_tabela[i]))
-        
-        itens_exibidos[0] = fim
-        btn_carregar_mais.visible = fim < len(dados_tabela)
-        info_paginacao.value = f"Exibindo {fim} de {len(dados_tabela)}"
+    # Baixa em lote dos honorários marcados
+    btn_baixar = ft.ElevatedButton(
+        "💰 Baixar selecionados",
+        bgcolor=SUCCESS,
+        color=TEXT_PRIMARY,
+        visible=False,
+    )
+    
+    def selecionar_todos(e):
+        """Marca (ou desmarca) todos os honorários pendentes já carregados"""
+        with estado_lock:
+            if e.control.value:
+                selecionados.update(h['id'] for h in dados_tabela if h['status'] != "PAGO")
+            else:
+                selecionados.clear()
+            lista_honorarios.redesenhar()
+        atualizar_selecao()
+    
+    sel_todos = ft.Checkbox(on_change=selecionar_todos, active_color=ACCENT, check_color=TEXT_PRIMARY,
+                            width=30, tooltip="Selecionar todos os pendentes")
+    
+    def atualizar_selecao(atualizar=True):
+        btn_baixar.text = f"💰 Baixar selecionados ({len(selecionados)})"
+        btn_baixar.visible = bool(selecionados)
+        if not selecionados:
+            sel_todos.value = False
+        if atualizar and btn_baixar.page is not None:
+            btn_baixar.update()
+            sel_todos.update()
+    
+    def filtros():
+        return dict(mes=filtro_mes[0], status=filtro_status[0], busca=filtro_cliente[0])
+    
+    def atualizar_paginacao():
+        exibidos, total = len(dados_tabela), total_filtrado[0]
+        btn_carregar_mais.visible = exibidos < total
+        info_paginacao.value = f"Exibindo {exibidos} de {total}" if total > ITEMS_PER_PAGE else f"{total} itens"
+    
+    async def carregar_mais(e=None):
+        """Busca a próxima página a partir do último honorário exibido"""
+        with estado_lock:
+            ultimo = dados_tabela[-1] if dados_tabela else None
+        apos = (ultimo['mes'], ultimo['cliente_nome'], ultimo['id']) if ultimo else None
+        pagina = await db.listar_honorarios_pagina(ano, apos=apos, limite=ITEMS_PER_PAGE, **filtros())
+        with estado_lock:
+            if (dados_tabela[-1]['id'] if dados_tabela else None) != (ultimo['id'] if ultimo else None):
+                return  # a lista foi recriada enquanto a página vinha
+            for h in pagina:
+                posicoes[h['id']] = len(dados_tabela)
+                dados_tabela.append(h)
+            lista_honorarios.adicionar_itens(pagina, atualizar=False)
+            atualizar_paginacao()
+        page.update()
+    
+    btn_carregar_mais.on_click = carregar_mais
+    
+    def exibir(total, honorarios):
+        """Troca a lista pela primeira página de um novo filtro"""
+        with estado_lock:
+            dados_tabela[:] = honorarios
+            posicoes.clear()
+            posicoes.update((h['id'], i) for i, h in enumerate(dados_tabela))
+            selecionados.intersection_update(posicoes)
+            atualizar_selecao(atualizar=False)
+            total_filtrado[0] = total
+            lista_honorarios.definir_itens(dados_tabela, atualizar=False)
+            atualizar_paginacao()
         page.update()
     
     def carregar_dados():
-        nonlocal dados_tabela
-        lista_honorarios.controls.clear()
-        itens_exibidos[0] = 0
-        
-        honorarios = listar_honorarios(ano=ano)
-        dados_tabela = []
-        
-        for h in honorarios:
-            if filtro_mes[0] and h['mes'] != filtro_mes[0]:
-                continue
-            if filtro_cliente[0] and filtro_cliente[0].lower() not in h['cliente_nome'].lower():
-                continue
-            
-            dados_tabela.append(h)
-        
-        # Carregar só os primeiros itens
-        fim = min(ITEMS_PER_PAGE, len(dados_tabela))
-        for i in range(fim):
-            lista_honorarios.controls.append(criar_linha(dados_tabela[i]))
+        """Versão síncrona, para as threads (monitor de alterações) e a montagem da tela"""
+        visto[0] = ultima_alteracao()
+        f = filtros()
+        exibir(contar_honorarios_ano(ano, **f), listar_honorarios_pagina(ano, limite=ITEMS_PER_PAGE, **f))
+    
+    async def recarregar():
+        """carregar_dados() para os handlers async: as consultas rodam fora do loop do Flet"""
+        f = filtros()
+        seq, total, pagina = await asyncio.gather(
+            db.ultima_alteracao(),
+            db.contar_honorarios_ano(ano, **f),
+            db.listar_honorarios_pagina(ano, limite=ITEMS_PER_PAGE, **f),
+        )
+        visto[0] = seq
+        exibir(total, pagina)
+    
+    def buscar(texto, cancelada):
+        """Roda na thread da busca: refina o que já está na tela ou consulta o banco"""
+        with estado_lock:
+            exibidos = list(dados_tabela)
+        if len(exibidos) == total_filtrado[0] and refina(filtro_cliente[0], texto):
+            # A lista atual está completa e o texto só acrescentou letras: filtra em memória
+            termos = termos_busca(texto)
+            filtrados = [h for h in exibidos if casa_termos(palavras_clientes.get(h['cliente_id'], ()), termos)]
+            return visto[0], len(filtrados), filtrados
+        seq = ultima_alteracao()
+        f = dict(filtros(), busca=texto)
+        total = contar_honorarios_ano(ano, **f)
+        if cancelada():
+            return None
+        return seq, total, listar_honorarios_pagina(ano, limite=ITEMS_PER_PAGE, **f)
+    
+    def mostrar_busca(texto, resultado):
+        seq, total, honorarios = resultado
+        filtro_cliente[0] = texto
+        visto[0] = seq
+        exibir(total, honorarios)
+    
+    busca_adiada = BuscaAdiada(buscar, mostrar_busca, atraso=0.2, ao_encerrar=fechar_conexao_thread)
+    
+    def on_alteracoes(alteracoes):
+        """Monitor de alterações: troca só as linhas dos honorários alterados"""
+        if alteracoes is None:
+            carregar_codigos()
+            carregar_dados()
+            return
+        novas = [a for a in alteracoes if a['seq'] > visto[0] and a['tabela'] in ("honorarios", "clientes")]
+        if not novas:
+            return
+        visto[0] = novas[-1]['seq']
         
-        itens_exibidos[0] = fim
-        btn_carregar_mais.visible = fim < len(dados_tabela)
-        info_paginacao.value = f"Exibindo {fim} de {len(dados_tabela)}" if len(dados_tabela) > ITEMS_PER_PAGE else f"{len(dados_tabela)} itens"
+        recarregar = any(a['tabela'] == "clientes" for a in novas)
+        if not recarregar:
+            # Uma consulta para todos os alterados (uma baixa em lote traz centenas de uma vez)
+            alterados = {h['id']: h for h in buscar_honorarios(
+                [a['registro_id'] for a in novas if a['operacao'] != "D"])}
+            with estado_lock:
+                for a in novas:
+                    pos = posicoes.get(a['registro_id'])
+                    if a['operacao'] == "D":
+                        if pos is not None:
+                            recarregar = True
+                            break
+                        continue
+                    h = alterados.get(a['registro_id'])
+                    if h is None or h['ano'] != ano:
+                        continue
+                    if pos is not None and h == dados_tabela[pos]:
+                        continue  # a própria tela já trocou a linha (atualizar_linha)
+                    if not atualizar_linha(h):
+                        recarregar = True  # honorário novo, que mudou de posição ou saiu do filtro
+                        break
         
-        page.update()
+        if recarregar:
+            carregar_codigos()
+            carregar_dados()
     
-    def marcar_pago(honorario_id):
+    def atualizar_linha(h, atualizar=True):
+        """
+        Troca só a linha do honorário (posicoes é o registro id -> linha) e
+        atualiza o controle dela. False se ele não pode ser trocado no lugar:
+        não está na lista, mudou de mês/cliente ou saiu do filtro de status.
+        """
+        with estado_lock:
+            pos = posicoes.get(h['id'])
+            if (pos is None or (h['mes'], h['cliente_id']) != (dados_tabela[pos]['mes'], dados_tabela[pos]['cliente_id'])
+                    or (filtro_status[0] and h['status'] != filtro_status[0])):
+                return False
+            dados_tabela[pos] = h
+            if h['status'] == "PAGO":
+                selecionados.discard(h['id'])
+            lista_honorarios.atualizar_item(pos, h, atualizar=atualizar)
+            return True
+    
+    async def honorario_alterado(honorario_id):
+        """Depois de uma ação da tela: troca a linha ou, se não der, recarrega"""
+        h = await db.buscar_honorario(honorario_id)
+        if h is None or not atualizar_linha(h):
+            await recarregar()
+    
+    def nome_usuario():
+        return usuario_logado[0].get('username', 'desconhecido') if usuario_logado and usuario_logado[0] else 'desconhecido'
+    
+    async def marcar_pago(honorario_id):
         # Buscar dados do honorário para log detalhado
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT h.*, c.nome as cliente_nome 
-            FROM honorarios h 
-            JOIN clientes c ON h.cliente_id = c.id
-            WHERE h.id = ?
-        """, (honorario_id,))
-        hon = cursor.fetchone()
-        conn.close()
+        hon = await db.buscar_honorario(honorario_id)
         
         if not hon:
             toast_error(page, "Honorário não encontrado!")
             return
         
+        abrir_dialogo_pagamento(
+            [
+                ft.Text(f"Cliente: {hon['cliente_nome']}", size=13, color=TEXT_SECONDARY),
+                ft.Text(f"Referência: {MESES[hon['mes']-1]}/{hon['ano']}", size=12, color=TEXT_SECONDARY),
+                ft.Text(f"Valor: {formatar_moeda(hon['valor'])}", size=14, color=ACCENT, weight=ft.FontWeight.BOLD),
+            ],
+            lambda forma, data_pagamento, data_str: confirmar_pagamento(hon, forma, data_pagamento, data_str),
+        )
+    
+    async def confirmar_pagamento(hon, forma, data_pagamento, data_str):
+        honorario_id = hon['id']
+        await db.marcar_como_pago(honorario_id, forma_pagamento=forma, data_pagamento=data_pagamento)
+        
+        # Log detalhado
+        mes_nome = MESES[hon['mes']-1] if hon['mes'] <= 13 else str(hon['mes'])
+        detalhes = f"Cliente: {hon['cliente_nome']} | {mes_nome}/{hon['ano']} | R$ {hon['valor']:.2f} | {forma} | {data_str}"
+        registrar_log(nome_usuario(), "Baixa em honorário (PAGO)", tabela="honorarios", registro_id=honorario_id, detalhes=detalhes)
+        
+        toast_success(page, f"Marcado como pago via {forma}!")
+        await honorario_alterado(honorario_id)
+    
+    def baixar_selecionados(e=None):
+        """Baixa em lote: uma forma/data para todos os honorários marcados"""
+        with estado_lock:
+            escolhidos = [dados_tabela[posicoes[i]] for i in selecionados if i in posicoes]
+        escolhidos = [h for h in escolhidos if h['status'] != "PAGO"]
+        if not escolhidos:
+            toast_warning(page, "Nenhum honorário pendente selecionado!")
+            return
+        total = sum(h['valor'] for h in escolhidos)
+        abrir_dialogo_pagamento(
+            [
+                ft.Text(f"{len(escolhidos)} honorários selecionados", size=13, color=TEXT_SECONDARY),
+                ft.Text(f"Total: {formatar_moeda(total)}", size=14, color=ACCENT, weight=ft.FontWeight.BOLD),
+            ],
+            lambda forma, data_pagamento, data_str: confirmar_lote([h['id'] for h in escolhidos], forma, data_pagamento, data_str),
+        )
+    
+    btn_baixar.on_click = baixar_selecionados
+    
+    async def confirmar_lote(ids, forma, data_pagamento, data_str):
+        # Uma transação para todos e uma única entrada no log de auditoria
+        baixados = await db.marcar_como_pago_lote(ids, forma_pagamento=forma, data_pagamento=data_pagamento)
+        if baixados:
+            itens = "; ".join(
+                f"{h['cliente_nome']} {MESES[h['mes']-1] if h['mes'] <= 13 else h['mes']}/{h['ano']} R$ {h['valor']:.2f}"
+                for h in baixados
+            )
+            detalhes = f"{len(baixados)} honorários | R$ {sum(h['valor'] for h in baixados):.2f} | {forma} | {data_str} | {itens}"
+            registrar_log(nome_usuario(), "Baixa em lote (PAGO)", tabela="honorarios", detalhes=detalhes)
+        
+        toast_success(page, f"{len(baixados)} honorários marcados como pagos via {forma}!")
+        # Troca as linhas sem atualizar uma a uma; a tela é atualizada uma vez só
+        with estado_lock:
+            selecionados.clear()
+            completo = all(atualizar_linha(h, atualizar=False) for h in baixados)
+        if not completo:
+            await recarregar()
+        else:
+            atualizar_selecao(atualizar=False)
+            page.update()
+    
+    def abrir_dialogo_pagamento(resumo, ao_confirmar):
+        """Diálogo de forma/data do pagamento; await ao_confirmar(forma, data_pagamento, data_str)"""
         # Formas de pagamento disponíveis
         FORMAS_PAGAMENTO = ["Boleto", "PIX", "Cartão", "Asaas", "Dinheiro", "Cheque"]
         
@@ -193,7 +420,7 @@ def criar_tela_honorarios_ano(page: ft.Page, ano: int, mes_filtro, theme, voltar
             hint_text="DD/MM/AAAA",
         )
         
-        def confirmar_pagamento(e):
+        async def confirmar(e):
             forma = forma_dd.value
             data_str = data_field.value
             
@@ -207,27 +434,16 @@ def criar_tela_honorarios_ano(page: ft.Page, ano: int, mes_filtro, theme, voltar
             except:
                 data_pagamento = hoje.strftime("%Y-%m-%d")
             
-            marcar_como_pago(honorario_id, forma_pagamento=forma, data_pagamento=data_pagamento)
-            
-            # Log detalhado
-            username = usuario_logado[0].get('username', 'desconhecido') if usuario_logado and usuario_logado[0] else 'desconhecido'
-            mes_nome = MESES[hon['mes']-1] if hon['mes'] <= 13 else str(hon['mes'])
-            detalhes = f"Cliente: {hon['cliente_nome']} | {mes_nome}/{hon['ano']} | R$ {hon['valor']:.2f} | {forma} | {data_str}"
-            registrar_log(username, "Baixa em honorário (PAGO)", tabela="honorarios", registro_id=honorario_id, detalhes=detalhes)
-            
             dlg.open = False
             page.update()
-            toast_success(page, f"Marcado como pago via {forma}!")
-            carregar_dados()
+            await ao_confirmar(forma, data_pagamento, data_str)
         
         dlg = ft.AlertDialog(
             modal=True,
             title=ft.Text("💰 Registrar Pagamento", weight=ft.FontWeight.BOLD, color=TEXT_PRIMARY),
             bgcolor=BG,
             content=ft.Column([
-                ft.Text(f"Cliente: {hon['cliente_nome']}", size=13, color=TEXT_SECONDARY),
-                ft.Text(f"Referência: {MESES[hon['mes']-1]}/{hon['ano']}", size=12, color=TEXT_SECONDARY),
-                ft.Text(f"Valor: {formatar_moeda(hon['valor'])}", size=14, color=ACCENT, weight=ft.FontWeight.BOLD),
+                *resumo,
                 ft.Container(height=15),
                 forma_dd,
                 ft.Container(height=10),
@@ -235,15 +451,15 @@ def criar_tela_honorarios_ano(page: ft.Page, ano: int, mes_filtro, theme, voltar
             ], spacing=8, width=320),
             actions=[
                 ft.TextButton("Cancelar", on_click=lambda e: setattr(dlg, 'open', False) or page.update()),
-                ft.ElevatedButton("Confirmar", bgcolor=SUCCESS, color=TEXT_PRIMARY, on_click=confirmar_pagamento),
+                ft.ElevatedButton("Confirmar", bgcolor=SUCCESS, color=TEXT_PRIMARY, on_click=confirmar),
             ],
         )
         page.overlay.append(dlg)
         dlg.open = True
         page.update()
     
-    def abrir_modal_novo():
-        clientes = sorted(listar_clientes(), key=lambda c: int(c['codigo_interno']) if c['codigo_interno'] and c['codigo_interno'].isdigit() else float('inf'))
+    async def abrir_modal_novo(e=None):
+        clientes = sorted(await db.listar_clientes(), key=lambda c: int(c['codigo_interno']) if c['codigo_interno'] and c['codigo_interno'].isdigit() else float('inf'))
         if not clientes:
             toast_warning(page, "Cadastre clientes primeiro!")
             return
@@ -259,22 +475,27 @@ def criar_tela_honorarios_ano(page: ft.Page, ano: int, mes_filtro, theme, voltar
         valor_field = ft.TextField(label="Valor", width=300, prefix_text="R$ ", 
                                   bgcolor=INPUT_BG, border_color=INPUT_BORDER, color=TEXT_PRIMARY)
         
-        def salvar(e):
+        async def salvar(e):
             if not cliente_dd.value or not mes_dd.value or not valor_field.value:
                 toast_error(page, "Preencha todos os campos!")
                 return
             try:
-                adicionar_honorario(
-                    cliente_id=int(cliente_dd.value),
-                    ano=ano,
-                    mes=int(mes_dd.value),
-                    valor=float(valor_field.value.replace(",", ".")),
-                )
-                toast_success(page, "Honorário adicionado!")
-                dlg.open = False
-                carregar_dados()
-            except:
+                valor = float(valor_field.value.replace(",", "."))
+            except ValueError:
                 toast_error(page, "Valor inválido!")
+                return
+            honorario_id = await db.adicionar_honorario(
+                cliente_id=int(cliente_dd.value),
+                ano=ano,
+                mes=int(mes_dd.value),
+                valor=valor,
+            )
+            if honorario_id is None:
+                toast_error(page, "Este cliente já tem honorário neste mês!")
+                return
+            toast_success(page, "Honorário adicionado!")
+            dlg.open = False
+            await recarregar()
         
         dlg = ft.AlertDialog(
             modal=True,
@@ -300,11 +521,12 @@ def criar_tela_honorarios_ano(page: ft.Page, ano: int, mes_filtro, theme, voltar
             ],
         )
         
-        def salvar(e):
-            atualizar_honorario(h['id'], status=status_dd.value)
+        async def salvar(e):
+            await db.atualizar_honorario(h['id'], status=status_dd.value)
             toast_success(page, "Atualizado!")
             dlg.open = False
-            carregar_dados()
+            page.update()
+            await honorario_alterado(h['id'])
         
         dlg = ft.AlertDialog(
             modal=True,
@@ -325,26 +547,27 @@ def criar_tela_honorarios_ano(page: ft.Page, ano: int, mes_filtro, theme, voltar
         dlg.open = True
         page.update()
     
-    def exportar_csv(e):
+    async def exportar_csv(e):
         if not dados_tabela:
             toast_warning(page, "Nenhum dado!")
             return
         try:
+            honorarios = await db.listar_honorarios_pagina(ano, limite=None, **filtros())
             desktop = os.path.join(os.path.expanduser("~"), "Desktop")
             filepath = os.path.join(desktop, f"honorarios_{ano}.csv")
             with open(filepath, "w", newline="", encoding="utf-8-sig") as f:
                 writer = csv.writer(f, delimiter=";")
                 writer.writerow(["Cliente", "Mês", "Valor", "Status"])
-                for h in dados_tabela:
+                for h in honorarios:
                     writer.writerow([h['cliente_nome'], MESES[h['mes']-1], h['valor'], h['status']])
             toast_success(page, f"Exportado: {filepath}")
         except Exception as ex:
             toast_error(page, str(ex))
     
-    def on_filtro_mes_change(e):
+    async def on_filtro_mes_change(e):
         val = e.control.value
         filtro_mes[0] = int(val) if val and val.isdigit() else None
-        carregar_dados()
+        await recarregar()
     
     filtro_mes_dd = ft.Dropdown(
         label="Mês", width=130,
@@ -355,19 +578,33 @@ def criar_tela_honorarios_ano(page: ft.Page, ano: int, mes_filtro, theme, voltar
         on_change=on_filtro_mes_change,
     )
     
+    async def on_filtro_status_change(e):
+        filtro_status[0] = e.control.value or None
+        await recarregar()
+    
+    filtro_status_dd = ft.Dropdown(
+        label="Status", width=130,
+        bgcolor=INPUT_BG, border_color=INPUT_BORDER,
+        color=TEXT_PRIMARY, label_style=ft.TextStyle(color=TEXT_SECONDARY),
+        options=[ft.dropdown.Option("", "Todos")] + [ft.dropdown.Option(s, s.capitalize()) for s in ("PENDENTE", "PAGO", "ATRASADO")],
+        on_change=on_filtro_status_change,
+    )
+    
     busca = ft.TextField(
         label="Buscar", width=200, prefix_icon=ft.Icons.SEARCH,
         bgcolor=INPUT_BG, border_color=INPUT_BORDER, color=TEXT_PRIMARY,
-        on_change=lambda e: (filtro_cliente.__setitem__(0, e.control.value or ""), carregar_dados())[1],
+        on_change=lambda e: busca_adiada.digitar(e.control.value or ""),
     )
     
     # Carregar dados
     carregar_codigos()
     carregar_dados()
+    adicionar_observador_alteracoes(on_alteracoes, chave="tela")
     
     # Header da lista
     header = ft.Container(
         content=ft.Row([
+            sel_todos,
             ft.Text("Cód", size=9, width=50, color=TEXT_SECONDARY),
             ft.Text("Cliente", size=9, width=200, color=TEXT_SECONDARY),
             ft.Text("Mês", size=9, width=50, color=TEXT_SECONDARY),
@@ -384,20 +621,20 @@ def criar_tela_honorarios_ano(page: ft.Page, ano: int, mes_filtro, theme, voltar
                 ft.IconButton(ft.Icons.ARROW_BACK, icon_color=ACCENT, on_click=lambda e: voltar_callback()),
                 ft.Text(f"📅 {ano}", size=24, weight=ft.FontWeight.BOLD, color=TEXT_PRIMARY),
                 ft.Container(expand=True),
-                ft.ElevatedButton("➕ Novo", bgcolor=SUCCESS, color=TEXT_PRIMARY, on_click=lambda e: abrir_modal_novo()),
+                ft.ElevatedButton("➕ Novo", bgcolor=SUCCESS, color=TEXT_PRIMARY, on_click=abrir_modal_novo),
                 ft.ElevatedButton("📤 CSV", bgcolor=ACCENT, color=TEXT_PRIMARY, on_click=exportar_csv),
             ]),
             ft.Container(height=15),
-            ft.Row([filtro_mes_dd, busca], spacing=10),
+            ft.Row([filtro_mes_dd, filtro_status_dd, busca], spacing=10),
             ft.Container(height=10),
             header,
             ft.Container(
-                content=lista_honorarios,
+                content=lista_honorarios.controle,
                 expand=True,
                 border_radius=10,
                 padding=5,
             ),
-            ft.Row([info_paginacao, ft.Container(expand=True), btn_carregar_mais], spacing=10),
+            ft.Row([info_paginacao, ft.Container(expand=True), btn_baixar, btn_carregar_mais], spacing=10),
         ]),
         expand=True,
         padding=25,
@@ -5,8 +5,9 @@ OTIMIZADO: Visual dinâmico (light/dark), queries agregadas
 import flet as ft
 from datetime import datetime
 
-from database import get_connection
+from database import get_connection, get_resumo_anos, get_resumo_meses
 from utils.theme import CORES
+from utils.dinheiro import formatar_moeda as formatar_reais
 
 
 def criar_tela_inicio(page: ft.Page, theme, nav_para_ano, is_admin=True):
@@ -34,33 +35,12 @@ def criar_tela_inicio(page: ft.Page, theme, nav_para_ano, is_admin=True):
     cursor.execute("SELECT COUNT(*) as total FROM clientes")
     total_clientes = cursor.fetchone()['total']
     
-    # Resumo por ano
-    cursor.execute("""
-        SELECT 
-            ano,
-            COUNT(*) as total,
-            SUM(CASE WHEN status = 'PAGO' THEN 1 ELSE 0 END) as pagos,
-            SUM(valor) as valor_total,
-            SUM(CASE WHEN status = 'PAGO' THEN valor ELSE 0 END) as valor_recebido
-        FROM honorarios
-        GROUP BY ano
-        ORDER BY ano DESC
-    """)
-    resumo_anos = {row['ano']: dict(row) for row in cursor.fetchall()}
-    
-    # Meses do ano atual
-    cursor.execute("""
-        SELECT mes, 
-               COUNT(*) as total,
-               SUM(CASE WHEN status = 'PAGO' THEN 1 ELSE 0 END) as pagos
-        FROM honorarios 
-        WHERE ano = ?
-        GROUP BY mes
-    """, (ano_atual,))
-    meses_data = {row['mes']: dict(row) for row in cursor.fetchall()}
-    
     conn.close()
     
+    # Resumo por ano e meses do ano atual (tabela honorarios_resumo)
+    resumo_anos = {row['ano']: dict(row) for row in get_resumo_anos()}
+    meses_data = {row['mes']: dict(row) for row in get_resumo_meses(ano_atual)}
+    
     # Calcular totais
     total_valor = sum(r.get('valor_total', 0) or 0 for r in resumo_anos.values())
     total_recebido = sum(r.get('valor_recebido', 0) or 0 for r in resumo_anos.values())
@@ -69,7 +49,7 @@ def criar_tela_inicio(page: ft.Page, theme, nav_para_ano, is_admin=True):
     def formatar_moeda(valor, ocultar=False):
         if ocultar:
             return "R$ *****"
-        return f"R$ {valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+        return formatar_reais(valor)
     
     # ═══ CARDS DE RESUMO ═══
     def criar_card(titulo, valor, cor, icone, subtitulo=""):
@@ -7,8 +7,9 @@ from datetime import datetime
 import os
 import csv
 
-from database import get_connection, listar_clientes, get_relatorio_cliente, get_honorarios_vencendo, listar_logs, listar_certificados, get_relatorio_formas_pagamento
+from database import get_resumo_ano, get_resumo_meses, listar_clientes, get_relatorio_cliente, get_honorarios_vencendo, listar_logs, listar_certificados, get_relatorio_formas_pagamento
 from utils.theme import CORES
+from utils.dinheiro import formatar_moeda as formatar_reais
 from utils.toast import toast_success, toast_error, toast_info
 
 
@@ -39,35 +40,15 @@ def criar_tela_relatorios(page: ft.Page, theme, is_admin=True):
     def formatar_moeda(valor, ocultar=False):
         if ocultar:
             return "R$ *****"
-        return f"R$ {valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+        return formatar_reais(valor)
     
     # ═══ TAB 1: DASHBOARD ═══
     def criar_dashboard():
         ano = ano_selecionado[0]
         
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        # Resumo do ano
-        cursor.execute("""
-            SELECT 
-                COUNT(*) as total,
-                SUM(CASE WHEN status = 'PAGO' THEN 1 ELSE 0 END) as pagos,
-                SUM(valor) as valor_total,
-                SUM(CASE WHEN status = 'PAGO' THEN valor ELSE 0 END) as valor_recebido
-            FROM honorarios WHERE ano = ?
-        """, (ano,))
-        resumo = cursor.fetchone()
-        
-        # Por mês
-        cursor.execute("""
-            SELECT mes, SUM(valor) as total_valor,
-                   SUM(CASE WHEN status = 'PAGO' THEN valor ELSE 0 END) as valor_pago
-            FROM honorarios WHERE ano = ? AND mes <= 12
-            GROUP BY mes ORDER BY mes
-        """, (ano,))
-        dados_meses = {row['mes']: dict(row) for row in cursor.fetchall()}
-        conn.close()
+        # Resumo do ano e por mês (tabela honorarios_resumo)
+        resumo = get_resumo_ano(ano)
+        dados_meses = {row['mes']: dict(row) for row in get_resumo_meses(ano) if row['mes'] <= 12}
         
         total = resumo['total'] or 0
         pagos = resumo['pagos'] or 0
@@ -98,13 +79,13 @@ def criar_tela_relatorios(page: ft.Page, theme, is_admin=True):
             )
         
         # Barras visuais
-        max_valor = max([d.get('total_valor', 0) or 0 for d in dados_meses.values()] or [1])
+        max_valor = max([d.get('valor_total', 0) or 0 for d in dados_meses.values()] or [1])
         
         barras = []
         for mes in range(1, 13):
-            dados = dados_meses.get(mes, {'total_valor': 0, 'valor_pago': 0})
-            total_v = dados.get('total_valor', 0) or 0
-            pago_v = dados.get('valor_pago', 0) or 0
+            dados = dados_meses.get(mes, {'valor_total': 0, 'valor_recebido': 0})
+            total_v = dados.get('valor_total', 0) or 0
+            pago_v = dados.get('valor_recebido', 0) or 0
             
             altura = int((total_v / max_valor) * 100) if max_valor > 0 else 0
             altura_pago = int((pago_v / max_valor) * 100) if max_valor > 0 else 0
@@ -2,10 +2,11 @@
 Tela de Gerenciamento de Usuários e Logs - Apenas Admin
 """
 import flet as ft
+from datetime import datetime
 
 from database import (
     listar_usuarios, atualizar_cargo_usuario, excluir_usuario, 
-    aprovar_usuario, bloquear_usuario, atualizar_status_usuario, get_connection
+    aprovar_usuario, bloquear_usuario, atualizar_status_usuario, listar_logs
 )
 from utils.theme import CORES
 from utils.toast import toast_success, toast_error
@@ -31,6 +32,25 @@ def criar_tela_usuarios(page: ft.Page, theme):
     lista_usuarios = ft.Column([], spacing=8, scroll=ft.ScrollMode.AUTO, expand=True)
     lista_logs = ft.Column([], spacing=4, scroll=ft.ScrollMode.AUTO, expand=True)
     
+    LOGS_POR_PAGINA = 100
+    # Paginação por chave: posição (data_hora, id) do último log exibido
+    estado_logs = {'cursor': None, 'arquivados': False, 'fim': False}
+    
+    TABELAS_LOG = ["honorarios", "clientes", "recibos", "certificados", "usuarios"]
+    filtro_usuario = ft.Dropdown(
+        label="Usuário", width=150, bgcolor=INPUT_BG, border_color=INPUT_BORDER, dense=True,
+        options=[ft.dropdown.Option("", "Todos")],
+    )
+    filtro_tabela = ft.Dropdown(
+        label="Tabela", width=150, bgcolor=INPUT_BG, border_color=INPUT_BORDER, dense=True,
+        options=[ft.dropdown.Option("", "Todas")] + [ft.dropdown.Option(t, t.capitalize()) for t in TABELAS_LOG],
+    )
+    filtro_inicio = ft.TextField(label="De (dd/mm/aaaa)", width=140, bgcolor=INPUT_BG, border_color=INPUT_BORDER,
+                                 color=TEXT_PRIMARY, dense=True)
+    filtro_fim = ft.TextField(label="Até (dd/mm/aaaa)", width=140, bgcolor=INPUT_BG, border_color=INPUT_BORDER,
+                              color=TEXT_PRIMARY, dense=True)
+    btn_mais_logs = ft.TextButton("⬇️ Carregar mais antigos", visible=False, on_click=lambda e: carregar_logs(mais=True))
+    
     def carregar_usuarios():
         lista_usuarios.controls.clear()
         usuarios = listar_usuarios()
@@ -142,114 +162,138 @@ def criar_tela_usuarios(page: ft.Page, theme):
         
         page.update()
     
-    def carregar_logs():
-        lista_logs.controls.clear()
+    def data_filtro(campo):
+        """dd/mm/aaaa -> AAAA-MM-DD (None se vazio ou inválido)"""
+        if not campo.value:
+            return None
+        try:
+            return datetime.strptime(campo.value.strip(), "%d/%m/%Y").strftime("%Y-%m-%d")
+        except ValueError:
+            toast_error(page, f"Data inválida: {campo.value}")
+            return None
+    
+    def criar_linha_log(log):
+        acao = log['acao'].lower()
+        if 'login' in acao:
+            icone, cor = ft.Icons.LOGIN, SUCCESS
+        elif 'logout' in acao:
+            icone, cor = ft.Icons.LOGOUT, WARNING
+        elif 'cadastr' in acao or 'criar' in acao:
+            icone, cor = ft.Icons.ADD_CIRCLE_OUTLINE, SUCCESS
+        elif 'exclu' in acao or 'delet' in acao:
+            icone, cor = ft.Icons.DELETE_OUTLINE, DANGER
+        elif 'aprov' in acao:
+            icone, cor = ft.Icons.CHECK_CIRCLE, SUCCESS
+        elif 'bloqu' in acao:
+            icone, cor = ft.Icons.BLOCK, DANGER
+        elif 'alter' in acao or 'edita' in acao:
+            icone, cor = ft.Icons.EDIT_OUTLINED, ACCENT
+        elif 'recibo' in acao or 'pdf' in acao:
+            icone, cor = ft.Icons.PICTURE_AS_PDF_OUTLINED, PURPLE
+        elif 'pago' in acao:
+            icone, cor = ft.Icons.PAID_OUTLINED, SUCCESS
+        else:
+            icone, cor = ft.Icons.INFO_OUTLINE, TEXT_SECONDARY
+        
+        data_hora = log['data_hora'][:16] if log['data_hora'] else ""
         
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT * FROM logs_auditoria 
-            ORDER BY data_hora DESC 
-            LIMIT 100
-        """)
-        logs = cursor.fetchall()
-        conn.close()
+        def mostrar_detalhe_log(e, log_data=log):
+            dialog = ft.AlertDialog(
+                title=ft.Row([
+                    ft.Icon(icone, size=24, color=cor),
+                    ft.Text("Detalhes da Atividade", size=16, weight=ft.FontWeight.BOLD, color=TEXT_PRIMARY),
+                ], spacing=10),
+                content=ft.Container(
+                    content=ft.Column([
+                        ft.Row([
+                            ft.Text("📅 Data/Hora:", size=11, weight=ft.FontWeight.BOLD, color=TEXT_PRIMARY, width=100),
+                            ft.Text(log_data['data_hora'] or '-', size=11, color=TEXT_SECONDARY),
+                        ]),
+                        ft.Divider(height=1, color=SURFACE_HOVER),
+                        ft.Row([
+                            ft.Text("👤 Usuário:", size=11, weight=ft.FontWeight.BOLD, color=TEXT_PRIMARY, width=100),
+                            ft.Text(log_data['usuario'], size=11, color=ACCENT),
+                        ]),
+                        ft.Divider(height=1, color=SURFACE_HOVER),
+                        ft.Row([
+                            ft.Text("📋 Ação:", size=11, weight=ft.FontWeight.BOLD, color=TEXT_PRIMARY, width=100),
+                            ft.Text(log_data['acao'], size=11, color=TEXT_PRIMARY),
+                        ]),
+                        ft.Divider(height=1, color=SURFACE_HOVER),
+                        ft.Row([
+                            ft.Text("📂 Tabela:", size=11, weight=ft.FontWeight.BOLD, color=TEXT_PRIMARY, width=100),
+                            ft.Text(log_data['tabela'] or '-', size=11, color=TEXT_SECONDARY),
+                        ]),
+                        ft.Divider(height=1, color=SURFACE_HOVER),
+                        ft.Row([
+                            ft.Text("🔢 ID Registro:", size=11, weight=ft.FontWeight.BOLD, color=TEXT_PRIMARY, width=100),
+                            ft.Text(str(log_data['registro_id']) if log_data['registro_id'] else '-', size=11, color=TEXT_SECONDARY),
+                        ]),
+                        ft.Divider(height=1, color=SURFACE_HOVER),
+                        ft.Row([
+                            ft.Text("📝 Detalhes:", size=11, weight=ft.FontWeight.BOLD, color=TEXT_PRIMARY, width=100),
+                            ft.Text(log_data['detalhes'] or '-', size=11, color=TEXT_SECONDARY, expand=True),
+                        ]),
+                    ], spacing=8, width=350),
+                    padding=15,
+                ),
+                actions=[
+                    ft.TextButton("Fechar", on_click=lambda e: (setattr(dialog, 'open', False), page.update())),
+                ],
+            )
+            page.overlay.append(dialog)
+            dialog.open = True
+            page.update()
         
-        if not logs:
+        return ft.Container(
+            content=ft.Row([
+                ft.Icon(icone, size=14, color=cor),
+                ft.Text(data_hora, size=9, color=TEXT_SECONDARY, width=95),
+                ft.Text(log['usuario'], size=9, weight=ft.FontWeight.W_500, color=ACCENT, width=70),
+                ft.Text(log['acao'], size=10, color=TEXT_PRIMARY, expand=True),
+                ft.Text(log['detalhes'] or '', size=9, color=TEXT_SECONDARY, width=130),
+            ], spacing=6),
+            padding=8,
+            bgcolor=SURFACE,
+            border_radius=6,
+            border=ft.border.all(1, theme.get_border()),
+            on_click=mostrar_detalhe_log,
+            ink=True,
+        )
+    
+    def carregar_logs(mais=False):
+        """Carrega a primeira página (ou a próxima, com mais=True) já filtrada no banco"""
+        if not mais:
+            lista_logs.controls.clear()
+            estado_logs.update(cursor=None, arquivados=False, fim=False)
+        
+        filtros = dict(
+            usuario=filtro_usuario.value or None,
+            tabela=filtro_tabela.value or None,
+            data_inicio=data_filtro(filtro_inicio),
+            data_fim=data_filtro(filtro_fim),
+        )
+        logs = listar_logs(limite=LOGS_POR_PAGINA, antes_de=estado_logs['cursor'],
+                           arquivados=estado_logs['arquivados'], **filtros)
+        
+        # Acabaram os logs atuais: continua pelo arquivo (todos mais antigos)
+        if len(logs) < LOGS_POR_PAGINA and not estado_logs['arquivados']:
+            estado_logs['arquivados'] = True
+            logs = list(logs) + list(listar_logs(limite=LOGS_POR_PAGINA - len(logs), arquivados=True, **filtros))
+        
+        if logs:
+            estado_logs['cursor'] = (logs[-1]['data_hora'], logs[-1]['id'])
+        estado_logs['fim'] = len(logs) < LOGS_POR_PAGINA
+        
+        if not logs and not lista_logs.controls:
             lista_logs.controls.append(
                 ft.Text("Nenhuma atividade registrada", color=TEXT_SECONDARY)
             )
         else:
             for log in logs:
-                acao = log['acao'].lower()
-                if 'login' in acao:
-                    icone, cor = ft.Icons.LOGIN, SUCCESS
-                elif 'logout' in acao:
-                    icone, cor = ft.Icons.LOGOUT, WARNING
-                elif 'cadastr' in acao or 'criar' in acao:
-                    icone, cor = ft.Icons.ADD_CIRCLE_OUTLINE, SUCCESS
-                elif 'exclu' in acao or 'delet' in acao:
-                    icone, cor = ft.Icons.DELETE_OUTLINE, DANGER
-                elif 'aprov' in acao:
-                    icone, cor = ft.Icons.CHECK_CIRCLE, SUCCESS
-                elif 'bloqu' in acao:
-                    icone, cor = ft.Icons.BLOCK, DANGER
-                elif 'alter' in acao or 'edita' in acao:
-                    icone, cor = ft.Icons.EDIT_OUTLINED, ACCENT
-                elif 'recibo' in acao or 'pdf' in acao:
-                    icone, cor = ft.Icons.PICTURE_AS_PDF_OUTLINED, PURPLE
-                elif 'pago' in acao:
-                    icone, cor = ft.Icons.PAID_OUTLINED, SUCCESS
-                else:
-                    icone, cor = ft.Icons.INFO_OUTLINE, TEXT_SECONDARY
-                
-                data_hora = log['data_hora'][:16] if log['data_hora'] else ""
-                
-                def mostrar_detalhe_log(e, log_data=log):
-                    dialog = ft.AlertDialog(
-                        title=ft.Row([
-                            ft.Icon(icone, size=24, color=cor),
-                            ft.Text("Detalhes da Atividade", size=16, weight=ft.FontWeight.BOLD, color=TEXT_PRIMARY),
-                        ], spacing=10),
-                        content=ft.Container(
-                            content=ft.Column([
-                                ft.Row([
-                                    ft.Text("📅 Data/Hora:", size=11, weight=ft.FontWeight.BOLD, color=TEXT_PRIMARY, width=100),
-                                    ft.Text(log_data['data_hora'] or '-', size=11, color=TEXT_SECONDARY),
-                                ]),
-                                ft.Divider(height=1, color=SURFACE_HOVER),
-                                ft.Row([
-                                    ft.Text("👤 Usuário:", size=11, weight=ft.FontWeight.BOLD, color=TEXT_PRIMARY, width=100),
-                                    ft.Text(log_data['usuario'], size=11, color=ACCENT),
-                                ]),
-                                ft.Divider(height=1, color=SURFACE_HOVER),
-                                ft.Row([
-                                    ft.Text("📋 Ação:", size=11, weight=ft.FontWeight.BOLD, color=TEXT_PRIMARY, width=100),
-                                    ft.Text(log_data['acao'], size=11, color=TEXT_PRIMARY),
-                                ]),
-                                ft.Divider(height=1, color=SURFACE_HOVER),
-                                ft.Row([
-                                    ft.Text("📂 Tabela:", size=11, weight=ft.FontWeight.BOLD, color=TEXT_PRIMARY, width=100),
-                                    ft.Text(log_data['tabela'] or '-', size=11, color=TEXT_SECONDARY),
-                                ]),
-                                ft.Divider(height=1, color=SURFACE_HOVER),
-                                ft.Row([
-                                    ft.Text("🔢 ID Registro:", size=11, weight=ft.FontWeight.BOLD, color=TEXT_PRIMARY, width=100),
-                                    ft.Text(str(log_data['registro_id']) if log_data['registro_id'] else '-', size=11, color=TEXT_SECONDARY),
-                                ]),
-                                ft.Divider(height=1, color=SURFACE_HOVER),
-                                ft.Row([
-                                    ft.Text("📝 Detalhes:", size=11, weight=ft.FontWeight.BOLD, color=TEXT_PRIMARY, width=100),
-                                    ft.Text(log_data['detalhes'] or '-', size=11, color=TEXT_SECONDARY, expand=True),
-                                ]),
-                            ], spacing=8, width=350),
-                            padding=15,
-                        ),
-                        actions=[
-                            ft.TextButton("Fechar", on_click=lambda e: (setattr(dialog, 'open', False), page.update())),
-                        ],
-                    )
-                    page.overlay.append(dialog)
-                    dialog.open = True
-                    page.update()
-                
-                row = ft.Container(
-                    content=ft.Row([
-                        ft.Icon(icone, size=14, color=cor),
-                        ft.Text(data_hora, size=9, color=TEXT_SECONDARY, width=95),
-                        ft.Text(log['usuario'], size=9, weight=ft.FontWeight.W_500, color=ACCENT, width=70),
-                        ft.Text(log['acao'], size=10, color=TEXT_PRIMARY, expand=True),
-                        ft.Text(log['detalhes'] or '', size=9, color=TEXT_SECONDARY, width=130),
-                    ], spacing=6),
-                    padding=8,
-                    bgcolor=SURFACE,
-                    border_radius=6,
-                    border=ft.border.all(1, theme.get_border()),
-                    on_click=mostrar_detalhe_log,
-                    ink=True,
-                )
-                lista_logs.controls.append(row)
+                lista_logs.controls.append(criar_linha_log(log))
         
+        btn_mais_logs.visible = not estado_logs['fim']
         page.update()
     
     def alterar_cargo(user_id, novo_cargo):
@@ -299,6 +343,7 @@ def criar_tela_usuarios(page: ft.Page, theme):
     
     # Carregar dados iniciais
     carregar_usuarios()
+    filtro_usuario.options += [ft.dropdown.Option(u['usuario']) for u in listar_usuarios()]
     carregar_logs()
     
     # Tabs
@@ -332,6 +377,14 @@ def criar_tela_usuarios(page: ft.Page, theme):
                 icon=ft.Icons.HISTORY,
                 content=ft.Container(
                     content=ft.Column([
+                        ft.Row([
+                            filtro_usuario,
+                            filtro_tabela,
+                            filtro_inicio,
+                            filtro_fim,
+                            ft.IconButton(ft.Icons.FILTER_ALT, icon_color=ACCENT, tooltip="Filtrar",
+                                          on_click=lambda e: carregar_logs()),
+                        ], spacing=8),
                         ft.Container(
                             content=ft.Row([
                                 ft.Text("", width=14),
@@ -343,6 +396,7 @@ def criar_tela_usuarios(page: ft.Page, theme):
                             padding=ft.padding.only(left=8),
                         ),
                         lista_logs,
+                        btn_mais_logs,
                     ]),
                     padding=10,
                 ),
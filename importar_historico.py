@@ -23,6 +23,7 @@ from datetime import datetime
 sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'honorarios'))
 
 from database import get_connection, listar_clientes
+from utils.dinheiro import Dinheiro
 
 # Mapeamento de colunas para meses (C=3 até O=15)
 # C=Jan(1), D=Fev(2), E=Mar(3), F=Abr(4), G=Mai(5), H=Jun(6), 
@@ -60,15 +61,15 @@ MESES_ABREV = {
 
 
 def parse_valor(valor_str):
-    """Converte string de valor para float"""
+    """Converte string de valor para Dinheiro (centavos)"""
     if not valor_str:
         return None
     try:
         if isinstance(valor_str, (int, float)):
-            return float(valor_str)
+            return Dinheiro.de_reais(valor_str)
         # Remove R$, espaços e converte vírgula para ponto
         valor = str(valor_str).replace('R$', '').replace(' ', '').replace('.', '').replace(',', '.')
-        return float(valor)
+        return Dinheiro.de_reais(valor)
     except:
         return None
 
@@ -7,6 +7,7 @@ import sys
 import re
 sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'honorarios'))
 from database import get_connection
+from utils.dinheiro import Dinheiro
 
 COLUNAS_MESES = {
     3: 1, 4: 2, 5: 3, 6: 4, 7: 5, 8: 6,
@@ -46,10 +47,10 @@ def parse_valor(valor_cell):
     if not valor_cell:
         return None
     if isinstance(valor_cell, (int, float)):
-        return float(valor_cell)
+        return Dinheiro.de_reais(valor_cell)
     valor_str = str(valor_cell).replace('R$', '').replace(' ', '').replace('.', '').replace(',', '.')
     try:
-        return float(valor_str)
+        return Dinheiro.de_reais(valor_str)
     except:
         return None
 
@@ -0,0 +1,79 @@
+import unittest
+import sys
+import os
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "honorarios"))
+
+from utils.busca import BuscaAdiada, termos_busca, casa_termos, refina
+
+
+class TestTermos(unittest.TestCase):
+    def test_sem_acentos_por_prefixo(self):
+        palavras = termos_busca("José Antônio Padaria 12.345.678/0001-90 12345678000190")
+        self.assertEqual(termos_busca("  JOSÉ ant "), ["jose", "ant"])
+        self.assertTrue(casa_termos(palavras, termos_busca("jose pad")))
+        self.assertTrue(casa_termos(palavras, termos_busca("1234567")))
+        self.assertFalse(casa_termos(palavras, termos_busca("jose maria")))
+        self.assertFalse(casa_termos(palavras, termos_busca("adaria")))
+
+    def test_refina(self):
+        self.assertTrue(refina("jo", "jos"))
+        self.assertTrue(refina("jose", "jose pad"))
+        self.assertTrue(refina("", "a"))
+        self.assertFalse(refina("jos", "jo"))
+        self.assertFalse(refina("jose", "maria"))
+
+
+class TestBuscaAdiada(unittest.TestCase):
+    def setUp(self):
+        self.buscas = []
+        self.exibidas = []
+        self.fim = threading.Event()
+
+    def mostrar(self, texto, resultado):
+        self.exibidas.append((texto, resultado))
+        self.fim.set()
+
+    def test_digitacao_rapida_faz_uma_busca(self):
+        def buscar(texto, cancelada):
+            self.buscas.append(texto)
+            return texto.upper()
+
+        busca = BuscaAdiada(buscar, self.mostrar, atraso=0.05)
+        for parcial in ("j", "jo", "jos", "jose"):
+            busca.digitar(parcial)
+            time.sleep(0.005)
+        self.assertTrue(self.fim.wait(2))
+        time.sleep(0.1)
+        self.assertEqual(self.buscas, ["jose"])
+        self.assertEqual(self.exibidas, [("jose", "JOSE")])
+
+    def test_busca_superada_e_descartada(self):
+        liberar = threading.Event()
+        encerradas = []
+
+        def buscar(texto, cancelada):
+            self.buscas.append(texto)
+            if texto == "lenta":
+                liberar.wait(2)
+                self.assertTrue(cancelada())
+            return texto
+
+        busca = BuscaAdiada(buscar, self.mostrar, atraso=0.01, ao_encerrar=lambda: encerradas.append(1))
+        busca.digitar("lenta")
+        while not self.buscas:
+            time.sleep(0.005)
+        busca.digitar("nova")
+        liberar.set()
+        self.assertTrue(self.fim.wait(2))
+        time.sleep(0.05)
+        self.assertEqual(self.buscas, ["lenta", "nova"])
+        self.assertEqual(self.exibidas, [("nova", "nova")])
+        self.assertEqual(encerradas, [1])  # a thread termina sem busca pendente
+
+
+if __name__ == '__main__':
+    unittest.main()
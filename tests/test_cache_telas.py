@@ -0,0 +1,114 @@
+import unittest
+import sys
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "honorarios"))
+
+import database
+from utils.cache_telas import CacheTelas, CHAVE_TELA
+
+
+class Controle:
+    """Só o que o cache usa de um controle do Flet"""
+
+    def __init__(self, filhos=0):
+        self.filhos = [Controle() for _ in range(filhos)]
+
+    def _get_children(self):
+        return self.filhos
+
+
+def alteracao(tabela, seq=1):
+    return {'seq': seq, 'tabela': tabela, 'registro_id': 1, 'operacao': 'U'}
+
+
+class TestCacheTelas(unittest.TestCase):
+    def setUp(self):
+        self.cache = CacheTelas(limite_controles=100)
+        self.criadas = []
+        self.exibida = [None]
+        self.recebidas = []
+
+    def tearDown(self):
+        database.remover_observador_alteracoes("telas")
+        database.remover_observador_alteracoes(CHAVE_TELA)
+
+    def criar(self, nome, filhos=0, observador=False):
+        def funcao():
+            self.criadas.append(nome)
+            if observador:
+                database.adicionar_observador_alteracoes(self.recebidas.append, chave=CHAVE_TELA)
+            return Controle(filhos)
+        return funcao
+
+    def mostrar(self, chave, filhos=0, observador=False, tabelas=("honorarios",)):
+        return self.cache.mostrar(chave, self.criar(chave, filhos, observador),
+                                  lambda c: self.exibida.__setitem__(0, c), tabelas)
+
+    def avisar(self, alteracoes):
+        database.observador_alteracoes("telas")(alteracoes)
+
+    def test_voltar_sem_mudanca_reaproveita(self):
+        inicio = self.mostrar("inicio")
+        self.mostrar("agenda")
+        self.assertIs(self.mostrar("inicio"), inicio)
+        self.assertIs(self.exibida[0], inicio)
+        self.assertEqual(self.criadas, ["inicio", "agenda"])
+
+    def test_tabela_da_tela_mudou_recria(self):
+        inicio = self.mostrar("inicio")
+        self.mostrar("agenda")
+        self.avisar([alteracao("certificados")])
+        self.assertIs(self.mostrar("inicio"), inicio)
+        self.mostrar("agenda")
+        self.avisar([alteracao("honorarios")])
+        self.assertIsNot(self.mostrar("inicio"), inicio)
+        self.assertEqual(self.criadas, ["inicio", "agenda", "inicio"])
+
+    def test_mudanca_com_tela_sem_observador_exibida(self):
+        inicio = self.mostrar("inicio")
+        self.avisar([alteracao("honorarios")])  # o monitor avisa com o Início na tela
+        self.mostrar("agenda")
+        self.assertIsNot(self.mostrar("inicio"), inicio)
+        self.assertEqual(self.criadas, ["inicio", "agenda", "inicio"])
+
+    def test_observador_recebe_pendentes_ao_voltar(self):
+        config = self.mostrar("config", observador=True, tabelas=())
+        self.mostrar("agenda")
+        self.assertIsNone(database.observador_alteracoes(CHAVE_TELA))
+        self.avisar([alteracao("clientes", 1)])
+        self.avisar([alteracao("clientes", 2)])
+        self.assertEqual(self.recebidas, [])
+
+        self.assertIs(self.mostrar("config", tabelas=()), config)
+        self.assertEqual([a['seq'] for a in self.recebidas[0]], [1, 2])
+        self.assertEqual(database.observador_alteracoes(CHAVE_TELA), self.recebidas.append)
+
+        self.mostrar("agenda")
+        self.avisar(None)  # mudou demais: a tela recarrega tudo
+        self.mostrar("config", tabelas=())
+        self.assertIsNone(self.recebidas[-1])
+        self.assertEqual(self.criadas, ["config", "agenda"])
+
+    def test_orcamento_tira_a_usada_ha_mais_tempo(self):
+        self.mostrar("a", filhos=40)
+        self.mostrar("b", filhos=40)
+        self.mostrar("a")
+        self.mostrar("c", filhos=40)
+        self.assertNotIn("b", self.cache)
+        self.assertIn("a", self.cache)
+        self.assertIn("c", self.cache)
+
+    def test_invalidar_e_tela_sem_cache(self):
+        self.mostrar("inicio")
+        self.mostrar("usuarios", tabelas=None)
+        self.mostrar("usuarios", tabelas=None)
+        self.assertNotIn("usuarios", self.cache)
+        self.cache.invalidar()
+        self.mostrar("inicio")
+        self.assertEqual(self.criadas, ["inicio", "usuarios", "usuarios", "inicio"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,820 @@
+import unittest
+import sys
+import os
+import sqlite3
+import tempfile
+import threading
+
+# Adicionar root e a pasta honorarios ao path (os módulos usam "from database import ...")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "honorarios"))
+
+import database
+from utils.dinheiro import Dinheiro
+
+
+class BancoTemporario(unittest.TestCase):
+    """Aponta o database para um arquivo temporário durante o teste"""
+
+    def setUp(self):
+        self._pasta = tempfile.TemporaryDirectory()
+        self._db_original = database.DB_PATH
+        database.fechar_conexoes()
+        database.DB_PATH = os.path.join(self._pasta.name, "teste.db")
+
+    def tearDown(self):
+        database.descarregar_logs()
+        database.fechar_conexoes()
+        database.DB_PATH = self._db_original
+        self._pasta.cleanup()
+
+
+class TestMigracoes(BancoTemporario):
+    def test_banco_novo_fica_na_ultima_versao(self):
+        versao = database.migrar()
+        self.assertEqual(versao, len(database.MIGRACOES))
+
+        conn = database.get_connection()
+        admin = conn.execute("SELECT cargo FROM usuarios WHERE usuario = 'admin'").fetchone()
+        conn.close()
+        self.assertEqual(admin["cargo"], "admin")
+
+    def test_esquema_atual_so_le_o_pragma(self):
+        database.migrar()
+
+        conn = sqlite3.connect(database.DB_PATH)
+        comandos = []
+        conn.set_trace_callback(comandos.append)
+        database.migrar(conn)
+        conn.close()
+
+        self.assertEqual(comandos, ["PRAGMA user_version"])
+
+    def test_conexao_migra_uma_vez_por_banco(self):
+        conn = database.get_connection()
+        self.assertEqual(database.versao_esquema(conn), len(database.MIGRACOES))
+        conn.close()
+        self.assertIn(database.DB_PATH, database._caminhos_migrados)
+
+    def test_banco_antigo_sem_versao_e_atualizado(self):
+        # Esquema de uma versão antiga: sem cargo/nome/status em usuarios
+        conn = sqlite3.connect(database.DB_PATH)
+        conn.execute("""
+            CREATE TABLE usuarios (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                usuario TEXT UNIQUE NOT NULL,
+                senha TEXT NOT NULL,
+                email TEXT,
+                data_criacao TEXT DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        conn.execute("INSERT INTO usuarios (usuario, senha) VALUES ('admin', 'x')")
+        conn.commit()
+        conn.close()
+
+        database.migrar()
+
+        conn = database.get_connection()
+        colunas = database._colunas(conn.cursor(), "usuarios")
+        admin = conn.execute("SELECT senha, cargo FROM usuarios WHERE usuario = 'admin'").fetchone()
+        conn.close()
+        self.assertTrue({"cargo", "nome", "status"} <= colunas)
+        self.assertEqual(admin["senha"], "x")
+        self.assertEqual(admin["cargo"], "admin")
+
+    def test_banco_so_e_criado_na_primeira_conexao(self):
+        # O import já aconteceu no topo; o banco temporário só existe depois da 1ª conexão
+        self.assertFalse(os.path.exists(database.DB_PATH))
+
+
+class TestConexaoCompartilhada(BancoTemporario):
+    def _clientes(self):
+        conn = database.get_connection()
+        total = conn.execute("SELECT COUNT(*) FROM clientes").fetchone()[0]
+        conn.close()
+        return total
+
+    def test_helper_sozinho_grava(self):
+        database.adicionar_cliente("Ana")
+        self.assertEqual(self._clientes(), 1)
+
+    def test_helper_nao_grava_a_transacao_de_quem_chamou(self):
+        with self.assertRaises(RuntimeError):
+            with database.transacao():
+                database.adicionar_cliente("Ana")
+                raise RuntimeError("falha depois do helper")
+        self.assertEqual(self._clientes(), 0)
+
+    def test_helper_nao_grava_escrita_parcial_de_quem_chamou(self):
+        conn = database.get_connection()
+        conn.execute("INSERT INTO clientes (nome) VALUES ('Bia')")
+        database.adicionar_cliente("Ana")
+        conn.close()  # sem commit: as duas escritas são descartadas
+        self.assertEqual(self._clientes(), 0)
+
+
+class TestValoresEmCentavos(BancoTemporario):
+    def test_migracao_converte_reais_para_centavos(self):
+        conn = sqlite3.connect(database.DB_PATH)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        for migracao in database.MIGRACOES[:5]:
+            migracao(cursor)
+        cursor.execute("PRAGMA user_version = 5")
+        cursor.execute("INSERT INTO clientes (nome, valor_honorario) VALUES ('A', 350.1)")
+        cursor.executemany("INSERT INTO honorarios (cliente_id, ano, mes, valor, status) VALUES (1, 2024, ?, ?, 'PAGO')",
+                           [(1, 0.1), (2, 0.2), (3, 1234.56), (4, 5.0)])
+        cursor.execute("DELETE FROM honorarios WHERE mes = 4")  # o id 4 não pode voltar
+        conn.commit()
+        conn.close()
+
+        comandos = []
+        conn = database._abrir_conexao()
+        conn.set_trace_callback(comandos.append)
+        database.migrar(conn)
+        conn.close()
+        # Recria as tabelas em vez de DROP COLUMN (SQLite anterior ao 3.35)
+        self.assertFalse([c for c in comandos if "DROP COLUMN" in c])
+
+        conn = database.get_connection()
+        brutos = conn.execute("SELECT typeof(valor), valor + 0 FROM honorarios ORDER BY mes").fetchall()
+        conn.close()
+        self.assertEqual([tuple(r) for r in brutos], [("integer", 10), ("integer", 20), ("integer", 123456)])
+        self.assertEqual(database.buscar_cliente(1)["valor_honorario"].centavos, 35010)
+        self.assertEqual(database.get_resumo_ano(2024)["valor_recebido"].centavos, 123486)
+        # Índices, triggers e AUTOINCREMENT sobrevivem à recriação
+        self.assertIsNone(database.adicionar_honorario(1, 2024, 1, 1.0))  # idx único cliente/ano/mês
+        self.assertEqual(database.adicionar_honorario(1, 2024, 5, 1.0), 5)
+        self.assertEqual([c['id'] for c in database.buscar_clientes("A")], [1])  # triggers da busca
+
+    def test_leitura_e_totais_voltam_como_dinheiro(self):
+        cliente = database.adicionar_cliente("Cliente")
+        for mes in range(1, 11):
+            database.adicionar_honorario(cliente, 2025, mes, 0.1)
+        honorario = database.listar_honorarios(ano=2025)[0]
+        resumo = database.get_resumo_ano(2025)
+        self.assertIsInstance(honorario["valor"], Dinheiro)
+        self.assertEqual(resumo["valor_total"], Dinheiro("1.00"))
+        self.assertEqual(resumo["valor_pendente"].centavos, 100)
+
+    def test_valor_em_reais_gravado_sem_conversao_e_rejeitado(self):
+        cliente = database.adicionar_cliente("Cliente")
+        conn = database.get_connection()
+        with self.assertRaises(sqlite3.IntegrityError):
+            conn.execute("INSERT INTO honorarios (cliente_id, ano, mes, valor) VALUES (?, 2025, 1, 99.9)", (cliente,))
+        conn.rollback()
+        conn.close()
+
+    def test_float_inteiro_sem_conversao_vira_centavos(self):
+        # Limite conhecido do CHECK: a afinidade INTEGER converte 340.0 antes da checagem.
+        # Por isso toda escrita de valor passa por Dinheiro (as funções do banco convertem reais).
+        cliente = database.adicionar_cliente("Cliente")
+        conn = database.get_connection()
+        conn.execute("INSERT INTO honorarios (cliente_id, ano, mes, valor) VALUES (?, 2025, 1, 340.0)", (cliente,))
+        conn.execute("INSERT INTO honorarios (cliente_id, ano, mes, valor) VALUES (?, 2025, 2, ?)",
+                     (cliente, Dinheiro(340.0)))
+        conn.commit()
+        conn.close()
+        database.adicionar_honorario(cliente, 2025, 3, 340.0)
+        valores = [h['valor'].centavos for h in sorted(database.listar_honorarios(ano=2025), key=lambda h: h['mes'])]
+        self.assertEqual(valores, [340, 34000, 34000])
+
+
+class TestBuscaClientes(BancoTemporario):
+    def setUp(self):
+        super().setUp()
+        self.jose = database.adicionar_cliente("José Antônio Padaria", cnpj="12.345.678/0001-90",
+                                               email="contato@padaria.com", codigo_interno="42")
+        self.maria = database.adicionar_cliente("Maria Conceição", cpf="987.654.321-00")
+
+    def nomes(self, texto, **kwargs):
+        return [c["nome"] for c in database.buscar_clientes(texto, **kwargs)]
+
+    def test_ignora_acentos_e_maiusculas_por_prefixo(self):
+        self.assertEqual(self.nomes("jose"), ["José Antônio Padaria"])
+        self.assertEqual(self.nomes("CONCEI"), ["Maria Conceição"])
+        self.assertEqual(self.nomes("pad ant"), ["José Antônio Padaria"])
+        self.assertEqual(self.nomes("jose maria"), [])
+
+    def test_codigo_documento_e_email(self):
+        self.assertEqual(self.nomes("42"), ["José Antônio Padaria"])
+        self.assertEqual(self.nomes("12345678000190"), ["José Antônio Padaria"])
+        self.assertEqual(self.nomes("12.345.678/0001-90"), ["José Antônio Padaria"])
+        self.assertEqual(self.nomes("98765"), ["Maria Conceição"])
+        self.assertEqual(self.nomes("padaria.com"), ["José Antônio Padaria"])
+
+    def test_texto_vazio_lista_por_nome_com_limite(self):
+        self.assertEqual(self.nomes(""), ["José Antônio Padaria", "Maria Conceição"])
+        self.assertEqual(self.nomes("  ", limite=1), ["José Antônio Padaria"])
+
+    def test_triggers_mantem_indice_sincronizado(self):
+        database.atualizar_cliente(self.jose, "Joana Ltda", cnpj="11.222.333/0001-44")
+        self.assertEqual(self.nomes("jose"), [])
+        self.assertEqual(self.nomes("joana 11222333"), ["Joana Ltda"])
+
+        conn = database.get_connection()
+        conn.execute("UPDATE clientes SET ativo = 0 WHERE id = ?", (self.maria,))
+        conn.commit()
+        conn.close()
+        self.assertEqual(self.nomes("maria"), [])
+        self.assertEqual(self.nomes("maria", ativo=None), ["Maria Conceição"])
+
+        conn = database.get_connection()
+        conn.execute("DELETE FROM clientes WHERE id = ?", (self.maria,))
+        conn.commit()
+        total = conn.execute("SELECT COUNT(*) FROM clientes_busca").fetchone()[0]
+        conn.close()
+        self.assertEqual(total, 1)
+
+
+class TestGeracaoHonorarios(BancoTemporario):
+    def setUp(self):
+        super().setUp()
+        self.com_valor_ano = database.adicionar_cliente("Com valor do ano", valor_honorario=100.0)
+        database.set_valor_honorario_ano(self.com_valor_ano, 2025, 250.0)
+        self.so_legado = database.adicionar_cliente("Só valor legado", valor_honorario=180.0)
+        self.sem_valor = database.adicionar_cliente("Sem valor")
+        self.inativo = database.adicionar_cliente("Inativo", valor_honorario=90.0)
+        conn = database.get_connection()
+        conn.execute("UPDATE clientes SET ativo = 0 WHERE id = ?", (self.inativo,))
+        conn.commit()
+        conn.close()
+
+    def honorarios(self):
+        conn = database.get_connection()
+        linhas = conn.execute("SELECT cliente_id, ano, mes, valor FROM honorarios ORDER BY cliente_id, ano, mes").fetchall()
+        conn.close()
+        return [tuple(l) for l in linhas]
+
+    def test_periodo_usa_valor_do_ano_ou_legado(self):
+        criados = database.gerar_honorarios_periodo(2025, 11, 2026, 2)
+        self.assertEqual(criados, 8)
+        hon = self.honorarios()
+        self.assertIn((self.com_valor_ano, 2025, 12, 250.0), hon)
+        self.assertIn((self.com_valor_ano, 2026, 1, 100.0), hon)  # sem valor para 2026: legado
+        self.assertIn((self.so_legado, 2026, 2, 180.0), hon)
+        self.assertFalse([h for h in hon if h[0] in (self.sem_valor, self.inativo)])
+
+    def test_periodo_nao_duplica(self):
+        database.adicionar_honorario(self.so_legado, 2025, 3, 999.0)
+        criados = database.gerar_honorarios_periodo(2025, 1, 2025, 12)
+        self.assertEqual(criados, 23)
+        self.assertEqual(database.gerar_honorarios_periodo(2025, 1, 2025, 12), 0)
+        self.assertIn((self.so_legado, 2025, 3, 999.0), self.honorarios())
+
+    def test_adicionar_honorario_repetido_retorna_none(self):
+        self.assertIsNotNone(database.adicionar_honorario(self.sem_valor, 2025, 5, 10.0))
+        self.assertIsNone(database.adicionar_honorario(self.sem_valor, 2025, 5, 20.0))
+
+    def test_mes_atual_em_uma_instrucao(self):
+        comandos = []
+        database._conexao_da_thread().set_trace_callback(comandos.append)
+        criados = database.gerar_honorarios_mes_atual()
+        database._conexao_da_thread().set_trace_callback(None)
+        self.assertEqual(criados, 2)
+        # Triggers repetem o comando de origem no trace: conta os distintos
+        self.assertEqual(len({c for c in comandos if "INTO honorarios (" in c}), 1)
+
+    def versao_do_esquema(self):
+        conn = database.get_connection()
+        versao = conn.execute("PRAGMA schema_version").fetchone()[0]
+        conn.close()
+        return versao
+
+    def test_lote_grava_uma_alteracao_e_refaz_o_resumo(self):
+        database.migrar()
+        seq = database.ultima_alteracao()
+        esquema = self.versao_do_esquema()
+        criados = database.gerar_honorarios_periodo(2025, 1, 2025, 12)
+        self.assertEqual(criados, 24)
+
+        conn = database.get_connection()
+        novas = conn.execute("SELECT tabela, registro_id, operacao FROM alteracoes WHERE seq > ?", (seq,)).fetchall()
+        conn.close()
+        self.assertEqual([tuple(r) for r in novas], [("honorarios", 0, "*")])
+        self.assertIsNone(database.alteracoes_desde(seq))  # lote: os observadores recarregam tudo
+        self.assertEqual(self.versao_do_esquema(), esquema)  # gatilhos mantidos: nada de DDL no lote
+        self.assertEqual(database.get_resumo_ano(2025)['total'], 24)
+        self.assertEqual(database.get_resumo_ano(2025)['valor_total'], 12 * 250 + 12 * 180)
+
+        # Depois do lote os gatilhos por linha voltam a valer
+        database.adicionar_honorario(self.sem_valor, 2025, 1, 10.0)
+        self.assertEqual(database.get_resumo_ano(2025)['total'], 25)
+        self.assertEqual(len(database.alteracoes_desde(database.ultima_alteracao() - 1)), 1)
+
+    def test_lote_com_erro_desliga_a_marca(self):
+        with self.assertRaises(KeyboardInterrupt):
+            with database.transacao(imediata=True) as conn, database.lote_honorarios(conn):
+                conn.execute("INSERT INTO honorarios (cliente_id, ano, mes, valor) VALUES (?, 2025, 1, 1)",
+                             (self.sem_valor,))
+                raise KeyboardInterrupt
+        self.assertEqual(self.honorarios(), [])
+        conn = database.get_connection()
+        self.assertEqual(conn.execute("SELECT ativo FROM honorarios_lote").fetchall()[0][0], 0)
+        conn.close()
+        database.adicionar_honorario(self.sem_valor, 2025, 1, 10.0)
+        self.assertEqual(database.get_resumo_ano(2025)['total'], 1)
+
+
+class TestResumoHonorarios(BancoTemporario):
+    def setUp(self):
+        super().setUp()
+        self.a = database.adicionar_cliente("A")
+        self.b = database.adicionar_cliente("B")
+        database.criar_honorarios_ano_cliente(self.a, 2024, 100.0)
+        database.criar_honorarios_ano_cliente(self.b, 2024, 250.5)
+
+    def assertResumoConfere(self):
+        conn = database.get_connection()
+        resumo = conn.execute("""
+            SELECT ano, mes, status, forma_pagamento, qtd, total FROM honorarios_resumo
+            ORDER BY ano, mes, status, forma_pagamento
+        """).fetchall()
+        esperado = conn.execute("""
+            SELECT ano, mes, COALESCE(status, ''), COALESCE(forma_pagamento, ''), COUNT(*), SUM(valor) AS "total [DINHEIRO]"
+            FROM honorarios GROUP BY 1, 2, 3, 4 ORDER BY 1, 2, 3, 4
+        """).fetchall()
+        conn.close()
+        self.assertEqual([tuple(r) for r in resumo], [tuple(r) for r in esperado])
+
+    def test_triggers_acompanham_insercao_pagamento_e_exclusao(self):
+        self.assertResumoConfere()
+        honorarios = database.listar_honorarios(ano=2024, cliente_id=self.a)
+        database.marcar_como_pago(honorarios[0]['id'], forma_pagamento="PIX")
+        database.marcar_como_pago(honorarios[1]['id'])
+        conn = database.get_connection()
+        conn.execute("UPDATE honorarios SET valor = 12345, ano = 2023 WHERE id = ?", (honorarios[2]['id'],))
+        conn.execute("DELETE FROM honorarios WHERE cliente_id = ? AND mes > 6", (self.b,))
+        conn.commit()
+        conn.close()
+        self.assertResumoConfere()
+
+    def test_resumos_do_ano_mes_e_formas(self):
+        honorarios = database.listar_honorarios(ano=2024, cliente_id=self.b)
+        database.marcar_como_pago(honorarios[0]['id'], forma_pagamento="PIX")
+
+        resumo = database.get_resumo_ano(2024)
+        self.assertEqual((resumo['total'], resumo['pagos'], resumo['pendentes']), (24, 1, 23))
+        self.assertEqual(resumo['valor_total'].centavos, 12 * 10000 + 12 * 25050)
+        self.assertEqual(resumo['valor_recebido'], 250.5)
+        self.assertEqual(database.get_resumo_ano(1999)['total'], 0)
+
+        anos = database.get_resumo_anos()
+        self.assertEqual([(r['ano'], r['total']) for r in anos], [(2024, 24)])
+        meses = database.get_resumo_meses(2024)
+        self.assertEqual([r['mes'] for r in meses], list(range(1, 13)))
+        self.assertEqual(meses[honorarios[0]['mes'] - 1]['valor_recebido'], 250.5)
+
+        self.assertEqual(database.get_relatorio_formas_pagamento(2024),
+                         [{'metodo': 'PIX', 'qtd': 1, 'total': 250.5}])
+
+    def test_baixa_em_lote_numa_transacao(self):
+        honorarios = database.listar_honorarios(ano=2024)
+        database.marcar_como_pago(honorarios[0]['id'], forma_pagamento="Boleto", data_pagamento="2024-01-05")
+        ids = [h['id'] for h in honorarios[:5]]
+
+        conn = database._conexao_da_thread()
+        comandos = []
+        conn.set_trace_callback(comandos.append)
+        try:
+            baixados = database.marcar_como_pago_lote(ids + ids[:2], forma_pagamento="PIX", data_pagamento="2024-02-10")
+        finally:
+            conn.set_trace_callback(None)
+
+        self.assertEqual(sorted(h['id'] for h in baixados), sorted(ids[1:]))
+        self.assertTrue(all(h['status'] == 'PAGO' and h['forma_pagamento'] == 'PIX' for h in baixados))
+        self.assertEqual(sum(1 for c in comandos if c.startswith(("BEGIN", "COMMIT"))), 2)
+        # O que já estava pago mantém a forma e a data da baixa original
+        pago_antes = database.buscar_honorario(ids[0])
+        self.assertEqual((pago_antes['forma_pagamento'], pago_antes['data_pagamento']), ("Boleto", "2024-01-05"))
+        self.assertEqual(database.get_resumo_ano(2024)['pagos'], 5)
+        self.assertResumoConfere()
+
+
+class TestPaginacaoHonorarios(BancoTemporario):
+    def setUp(self):
+        super().setUp()
+        for nome in ("Carla", "Ana", "Bruno Silva", "Beatriz"):
+            database.criar_honorarios_ano_cliente(database.adicionar_cliente(nome), 2024, 100.0)
+        self.bruno = database.buscar_clientes("bruno")[0]['id']
+        honorarios = database.listar_honorarios(ano=2024, cliente_id=self.bruno)
+        for h in honorarios[:3]:
+            database.marcar_como_pago(h['id'])
+
+    def paginas(self, tamanho, **filtros):
+        vistos, apos = [], None
+        while True:
+            pagina = database.listar_honorarios_pagina(2024, apos=apos, limite=tamanho, **filtros)
+            if not pagina:
+                return vistos
+            self.assertLessEqual(len(pagina), tamanho)
+            vistos += pagina
+            apos = (pagina[-1]['mes'], pagina[-1]['cliente_nome'], pagina[-1]['id'])
+
+    def test_paginas_por_chave_cobrem_o_ano_em_ordem(self):
+        todos = self.paginas(7)
+        self.assertEqual(len(todos), 48)
+        self.assertEqual(len({h['id'] for h in todos}), 48)
+        self.assertEqual([(h['mes'], h['cliente_nome']) for h in todos],
+                         sorted(((h['mes'], h['cliente_nome']) for h in todos), key=lambda x: (-x[0], x[1])))
+        self.assertEqual(todos, database.listar_honorarios_pagina(2024, limite=None))
+        self.assertEqual(database.contar_honorarios_ano(2024), 48)
+
+    def test_filtros_no_banco(self):
+        filtros = dict(mes=12, busca="B")
+        self.assertEqual([h['cliente_nome'] for h in self.paginas(1, **filtros)], ["Beatriz", "Bruno Silva"])
+        self.assertEqual(database.contar_honorarios_ano(2024, **filtros), 2)
+        self.assertEqual(database.contar_honorarios_ano(2024, status="PAGO"), 3)
+        self.assertEqual({h['cliente_nome'] for h in self.paginas(2, status="PAGO", busca="silva")}, {"Bruno Silva"})
+        self.assertEqual(database.contar_honorarios_ano(2023), 0)
+
+    def test_buscar_varios_por_id(self):
+        ids = [h['id'] for h in database.listar_honorarios(ano=2024, cliente_id=self.bruno)]
+        honorarios = database.buscar_honorarios(ids + ids[:2] + [999999])
+        self.assertEqual(sorted(h['id'] for h in honorarios), sorted(ids))
+        self.assertEqual(honorarios[0], database.buscar_honorario(honorarios[0]['id']))
+        self.assertEqual(database.buscar_honorarios([]), [])
+
+    def test_busca_sem_fts_usa_like(self):
+        conn = database.get_connection()
+        conn.execute("DROP TABLE clientes_busca")
+        conn.commit()
+        conn.close()
+        self.assertEqual(database.contar_honorarios_ano.sem_cache(2024, busca="silva"), 12)
+        self.assertEqual(len(database.listar_honorarios_pagina.sem_cache(2024, busca="bru sil", limite=5)), 5)
+
+
+class TestVencimentos(BancoTemporario):
+    def setUp(self):
+        super().setUp()
+        self.ana = database.adicionar_cliente("Ana")
+        database.criar_honorarios_ano_cliente(self.ana, 2024, 100.0)
+        self.bruno = database.adicionar_cliente("Bruno")
+        database.adicionar_honorario(self.bruno, 2024, 3, 50.0, data_vencimento="2024-04-05")
+
+    def test_vencimento_padrao_e_proprio(self):
+        abril = database.get_vencimentos_mes(2024, 4)
+        self.assertEqual(sorted(abril), [5, 10])
+        self.assertEqual((abril[5]['pendentes'], abril[5]['valor_pendente']), (1, 50.0))
+        # Dezembro vence em janeiro do ano seguinte
+        self.assertEqual(database.get_vencimentos_mes(2025, 1)[10]['pendentes'], 1)
+        self.assertEqual([h['cliente_nome'] for h in database.listar_honorarios_vencimento("2024-04-05")], ["Bruno"])
+
+        marco = database.listar_honorarios_vencimento("2024-04-10")[0]
+        database.marcar_como_pago(marco['id'])
+        self.assertEqual(database.get_vencimentos_mes(2024, 4)[10], {'pendentes': 0, 'pagos': 1, 'valor_pendente': 0})
+
+        database.atualizar_honorario(marco['id'], data_vencimento="2024-04-20")
+        self.assertEqual(sorted(database.get_vencimentos_mes(2024, 4)), [5, 20])
+
+    def test_mes_usa_o_indice(self):
+        conn = database.get_connection()
+        v = database.VENCIMENTO_HONORARIO
+        plano = " ".join(row['detail'] for row in conn.execute(
+            f"EXPLAIN QUERY PLAN SELECT COUNT(*) FROM honorarios WHERE {v} >= ? AND {v} < ? GROUP BY date({v})",
+            ("2024-04-01", "2024-05-01")))
+        conn.close()
+        self.assertIn("idx_honorarios_vencimento", plano)
+
+
+class TestRegistros(BancoTemporario):
+    def test_leituras_devolvem_registros(self):
+        cliente_id = database.adicionar_cliente("Ana", email="ana@x.com")
+        database.criar_honorarios_ano_cliente(cliente_id, 2024, 100.0)
+        database.adicionar_certificado(cliente_id, None, "123", "e-CPF A1", "PF", "Arquivo",
+                                       1, "2024-01-01", "2025-01-01", 150.0)
+
+        honorario = database.listar_honorarios(ano=2024)[0]
+        self.assertIsInstance(honorario, database.Honorario)
+        self.assertEqual((honorario.cliente_nome, honorario['valor']), ("Ana", 100))
+        self.assertIsInstance(database.buscar_cliente(cliente_id), database.Cliente)
+
+        relatorio = database.get_relatorio_cliente(cliente_id)
+        self.assertEqual(relatorio['cliente'].get('email'), "ana@x.com")
+        self.assertEqual(len(relatorio['honorarios']), 12)
+        self.assertIsInstance(relatorio['honorarios'][0], database.Honorario)
+
+        cert = database.listar_certificados()[0]
+        self.assertIsInstance(cert, database.Certificado)
+        self.assertEqual((cert['cliente_nome'], cert.get('pagamento_status', 'PENDENTE')), ("Ana", 'PENDENTE'))
+        self.assertEqual(database.buscar_certificado(cert['id']), cert)
+
+
+class TestSequenciaRecibos(BancoTemporario):
+    def setUp(self):
+        super().setUp()
+        self.cliente = database.adicionar_cliente("Cliente")
+
+    def test_reserva_bloco_contiguo(self):
+        self.assertEqual(list(database.reservar_numeros_recibo(3)), [1, 2, 3])
+        self.assertEqual(list(database.reservar_numeros_recibo(2)), [4, 5])
+        self.assertEqual(database.gerar_proximo_numero_recibo(), 6)
+
+    def test_lote_insere_na_ordem(self):
+        recibos = [{'cliente_id': self.cliente, 'valor': v, 'descricao': f"R{v}"} for v in (10.0, 20.0, 30.0)]
+        criados = database.criar_recibos_lote(recibos)
+        self.assertEqual([n for _, n in criados], [1, 2, 3])
+        for (recibo_id, numero), r in zip(criados, recibos):
+            self.assertEqual(database.buscar_recibo(recibo_id)['valor'], r['valor'])
+        self.assertEqual(database.criar_recibo(self.cliente, 5.0, "avulso")[1], 4)
+
+    def test_respeita_numeros_gravados_fora_da_sequencia(self):
+        conn = database.get_connection()
+        conn.execute("INSERT INTO recibos (numero, cliente_id, valor) VALUES (1258, ?, 1)", (self.cliente,))
+        conn.commit()
+        conn.close()
+        self.assertEqual(list(database.reservar_numeros_recibo(1)), [1259])
+
+    def test_estacoes_concorrentes_nao_repetem_numero(self):
+        database.migrar()
+        reservados = []
+        erros = []
+
+        def estacao():
+            try:
+                for _ in range(20):
+                    reservados.extend(database.reservar_numeros_recibo(5))
+            except Exception as ex:
+                erros.append(ex)
+            finally:
+                database.fechar_conexao_thread()
+
+        threads = [threading.Thread(target=estacao) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(erros, [])
+        self.assertEqual(sorted(reservados), list(range(1, 401)))
+
+
+class TestCacheConsultas(BancoTemporario):
+    def setUp(self):
+        super().setUp()
+        self.cliente = database.adicionar_cliente("Cliente A")
+        database.criar_honorarios_ano_cliente(self.cliente, 2025, 100.0)
+
+    def comandos(self, funcao):
+        comandos = []
+        database._conexao_da_thread().set_trace_callback(comandos.append)
+        try:
+            resultado = funcao()
+        finally:
+            database._conexao_da_thread().set_trace_callback(None)
+        return resultado, comandos
+
+    def test_leitura_repetida_nao_acessa_o_banco(self):
+        primeira, comandos = self.comandos(lambda: database.listar_honorarios(ano=2025))
+        self.assertTrue(comandos)
+        segunda, comandos = self.comandos(lambda: database.listar_honorarios(ano=2025))
+        self.assertEqual(comandos, [])
+        self.assertEqual([tuple(h) for h in primeira], [tuple(h) for h in segunda])
+
+        # A lista devolvida é uma cópia
+        segunda.clear()
+        self.assertEqual(len(database.listar_honorarios(ano=2025)), 12)
+
+    def test_escrita_invalida_so_as_tabelas_alteradas(self):
+        database.listar_clientes()
+        database.get_resumo_ano(2025)
+        database.adicionar_cliente("Cliente B")
+
+        clientes, comandos = self.comandos(database.listar_clientes)
+        self.assertEqual(len(clientes), 2)
+        self.assertTrue(comandos)
+        _, comandos = self.comandos(lambda: database.get_resumo_ano(2025))
+        self.assertEqual(comandos, [])
+
+        honorario = database.listar_honorarios(ano=2025)[0]
+        database.marcar_como_pago(honorario['id'])
+        self.assertEqual(database.get_resumo_ano(2025)['pagos'], 1)
+
+    def renomear_com_sql_direto(self, nome):
+        conn = database.get_connection()
+        conn.execute("UPDATE clientes SET nome = ? WHERE id = ?", (nome, self.cliente))
+        conn.commit()
+        conn.close()
+
+    def test_sql_direto_aparece_pelo_registro_de_alteracoes(self):
+        database.listar_clientes()
+        self.renomear_com_sql_direto("Renomeado")
+        # Dentro da validade o cache ainda vale; invalidar_cache() vale na hora
+        self.assertEqual(database.listar_clientes()[0]['nome'], "Cliente A")
+        database.invalidar_cache("clientes")
+        self.assertEqual(database.listar_clientes()[0]['nome'], "Renomeado")
+
+        # Vencida a validade, a leitura confere o registro (sem monitor rodando)
+        self.renomear_com_sql_direto("Outra estação")
+        database._cache_conferido[database.DB_PATH] = (database._cache_conferido[database.DB_PATH][0], 0.0)
+        database.get_resumo_ano(2025)
+        _, comandos = self.comandos(lambda: database.get_resumo_ano(2025))
+        self.assertEqual(comandos, [])  # honorarios não mudou: só clientes sai do cache
+        self.assertEqual(database.listar_clientes()[0]['nome'], "Outra estação")
+
+    def test_resultado_do_cache_nao_muda_entre_chamadas(self):
+        honorario = database.listar_honorarios(ano=2025)[0]
+        with self.assertRaises(AttributeError):
+            honorario.valor = 0
+        with self.assertRaises(TypeError):
+            honorario['valor'] = 0
+        vencimentos = database.get_vencimentos_mes(2025, 3)
+        vencimentos[10]['pendentes'] = 99
+        vencimentos.clear()
+        self.assertEqual(database.get_vencimentos_mes(2025, 3)[10]['pendentes'], 1)
+
+    def test_limite_de_memoria_descarta_os_menos_usados(self):
+        limite_original = database.CACHE_LIMITE_BYTES
+        try:
+            tamanho = database._tamanho_aproximado(database.listar_honorarios.sem_cache(ano=2025, status="PENDENTE"))
+            database.CACHE_LIMITE_BYTES = tamanho * 2 + 100
+            database.invalidar_cache()
+            database.listar_honorarios(ano=2025, status="PENDENTE")
+            database.listar_honorarios(cliente_id=self.cliente, status="PENDENTE")
+            database.listar_honorarios(ano=2025, status="PENDENTE")  # volta a ser o mais recente
+            database.listar_honorarios(ano=2025, cliente_id=self.cliente, status="PENDENTE")
+
+            chaves = [chave[2:] for chave in database._cache_consultas]
+            self.assertEqual(chaves, [((), (("ano", 2025), ("status", "PENDENTE"))),
+                                      ((), (("ano", 2025), ("cliente_id", self.cliente), ("status", "PENDENTE")))])
+            self.assertLessEqual(database._cache_bytes[0], database.CACHE_LIMITE_BYTES)
+        finally:
+            database.CACHE_LIMITE_BYTES = limite_original
+
+
+class TestRegistroAlteracoes(BancoTemporario):
+    def setUp(self):
+        super().setUp()
+        self.cliente = database.adicionar_cliente("Cliente A")
+        self.inicio = database.ultima_alteracao()
+
+    def test_triggers_registram_insercao_alteracao_e_exclusao(self):
+        database.criar_honorarios_ano_cliente(self.cliente, 2025, 100.0)
+        honorario = database.listar_honorarios(ano=2025)[0]
+        database.marcar_como_pago(honorario['id'])
+        conn = database.get_connection()
+        conn.execute("DELETE FROM honorarios WHERE id = ?", (honorario['id'],))
+        conn.commit()
+        conn.close()
+
+        alteracoes = database.alteracoes_desde(self.inicio, tabelas=("honorarios",))
+        self.assertEqual(len(alteracoes), 14)
+        self.assertEqual({a['operacao'] for a in alteracoes[:12]}, {"I"})
+        self.assertEqual([(a['registro_id'], a['operacao']) for a in alteracoes[12:]],
+                         [(honorario['id'], "U"), (honorario['id'], "D")])
+        self.assertEqual([a['seq'] for a in alteracoes], sorted(a['seq'] for a in alteracoes))
+        self.assertEqual(database.alteracoes_desde(alteracoes[-1]['seq']), [])
+
+    def test_muitas_alteracoes_ou_seq_podado_pedem_recarga(self):
+        database.criar_honorarios_ano_cliente(self.cliente, 2025, 100.0)
+        self.assertIsNone(database.alteracoes_desde(self.inicio, limite=5))
+        self.assertEqual(len(database.alteracoes_desde(self.inicio, tabelas=("honorarios",), limite=12)), 12)
+
+        self.assertEqual(database.podar_alteracoes(manter=3), database.ultima_alteracao() - 3)
+        self.assertIsNone(database.alteracoes_desde(self.inicio))
+        self.assertEqual(len(database.alteracoes_desde(database.ultima_alteracao() - 3)), 3)
+
+    def test_verificar_ve_alteracoes_de_outra_estacao(self):
+        recebidas = []
+        database.adicionar_observador_alteracoes(lambda a: recebidas.append("antigo"), chave="tela")
+        database.adicionar_observador_alteracoes(recebidas.append, chave="tela")
+        self.addCleanup(database.remover_observador_alteracoes, "tela")
+        self.assertEqual(database.verificar_alteracoes(), [])  # marca o ponto de partida
+        self.assertEqual(database.listar_clientes()[0]['nome'], "Cliente A")
+
+        outra_estacao = sqlite3.connect(database.DB_PATH)
+        outra_estacao.execute("UPDATE clientes SET nome = 'Renomeado' WHERE id = ?", (self.cliente,))
+        outra_estacao.commit()
+        outra_estacao.close()
+
+        alteracoes = database.verificar_alteracoes()
+        self.assertEqual([(a['tabela'], a['registro_id'], a['operacao']) for a in alteracoes],
+                         [("clientes", self.cliente, "U")])
+        self.assertEqual(recebidas, [alteracoes])
+        self.assertEqual(database.listar_clientes()[0]['nome'], "Renomeado")
+        self.assertEqual(database.verificar_alteracoes(), [])
+        self.assertEqual(len(recebidas), 1)
+
+
+class TestCacheConfiguracoes(BancoTemporario):
+    def test_leituras_nao_acessam_o_banco(self):
+        database.set_configs({'empresa_nome': 'Escritório X', 'empresa_pix': 'pix', 'theme_mode': 'dark'})
+        database.recarregar_configs()
+        self.assertEqual(database.get_config('empresa_nome'), 'Escritório X')
+
+        comandos = []
+        database._conexao_da_thread().set_trace_callback(comandos.append)
+        for _ in range(100):
+            database.get_config('empresa_nome')
+            database.get_config('inexistente', 'padrao')
+        empresa = database.get_configs('empresa_')
+        database._conexao_da_thread().set_trace_callback(None)
+
+        self.assertEqual(comandos, [])
+        self.assertEqual(empresa, {'empresa_nome': 'Escritório X', 'empresa_pix': 'pix'})
+        self.assertEqual(database.get_config('inexistente', 'padrao'), 'padrao')
+
+    def test_set_config_grava_e_notifica(self):
+        recebidos = []
+        observador = lambda chave, valor: recebidos.append((chave, valor))
+        database.adicionar_observador_config(observador)
+        try:
+            database.set_config('theme_mode', 'light')
+        finally:
+            database.remover_observador_config(observador)
+
+        self.assertEqual(recebidos, [('theme_mode', 'light')])
+        self.assertEqual(database.get_config('theme_mode'), 'light')
+        conn = database.get_connection()
+        valor = conn.execute("SELECT valor FROM configuracoes WHERE chave = 'theme_mode'").fetchone()[0]
+        conn.close()
+        self.assertEqual(valor, 'light')
+
+    def test_recarregar_le_alteracoes_de_outra_estacao(self):
+        database.set_config('empresa_nome', 'Antigo')
+        conn = sqlite3.connect(database.DB_PATH)
+        conn.execute("UPDATE configuracoes SET valor = 'Novo' WHERE chave = 'empresa_nome'")
+        conn.commit()
+        conn.close()
+        self.assertEqual(database.get_config('empresa_nome'), 'Antigo')
+        database.recarregar_configs()
+        self.assertEqual(database.get_config('empresa_nome'), 'Novo')
+
+
+class TestLogsAuditoria(BancoTemporario):
+    def contar_logs(self):
+        conn = database.get_connection()
+        total = conn.execute("SELECT COUNT(*) FROM logs_auditoria").fetchone()[0]
+        conn.close()
+        return total
+
+    def test_gravacao_fora_da_thread_da_acao(self):
+        database.migrar()
+        comandos = []
+        database._conexao_da_thread().set_trace_callback(comandos.append)
+        for i in range(50):
+            database.registrar_log("admin", "Teste", tabela="honorarios", registro_id=i)
+        database._conexao_da_thread().set_trace_callback(None)
+
+        self.assertEqual(comandos, [])
+        self.assertTrue(database.descarregar_logs())
+        self.assertEqual(self.contar_logs(), 50)
+
+    def test_listar_logs_ve_os_pendentes(self):
+        database.registrar_log("admin", "Login")
+        logs = database.listar_logs(limite=10)
+        self.assertEqual([l['acao'] for l in logs], ["Login"])
+        self.assertRegex(logs[0]['data_hora'], r"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}$")
+
+    def inserir_logs(self, datas):
+        conn = database.get_connection()
+        conn.executemany(
+            "INSERT INTO logs_auditoria (usuario, acao, tabela, data_hora) VALUES (?, ?, ?, ?)",
+            [("ana" if i % 2 else "bruno", f"Ação {i}", "honorarios" if i % 3 else "clientes", d)
+             for i, d in enumerate(datas)],
+        )
+        conn.commit()
+        conn.close()
+
+    def test_paginacao_por_chave_e_filtros(self):
+        # Vários logs no mesmo segundo: o id desempata a ordem
+        self.inserir_logs([f"2025-03-{1 + i // 4:02d} 10:00:00" for i in range(40)])
+        vistos = []
+        cursor = None
+        while True:
+            pagina = database.listar_logs(limite=7, antes_de=cursor)
+            vistos += [l['id'] for l in pagina]
+            if len(pagina) < 7:
+                break
+            cursor = (pagina[-1]['data_hora'], pagina[-1]['id'])
+        self.assertEqual(vistos, list(range(40, 0, -1)))
+
+        filtrados = database.listar_logs(usuario="ana", tabela="clientes",
+                                         data_inicio="2025-03-02", data_fim="2025-03-05")
+        self.assertTrue(filtrados)
+        for l in filtrados:
+            self.assertEqual((l['usuario'], l['tabela']), ("ana", "clientes"))
+            self.assertTrue("2025-03-02" <= l['data_hora'][:10] <= "2025-03-05")
+
+    def test_arquivamento_move_logs_antigos(self):
+        self.inserir_logs(["2020-01-01 08:00:00", "2020-06-01 08:00:00", "2999-01-01 08:00:00"])
+        self.assertEqual(database.arquivar_logs(meses=12), 2)
+        self.assertEqual(self.contar_logs(), 1)
+        arquivados = database.listar_logs(arquivados=True)
+        self.assertEqual([l['data_hora'] for l in arquivados], ["2020-06-01 08:00:00", "2020-01-01 08:00:00"])
+        self.assertEqual(database.arquivar_logs(meses=12), 0)
+
+        self.assertEqual(database.arquivar_logs_se_necessario(), 0)
+        self.assertIsNotNone(database.get_config('logs_ultimo_arquivamento'))
+
+    def test_modo_sincrono(self):
+        database.LOG_ASSINCRONO = False
+        try:
+            database.registrar_log("admin", "Síncrono")
+            self.assertEqual(self.contar_logs(), 1)
+        finally:
+            database.LOG_ASSINCRONO = True
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+import sys
+import os
+import asyncio
+import tempfile
+import threading
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "honorarios"))
+
+import database
+from database_async import BancoAssincrono, eh_leitura
+
+
+class TestBancoAssincrono(unittest.TestCase):
+    def setUp(self):
+        self._pasta = tempfile.TemporaryDirectory()
+        self._db_original = database.DB_PATH
+        database.fechar_conexoes()
+        database.DB_PATH = os.path.join(self._pasta.name, "teste.db")
+        database.migrar()
+        self.db = BancoAssincrono(leitores=2)
+
+    def tearDown(self):
+        self.db.encerrar()
+        database.descarregar_logs()
+        database.fechar_conexoes()
+        database.DB_PATH = self._db_original
+        self._pasta.cleanup()
+
+    def test_classificacao(self):
+        for nome in ("listar_clientes", "buscar_honorario", "contar_honorarios_ano", "ultima_alteracao", "recibo_existe"):
+            self.assertTrue(eh_leitura(nome), nome)
+        for nome in ("adicionar_cliente", "marcar_como_pago", "marcar_como_pago_lote", "registrar_log"):
+            self.assertFalse(eh_leitura(nome), nome)
+
+    def test_escritas_em_uma_thread_e_leituras_no_pool(self):
+        threads = {}
+
+        def onde(nome):
+            threads.setdefault(nome, set()).add(threading.current_thread().name)
+
+        async def cenario():
+            ids = await asyncio.gather(*(self.db.adicionar_cliente(f"Cliente {i}") for i in range(5)))
+            await asyncio.gather(*(self.db.executar(onde, "escrita") for _ in range(5)))
+            await asyncio.gather(*(self.db.executar(onde, "leitura", escrita=False) for _ in range(5)))
+            return ids, await self.db.listar_clientes()
+
+        ids, clientes = asyncio.run(cenario())
+        self.assertEqual(len(set(ids)), 5)
+        self.assertEqual(sorted(c['id'] for c in clientes), sorted(ids))
+        self.assertEqual(len(threads["escrita"]), 1)
+        self.assertTrue(all(n.startswith("db-escrita") for n in threads["escrita"]))
+        self.assertTrue(all(n.startswith("db-leitura") for n in threads["leitura"]))
+        self.assertNotIn(threading.current_thread().name, threads["leitura"] | threads["escrita"])
+
+    def test_funcoes_so_sincronas(self):
+        with self.assertRaises(AttributeError):
+            self.db.transacao
+        with self.assertRaises(AttributeError):
+            self.db.DB_PATH
+
+
+if __name__ == '__main__':
+    unittest.main()
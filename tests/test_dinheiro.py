@@ -0,0 +1,54 @@
+import unittest
+import sys
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "honorarios"))
+
+from utils.dinheiro import Dinheiro, centavos, formatar_moeda, numero_por_extenso
+
+
+class TestDinheiro(unittest.TestCase):
+    def test_arredonda_para_o_centavo(self):
+        self.assertEqual(Dinheiro(0.285).centavos, 29)
+        self.assertEqual(Dinheiro("1234.5").centavos, 123450)
+        self.assertEqual(Dinheiro(-2.5).centavos, -250)
+        self.assertEqual(centavos(350), 35000)
+
+    def test_valor_ausente(self):
+        # Uma regra só: ausente fica None (de_reais); Dinheiro(None) não vira zero
+        self.assertIsNone(Dinheiro.de_reais(None))
+        self.assertIsNone(centavos(None))
+        with self.assertRaises(TypeError):
+            Dinheiro(None)
+        self.assertEqual(Dinheiro().centavos, 0)
+
+    def test_soma_exata(self):
+        total = sum(Dinheiro(0.1) for _ in range(10))
+        self.assertIsInstance(total, Dinheiro)
+        self.assertEqual(total.centavos, 100)
+        self.assertEqual(Dinheiro(0.3) - 0.1 - 0.2, 0)
+        self.assertEqual((Dinheiro(10.01) * 3).centavos, 3003)
+
+    def test_continua_sendo_numero(self):
+        valor = Dinheiro.de_centavos(123456)
+        self.assertEqual(valor, 1234.56)
+        self.assertGreater(valor, 0)
+        self.assertEqual(f"{valor:,.2f}", "1,234.56")
+        self.assertEqual(str(valor), "1234.56")
+        self.assertEqual(valor / 2, 617.28)
+
+    def test_formatacao(self):
+        self.assertEqual(formatar_moeda(Dinheiro(1234567.8)), "R$ 1.234.567,80")
+        self.assertEqual(Dinheiro(0.05).formatar(), "R$ 0,05")
+
+    def test_por_extenso(self):
+        self.assertEqual(numero_por_extenso(0), "zero reais")
+        self.assertEqual(numero_por_extenso(1), "um real")
+        self.assertEqual(numero_por_extenso(0.29), "vinte e nove centavos")
+        self.assertEqual(numero_por_extenso(1250.01), "um mil e duzentos e cinquenta reais e um centavo")
+        self.assertEqual(Dinheiro(4.29).por_extenso(), "quatro reais e vinte e nove centavos")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+import sys
+import os
+import io
+from contextlib import redirect_stdout
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from test_database import BancoTemporario, database
+import geracao_honorarios
+
+
+class TestGeracaoLote(BancoTemporario):
+    def setUp(self):
+        super().setUp()
+        self.ano = datetime.now().year
+        self.mes = datetime.now().month
+        self.cliente = database.adicionar_cliente("Cliente A")
+        database.set_valor_honorario_ano(self.cliente, self.ano - 1, 200.0)
+        database.set_valor_honorario_ano(self.cliente, self.ano, 250.0)
+        database.set_valor_honorario_ano(self.cliente, self.ano + 1, 300.0)
+
+    def test_ano_passado_completo_e_atual_ate_o_mes(self):
+        resultado = geracao_honorarios.gerar_honorarios_lote()
+        self.assertEqual(resultado, {'criados': 12 + self.mes, 'pulados': 0, 'total': 12 + self.mes})
+
+    def test_pula_existentes(self):
+        database.adicionar_honorario(self.cliente, self.ano - 1, 1, 999.0)
+        resultado = geracao_honorarios.gerar_honorarios_lote(ano_inicio=self.ano - 1, ano_fim=self.ano - 1)
+        self.assertEqual((resultado['criados'], resultado['pulados']), (11, 1))
+
+        repetido = geracao_honorarios.gerar_honorarios_lote(ano_inicio=self.ano - 1, ano_fim=self.ano - 1)
+        self.assertEqual((repetido['criados'], repetido['pulados']), (0, 12))
+
+    def test_dry_run_nao_grava(self):
+        previsao = geracao_honorarios.gerar_honorarios_lote(dry_run=True, limitar_ao_mes_atual=False)
+        self.assertEqual(previsao['criados'], 36)
+        self.assertEqual(database.listar_honorarios(cliente_id=self.cliente), [])
+
+    def _cli(self, *extras):
+        saida = io.StringIO()
+        with redirect_stdout(saida):
+            resultado = geracao_honorarios.main(["--cliente", str(self.cliente), "--ano-inicio", str(self.ano + 1),
+                                                 "--ano-completo", *extras])
+        return resultado, saida.getvalue()
+
+    def test_cli(self):
+        resultado, saida = self._cli("--dry-run")
+        self.assertEqual(resultado['criados'], 12)
+        self.assertIn("GERAÇÃO DE HONORÁRIOS PENDENTES (SIMULAÇÃO)", saida)
+        self.assertIn("Seriam criados: 12", saida)
+
+        resultado, saida = self._cli()
+        self.assertEqual(resultado['criados'], 12)
+        self.assertNotIn("SIMULAÇÃO", saida)
+        self.assertIn("Criados: 12", saida)
+        self.assertIn("Já existiam (pulados): 0", saida)
+
+        resultado, saida = self._cli()
+        self.assertIn("Criados: 0", saida)
+        self.assertIn("Já existiam (pulados): 12", saida)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+import sys
+import os
+import sqlite3
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "honorarios"))
+
+from modelos import Cliente, Honorario, FABRICAS, fabrica_de_registros
+
+
+class TestRegistros(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.execute("CREATE TABLE clientes (id INTEGER PRIMARY KEY, nome TEXT, email TEXT, ativo INTEGER)")
+        self.conn.execute("INSERT INTO clientes VALUES (1, 'Ana', NULL, 1), (2, 'Bruno', 'b@x.com', 0)")
+
+    def tearDown(self):
+        self.conn.close()
+
+    def consultar(self, sql, modelo=Cliente):
+        cursor = self.conn.cursor()
+        cursor.row_factory = FABRICAS[modelo]
+        return cursor.execute(sql).fetchall()
+
+    def test_acesso_como_row_e_dict(self):
+        ana, bruno = self.consultar("SELECT * FROM clientes ORDER BY id")
+        self.assertIsInstance(ana, Cliente)
+        self.assertEqual(ana.nome, "Ana")
+        self.assertEqual(ana["nome"], "Ana")
+        self.assertEqual(ana[0], 1)
+        self.assertEqual(tuple(bruno), (2, "Bruno", "b@x.com", 0))
+        self.assertEqual(dict(bruno), {"id": 2, "nome": "Bruno", "email": "b@x.com", "ativo": 0})
+        self.assertEqual(ana.keys(), ["id", "nome", "email", "ativo"])
+        self.assertIn("email", ana)
+        self.assertIsNone(ana.get("email", "padrão"))
+        self.assertEqual(ana.get("cnpj", "-"), "-")
+        with self.assertRaises(KeyError):
+            ana["cnpj"]
+        self.assertFalse(hasattr(ana, "__dict__"))
+
+    def test_somente_leitura(self):
+        ana, = self.consultar("SELECT * FROM clientes WHERE id = 1")
+        self.assertIs(type(ana), Cliente)
+        with self.assertRaises(AttributeError):
+            ana.nome = "Outra"
+        with self.assertRaises(AttributeError):
+            del ana.nome
+        self.assertEqual(ana.nome, "Ana")
+        copia = dict(ana)
+        copia["nome"] = "Outra"
+        self.assertEqual(ana.nome, "Ana")
+
+    def test_so_as_colunas_da_consulta(self):
+        linha, = self.consultar("SELECT nome, id FROM clientes WHERE id = 2")
+        self.assertEqual(linha.keys(), ["nome", "id"])
+        self.assertEqual(linha[0], "Bruno")
+        self.assertEqual(linha, self.consultar("SELECT nome, id FROM clientes WHERE id = 2")[0])
+
+    def test_coluna_fora_do_modelo_volta_como_row(self):
+        linha, = self.consultar("SELECT id, COUNT(*) AS qtd FROM clientes")
+        self.assertIsInstance(linha, sqlite3.Row)
+        linha, = self.consultar("SELECT id, nome AS cliente_nome FROM clientes WHERE id = 1", Honorario)
+        self.assertIsInstance(linha, Honorario)
+        self.assertEqual(linha.cliente_nome, "Ana")
+
+    def test_consultas_alternadas_no_mesmo_modelo(self):
+        fabrica = fabrica_de_registros(Cliente)
+        c1, c2 = self.conn.cursor(), self.conn.cursor()
+        c1.row_factory = c2.row_factory = fabrica
+        c1.execute("SELECT id, nome FROM clientes ORDER BY id")
+        c2.execute("SELECT email FROM clientes ORDER BY id")
+        self.assertEqual(c1.fetchone().keys(), ["id", "nome"])
+        self.assertEqual(c2.fetchone().keys(), ["email"])
+        self.assertEqual(c1.fetchone().nome, "Bruno")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,178 @@
+"""
+Regressão de plano de consulta: roda EXPLAIN QUERY PLAN em todas as consultas
+do database.py, das telas e do app e falha se alguma fizer SCAN completo de
+tabela (sem índice). Consultas que listam a tabela inteira de propósito ficam
+em VARREDURAS_PERMITIDAS, com o motivo.
+"""
+import unittest
+import sys
+import os
+import ast
+import re
+import glob
+import sqlite3
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PASTA_APP = os.path.join(ROOT, "honorarios")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, PASTA_APP)
+
+import database
+import geracao_honorarios
+
+
+# Trecho da consulta (normalizado) -> motivo da varredura completa
+VARREDURAS_PERMITIDAS = {
+    "SELECT id, codigo_interno, nome, cnpj, cpf, email FROM clientes": "cache de códigos e texto de busca de todos os clientes",
+    "SELECT COUNT(*) as total FROM clientes": "total de clientes do painel",
+    "FROM usuarios ORDER BY usuario": "listagem de usuários",
+    "SELECT chave, valor FROM configuracoes": "carga única do cache de configurações",
+    "FROM honorarios_resumo GROUP BY ano ORDER BY ano DESC": "resumo de todos os anos do painel (uma linha por ano/mês/status)",
+    "FROM honorarios h JOIN clientes c ON h.cliente_id = c.id WHERE 1=1 ORDER BY": "listar_honorarios() sem filtro",
+    "FROM recibos r JOIN clientes c ON r.cliente_id = c.id WHERE 1=1 ORDER BY": "listar_recibos() sem filtro",
+    "SELECT * FROM clientes WHERE 1=1 ORDER BY nome": "buscar_clientes('', ativo=None) lista todos",
+    "FROM valores_honorarios vh JOIN meses m WHERE vh.valor > 0 AND vh.ano": "geração em lote de todos os clientes",
+    "UPDATE honorarios_lote SET ativo": "marca de lote_honorarios() (tabela de uma linha)",
+    "FROM sqlite_master WHERE": "migração: definição da tabela recriada (tabela do esquema)",
+    "sqlite_sequence SET seq": "migração: contador do AUTOINCREMENT da tabela recriada",
+    "FROM sqlite_sequence WHERE name": "migração: contador do AUTOINCREMENT da tabela recriada",
+}
+
+COMANDOS_IGNORADOS = ("CREATE", "ALTER", "DROP", "PRAGMA", "BEGIN", "COMMIT", "ROLLBACK",
+                      "SAVEPOINT", "RELEASE", "ANALYZE", "VACUUM", "ATTACH", "DETACH")
+
+
+def normalizar(sql):
+    return " ".join(sql.split())
+
+
+def arquivos_do_app():
+    arquivos = sorted(glob.glob(os.path.join(PASTA_APP, "*.py")))
+    arquivos += sorted(glob.glob(os.path.join(PASTA_APP, "views", "*.py")))
+    arquivos += sorted(glob.glob(os.path.join(PASTA_APP, "utils", "*.py")))
+    return arquivos
+
+
+def consultas_literais():
+    """SQL literal passado direto para execute()/executemany() nos módulos do app"""
+    consultas = []
+    for caminho in arquivos_do_app():
+        with open(caminho, encoding="utf-8") as f:
+            arvore = ast.parse(f.read(), filename=caminho)
+        # Migrações rodam uma vez e podem varrer a tabela inteira
+        migracoes = [no for no in ast.walk(arvore)
+                     if isinstance(no, ast.FunctionDef) and no.name.startswith("_migracao_")]
+        dentro_de_migracao = {id(filho) for m in migracoes for filho in ast.walk(m)}
+        for no in ast.walk(arvore):
+            if id(no) in dentro_de_migracao:
+                continue
+            if (isinstance(no, ast.Call) and isinstance(no.func, ast.Attribute)
+                    and no.func.attr in ("execute", "executemany") and no.args
+                    and isinstance(no.args[0], ast.Constant) and isinstance(no.args[0].value, str)):
+                local = f"{os.path.relpath(caminho, ROOT)}:{no.lineno}"
+                consultas.append((local, no.args[0].value))
+    return consultas
+
+
+def varreduras_completas(conn, sql):
+    """Linhas do plano com SCAN de tabela sem índice"""
+    sql = normalizar(sql)
+    if sql.split(" ", 1)[0].upper() in COMANDOS_IGNORADOS:
+        return []
+    params = [None] * sql.count("?")
+    plano = conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+    ctes = set(re.findall(r"(\w+)\s*(?:\([^)]*\))?\s+AS\s*(?:MATERIALIZED\s*)?\(", sql, re.I))
+    for cte in list(ctes):
+        ctes.update(re.findall(rf"\b{cte}\s+(?:AS\s+)?(\w+)", sql, re.I))
+    ruins = []
+    for linha in plano:
+        detalhe = linha[3]
+        m = re.match(r"SCAN (\w+)(?: AS \w+)?$", detalhe)
+        if m and m.group(1) not in ctes:
+            ruins.append(detalhe)
+    return ruins
+
+
+def permitida(sql):
+    sql = normalizar(sql)
+    return any(trecho in sql for trecho in VARREDURAS_PERMITIDAS)
+
+
+class TestPlanoDeConsultas(unittest.TestCase):
+    def setUp(self):
+        self._pasta = tempfile.TemporaryDirectory()
+        self._db_original = database.DB_PATH
+        database.fechar_conexoes()
+        database.DB_PATH = os.path.join(self._pasta.name, "plano.db")
+        database.migrar()
+        database.arquivar_logs()  # cria o banco de arquivo dos logs
+        self.conn = sqlite3.connect(database.DB_PATH)
+        self.conn.execute("ATTACH DATABASE ? AS arquivo", (database._caminho_arquivo_logs(),))
+
+    def tearDown(self):
+        self.conn.close()
+        database.fechar_conexoes()
+        database.DB_PATH = self._db_original
+        self._pasta.cleanup()
+
+    def verificar(self, origem, sql):
+        if permitida(sql):
+            return
+        ruins = varreduras_completas(self.conn, sql)
+        self.assertFalse(ruins, f"{origem}: varredura completa {ruins}\n{normalizar(sql)}")
+
+    def test_consultas_literais_usam_indice(self):
+        consultas = consultas_literais()
+        self.assertGreater(len(consultas), 50)
+        for origem, sql in consultas:
+            with self.subTest(origem=origem):
+                self.verificar(origem, sql)
+
+    def test_consultas_montadas_usam_indice(self):
+        """Consultas com filtros dinâmicos: executa as funções e verifica o SQL gerado"""
+        capturadas = []
+        conn = database._conexao_da_thread()
+        conn.set_trace_callback(capturadas.append)
+        try:
+            for ano in (None, 2025):
+                for cliente_id in (None, 1):
+                    for status in (None, "PAGO"):
+                        database.listar_honorarios(ano=ano, cliente_id=cliente_id, status=status)
+                    database.listar_recibos(cliente_id=cliente_id, ano=ano)
+            for usuario in (None, "admin"):
+                for tabela in (None, "honorarios"):
+                    for antes_de in (None, ("2025-01-01 10:00:00", 5)):
+                        database.listar_logs(limite=20, usuario=usuario, tabela=tabela, antes_de=antes_de,
+                                             data_inicio="2024-01-01", data_fim="2024-12-31")
+                    database.listar_logs(limite=20, usuario=usuario, tabela=tabela)
+            for filtros in ({}, {"mes": 3, "status": "PAGO", "busca": "jose"}):
+                database.contar_honorarios_ano(2025, **filtros)
+                for apos in (None, (3, "Jose", 10)):
+                    database.listar_honorarios_pagina(2025, apos=apos, **filtros)
+            for texto in ("", "jose 123"):
+                for ativo in (True, None):
+                    database.buscar_clientes(texto, ativo=ativo)
+            database._buscar_clientes_like(conn, ["jose"], 50, True)
+            for status in (None, "ATIVO"):
+                for cliente_id in (None, 1):
+                    database.listar_certificados(status=status, cliente_id=cliente_id)
+            database.atualizar_certificado(1, status="VENCIDO")
+            for tabelas in (None, ("honorarios", "clientes")):
+                database.alteracoes_desde(0, tabelas=tabelas)
+            for cliente_id in (None, 1):
+                geracao_honorarios.gerar_honorarios_lote(cliente_id=cliente_id, dry_run=True)
+                geracao_honorarios.gerar_honorarios_lote(cliente_id=cliente_id, ano_inicio=2020, ano_fim=2025)
+        finally:
+            conn.set_trace_callback(None)
+
+        consultas = [sql for sql in capturadas if normalizar(sql).split(" ", 1)[0].upper()
+                     in ("SELECT", "UPDATE", "DELETE", "WITH", "INSERT")]
+        self.assertGreater(len(consultas), 20)
+        for sql in consultas:
+            with self.subTest(sql=normalizar(sql)[:80]):
+                self.verificar("consulta montada", sql)
+
+
+if __name__ == '__main__':
+    unittest.main()
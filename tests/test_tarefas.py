@@ -0,0 +1,125 @@
+import unittest
+import sys
+import os
+import tempfile
+import threading
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "honorarios"))
+
+import database
+from utils import tarefas
+
+
+class TestTarefas(unittest.TestCase):
+    def setUp(self):
+        self._pasta = tempfile.TemporaryDirectory()
+        self._db_original = database.DB_PATH
+        database.fechar_conexoes()
+        database.DB_PATH = os.path.join(self._pasta.name, "teste.db")
+        database.migrar()
+        self.avisos = []
+        tarefas.adicionar_observador_tarefas(self.avisos.append, chave="teste")
+
+    def tearDown(self):
+        tarefas.remover_observador_tarefas("teste")
+        database.descarregar_logs()
+        database.fechar_conexoes()
+        database.DB_PATH = self._db_original
+        self._pasta.cleanup()
+
+    def registro(self, tarefa):
+        return {t['id']: t for t in database.listar_tarefas()}[tarefa.id]
+
+    def test_progresso_resultado_e_registro(self):
+        terminadas = []
+
+        def contar(tarefa):
+            for i in range(5):
+                tarefa.verificar()
+                tarefa.progresso(i + 1, 5)
+            return "5 itens"
+
+        tarefa = tarefas.executar("Contar", contar, usuario="ana", ao_terminar=terminadas.append)
+        self.assertTrue(tarefa.aguardar(5))
+        self.assertEqual((tarefa.status, tarefa.resultado, tarefa.fracao), ("CONCLUIDA", "5 itens", 1.0))
+        self.assertEqual(terminadas, [tarefa])
+        self.assertNotIn(tarefa, tarefas.tarefas_ativas())
+        self.assertEqual(self.avisos[-1].status, "CONCLUIDA")
+
+        linha = self.registro(tarefa)
+        self.assertEqual((linha['nome'], linha['usuario'], linha['status']), ("Contar", "ana", "CONCLUIDA"))
+        self.assertEqual((linha['feitos'], linha['total'], linha['resultado']), (5, 5, "5 itens"))
+        self.assertIsNotNone(linha['fim'])
+
+    def test_cancelamento_cooperativo(self):
+        comecou, liberar = threading.Event(), threading.Event()
+
+        def longa(tarefa):
+            for i in range(1000):
+                if i == 1:
+                    comecou.set()
+                    liberar.wait(5)
+                tarefa.verificar()
+                tarefa.progresso(i + 1, 1000)
+
+        tarefa = tarefas.executar("Longa", longa)
+        self.assertTrue(comecou.wait(5))
+        tarefa.cancelar()
+        liberar.set()
+        self.assertTrue(tarefa.aguardar(5))
+        self.assertEqual(tarefa.status, "CANCELADA")
+        self.assertLess(tarefa.feitos, 1000)
+        self.assertEqual(self.registro(tarefa)['status'], "CANCELADA")
+
+    def test_erro_fica_registrado(self):
+        def falha(tarefa):
+            raise ValueError("planilha inválida")
+
+        tarefa = tarefas.executar("Importar", falha)
+        self.assertTrue(tarefa.aguardar(5))
+        self.assertEqual((tarefa.status, tarefa.erro), ("ERRO", "planilha inválida"))
+        linha = self.registro(tarefa)
+        self.assertEqual((linha['status'], linha['erro']), ("ERRO", "planilha inválida"))
+
+    def test_pool_limitado(self):
+        rodando, maximo = [0], [0]
+        lock, liberar = threading.Lock(), threading.Event()
+
+        def ocupar(tarefa):
+            with lock:
+                rodando[0] += 1
+                maximo[0] = max(maximo[0], rodando[0])
+            liberar.wait(5)
+            with lock:
+                rodando[0] -= 1
+
+        lista = [tarefas.executar(f"T{i}", ocupar) for i in range(tarefas.MAX_TRABALHADORES + 3)]
+        for _ in range(500):  # espera os trabalhadores ocuparem o pool
+            if rodando[0] == tarefas.MAX_TRABALHADORES:
+                break
+            threading.Event().wait(0.01)
+        self.assertEqual(sum(t.status == "AGUARDANDO" for t in lista), 3)
+        liberar.set()
+        for t in lista:
+            self.assertTrue(t.aguardar(5))
+        self.assertEqual(maximo[0], tarefas.MAX_TRABALHADORES)
+
+
+    def test_chaves_unicas_entre_threads(self):
+        chaves, lock = [], threading.Lock()
+
+        def criar():
+            novas = [tarefas.Tarefa("T").chave for _ in range(2000)]
+            with lock:
+                chaves.extend(novas)
+
+        threads = [threading.Thread(target=criar) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(set(chaves)), len(chaves))
+
+if __name__ == '__main__':
+    unittest.main()